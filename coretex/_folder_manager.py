@@ -47,6 +47,12 @@ class FolderManager:
             folder where node and run logs are stored
         environments : Path
             folder where node stores python environments
+        uploadsFolder : Path
+            folder where journals of unfinished chunked uploads are stored
+        sampleContentFolder : Path
+            folder where listings of the extracted sample files are stored
+        sampleLinksIndexPath : Path
+            database which maps samples to their links inside dataset folders
     """
 
     def __init__(self, storagePath: Union[Path, str]):
@@ -62,8 +68,12 @@ class FolderManager:
         self.logs = self._createFolder("logs")
         self.environments = self._createFolder("environments")
         self.temp = self._createFolder("temp")
+        self.uploadsFolder = self._createFolder("uploads")
+        self.sampleContentFolder = self._createFolder("sample-content")
         self._artifactsFolder = self._createFolder("artifacts")
 
+        self.sampleLinksIndexPath = self._root / "sample_links.db"
+
         self.runsLogDirectory = self.logs / "runs"
         self.runsLogDirectory.mkdir(exist_ok = True)
 
@@ -25,6 +25,7 @@ import signal
 from .current_task_run import setCurrentTaskRun
 from .._folder_manager import folder_manager
 from ..entities import TaskRun
+from ..networking import networkManager
 
 
 class TaskCallback:
@@ -75,6 +76,12 @@ class TaskCallback:
         sys.exit(1)
 
     def onCleanUp(self) -> None:
+        try:
+            statisticsPath = folder_manager.getRunLogsDir(self._taskRun.id) / "network_statistics.json"
+            networkManager.statistics.dump(statisticsPath)
+        except OSError as exception:
+            logging.getLogger("coretexpylib").debug(">> [Coretex] Failed to store network statistics", exc_info = exception)
+
         # Flushes the internal buffers of logging module handlers
         # and other logging cleanup
         # IMPORTANT: do not use logging after calling this
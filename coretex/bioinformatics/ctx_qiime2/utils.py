@@ -63,10 +63,10 @@ def isFastqMPSample(sample: CustomSample) -> bool:
     sequenceFileNames = ["forward.fastq", "forward.fastq.gz", "sequences.fastq", "sequences.fastq.gz"]
     barcodesFileNames = ["barcodes.fastq", "barcodes.fastq.gz"]
 
-    folderContent = list(sample.load().folderContent)
+    sampleContent = sample.content.topLevelNames()
 
-    sequenceFilePresent = any([path.name in sequenceFileNames for path in folderContent])
-    barcodesFilePresent = any([path.name in barcodesFileNames for path in folderContent])
+    sequenceFilePresent = any([name in sequenceFileNames for name in sampleContent])
+    barcodesFilePresent = any([name in barcodesFileNames for name in sampleContent])
 
     return sequenceFilePresent and barcodesFilePresent
 
@@ -74,27 +74,27 @@ def isFastqMPSample(sample: CustomSample) -> bool:
 def isFastqDPSample(sample: CustomSample) -> bool:
     sample.unzip()
 
-    return any([path.suffix == ".fastq" for path in sample.load().folderContent])
+    return any([Path(name).suffix == ".fastq" for name in sample.content.topLevelNames()])
 
 
 def isImportedSample(sample: CustomSample) -> bool:
     sample.unzip()
 
-    sampleContent = [path.name for path in sample.load().folderContent]
+    sampleContent = sample.content.topLevelNames()
     return "multiplexed-sequences.qza" in sampleContent
 
 
 def isDemultiplexedSample(sample: CustomSample) -> bool:
     sample.unzip()
 
-    sampleContent = [path.name for path in sample.load().folderContent]
+    sampleContent = sample.content.topLevelNames()
     return "demux.qza" in sampleContent
 
 
 def isDenoisedSample(sample: CustomSample) -> bool:
     sample.unzip()
 
-    sampleContent = [path.name for path in sample.load().folderContent]
+    sampleContent = sample.content.topLevelNames()
     return (
         "table.qza" in sampleContent and
         "rep-seqs.qza" in sampleContent and
@@ -105,7 +105,7 @@ def isDenoisedSample(sample: CustomSample) -> bool:
 def isPhylogeneticTreeSample(sample: CustomSample) -> bool:
     sample.unzip()
 
-    sampleContent = [path.name for path in sample.load().folderContent]
+    sampleContent = sample.content.topLevelNames()
     return (
         "rooted-tree.qza" in sampleContent and
         "unrooted-tree.qza" in sampleContent and
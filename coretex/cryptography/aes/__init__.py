@@ -15,5 +15,6 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from .encryptor import StreamEncryptor, encryptFile
+from .encryptor import StreamEncryptor, encryptFile, encryptedSize
 from .decryptor import StreamDecryptor, decryptFile
+from .constants import IV_SIZE
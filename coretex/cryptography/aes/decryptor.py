@@ -62,7 +62,9 @@ class StreamDecryptor:
 
         self._buffer.append(data)
 
-        while self._buffer.remaining >= self.chunkSize:
+        # Last block must stay in the buffer because
+        # it is unpadded once the stream is flushed
+        while self._buffer.remaining > self.chunkSize:
             chunk = self._buffer.getBytes(self.chunkSize)
             yield self._decryptor.update(chunk)
 
@@ -91,6 +91,26 @@ class StreamEncryptor:
         return self._encryptor.update(chunk) + self._encryptor.finalize()
 
 
+def encryptedSize(size: int) -> int:
+    """
+        Calculates the size of data encrypted using "StreamEncryptor",
+        including the IV which is stored in front of the encrypted data
+
+        Parameters
+        ----------
+        size : int
+            size of the data which will be encrypted
+
+        Returns
+        -------
+        int -> size of the encrypted data
+    """
+
+    # Data is padded only if its size is not divisible by AES block size
+    paddedSize = -(-size // AES_BLOCK_SIZE) * AES_BLOCK_SIZE
+    return IV_SIZE + paddedSize
+
+
 def encryptFile(key: bytes, sourcePath: Path, destinationPath: Path) -> None:
     """
         Encrypts a file using AES 256. IV gets stored as the first 16 bytes
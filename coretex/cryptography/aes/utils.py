@@ -35,6 +35,12 @@ class DataBuffer:
                 data which will be appended
         """
 
+        # Drop bytes which were already read, otherwise buffer
+        # would hold the whole stream in memory
+        if self.position > 0 and self.position >= self.remaining:
+            del self.data[:self.position]
+            self.position = 0
+
         self.data.extend(data)
 
     def get(self) -> int:
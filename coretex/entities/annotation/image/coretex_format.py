@@ -15,7 +15,7 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import List, Dict, Tuple, Optional
+from typing import Any, List, Dict, Tuple, Optional, Union
 from typing_extensions import Self
 from uuid import UUID
 from math import cos, sin, radians
@@ -33,18 +33,52 @@ SegmentationType = List[int]
 
 
 def toPoly(segmentation: List[int]) -> List[Tuple[int, int]]:
-    points: List[Tuple[int, int]] = []
+    return list(zip(segmentation[0::2], segmentation[1::2]))
 
-    for index in range(0, len(segmentation) - 1, 2):
-        points.append((segmentation[index], segmentation[index + 1]))
 
-    return points
+def toPolygonArray(segmentation: SegmentationType) -> np.ndarray:
+    """
+        Converts segmentation represented as a list of x, y values
+        into a (N, 2) float array of polygon points
+
+        Parameters
+        ----------
+        segmentation : SegmentationType
+            list of x, y values - length must be even
+
+        Returns
+        -------
+        np.ndarray -> polygon points
+
+        Raises
+        ------
+        ValueError -> if segmentation has odd number of values
+    """
+
+    if len(segmentation) % 2 != 0:
+        raise ValueError(f">> [Coretex] Segmentation has odd number of values ({len(segmentation)})")
+
+    return np.array(segmentation, dtype = np.float64).reshape(-1, 2)
+
+
+def _encodePolygon(polygon: np.ndarray) -> List[Union[int, float]]:
+    values = polygon.ravel()
+
+    # Integer coordinates are encoded as integers so decoded annotations are encoded unchanged
+    if np.array_equal(values, np.rint(values)):
+        return values.astype(np.int64).tolist()  # type: ignore[no-any-return]
+
+    return values.tolist()  # type: ignore[no-any-return]
 
 
 class CoretexSegmentationInstance(Codable):
 
     """
-        Segmentation Instance class
+        Segmentation Instance class\n
+        Segmentations are stored either as lists of x, y values or as (N, 2)
+        float arrays of polygon points. Decoded and created instances store lists,
+        "useArrays", "translate" and "scale" convert the instance to arrays.
+        Other geometry operations keep the storage of the instance.
 
         Properties
         ----------
@@ -54,11 +88,13 @@ class CoretexSegmentationInstance(Codable):
             Bounding Box as a python class
         segmentations : List[SegmentationType]
             list of segmentations that define the precise boundaries of object
+        polygons : List[np.ndarray]
+            segmentations represented as (N, 2) float arrays of polygon points
     """
 
     classId: UUID
     bbox: BBox
-    segmentations: List[SegmentationType]
+    _segmentations: Union[List[SegmentationType], List[np.ndarray]]
 
     @classmethod
     def _keyDescriptors(cls) -> Dict[str, KeyDescriptor]:
@@ -66,10 +102,16 @@ class CoretexSegmentationInstance(Codable):
 
         descriptors["classId"] = KeyDescriptor("class_id", UUID)
         descriptors["bbox"] = KeyDescriptor("bbox", BBox)
-        descriptors["segmentations"] = KeyDescriptor("annotations")
+        descriptors["_segmentations"] = KeyDescriptor("annotations")
 
         return descriptors
 
+    def _encodeValue(self, key: str, value: Any) -> Any:
+        if key == "_segmentations" and self.isArrayBacked:
+            return [_encodePolygon(polygon) for polygon in self.polygons]
+
+        return super()._encodeValue(key, value)
+
     @classmethod
     def create(cls, classId: UUID, bbox: BBox, segmentations: List[SegmentationType]) -> Self:
         """
@@ -97,6 +139,91 @@ class CoretexSegmentationInstance(Codable):
 
         return obj
 
+    @property
+    def isArrayBacked(self) -> bool:
+        """
+            Returns
+            -------
+            bool -> True if segmentations are stored as polygon arrays
+        """
+
+        return len(self._segmentations) > 0 and isinstance(self._segmentations[0], np.ndarray)
+
+    @property
+    def segmentations(self) -> List[SegmentationType]:
+        """
+            If the instance is array backed a new list is created on every
+            access, with coordinates rounded to the nearest integer
+
+            Returns
+            -------
+            List[SegmentationType] -> segmentations as lists of x, y values
+        """
+
+        if self.isArrayBacked:
+            return [np.rint(polygon).astype(int).ravel().tolist() for polygon in self.polygons]
+
+        return self._segmentations  # type: ignore[return-value]
+
+    @segmentations.setter
+    def segmentations(self, segmentations: List[SegmentationType]) -> None:
+        self._segmentations = segmentations
+
+    @property
+    def polygons(self) -> List[np.ndarray]:
+        """
+            If the instance is not array backed new arrays are created on every
+            access, so changes to them are not stored. Use "useArrays" to modify
+            polygons in place.
+
+            Returns
+            -------
+            List[np.ndarray] -> segmentations as (N, 2) float arrays of polygon points
+
+            Raises
+            ------
+            ValueError -> if segmentation has odd number of values
+        """
+
+        if self.isArrayBacked:
+            return self._segmentations  # type: ignore[return-value]
+
+        return [toPolygonArray(segmentation) for segmentation in self._segmentations]  # type: ignore[arg-type]
+
+    @polygons.setter
+    def polygons(self, polygons: List[np.ndarray]) -> None:
+        self._segmentations = [np.asarray(polygon, dtype = np.float64).reshape(-1, 2) for polygon in polygons]
+
+    def useArrays(self) -> None:
+        """
+            Converts the instance to array backed storage. After the conversion
+            "segmentations" returns a new list on every access.
+
+            Raises
+            ------
+            ValueError -> if segmentation has odd number of values
+
+            Example
+            -------
+            >>> instance.useArrays()
+            >>> instance.polygons[0][:, 0] += 10
+        """
+
+        self._segmentations = self.polygons
+
+    def _drawSegmentations(self, draw: ImageDraw.ImageDraw, fill: int, downscale: int = 1) -> None:
+        for segmentation in self._segmentations:
+            valueCount = segmentation.size if isinstance(segmentation, np.ndarray) else len(segmentation)
+            if valueCount < 4:
+                raise ValueError(f">> [Coretex] Segmentation has too few values ({valueCount}). Minimum: 4")
+
+            if isinstance(segmentation, np.ndarray):
+                draw.polygon((segmentation / downscale).ravel().tolist(), fill = fill)
+            elif downscale != 1:
+                draw.polygon((toPolygonArray(segmentation) / downscale).ravel().tolist(), fill = fill)
+            else:
+                draw.polygon(toPoly(segmentation), fill = fill)
+
     def extractSegmentationMask(self, width: int, height: int) -> np.ndarray:
         """
             Generates segmentation mask based on provided
@@ -120,13 +247,7 @@ class CoretexSegmentationInstance(Codable):
         """
 
         image = Image.new("L", (width, height))
-
-        for segmentation in self.segmentations:
-            if len(segmentation) < 4:
-                raise ValueError(f">> [Coretex] Segmentation has too few values ({len(segmentation)}. Minimum: 4)")
-
-            draw = ImageDraw.Draw(image)
-            draw.polygon(toPoly(segmentation), fill = 1)
+        self._drawSegmentations(ImageDraw.Draw(image), 1)
 
         return np.array(image)
 
@@ -159,17 +280,85 @@ class CoretexSegmentationInstance(Codable):
             Returns
             -------
             Tuple[int, int] -> x, y coordinates of centroid
+
+            Raises
+            ------
+            ValueError -> if instance has no segmentation points
+        """
+
+        polygons = self.polygons
+        if sum(len(polygon) for polygon in polygons) == 0:
+            raise ValueError(">> [Coretex] Cannot calculate centroid of instance without segmentations")
+
+        centerX, centerY = np.floor(np.concatenate(polygons).mean(axis = 0))
+        return int(centerX), int(centerY)
+
+    def computeBBox(self) -> BBox:
+        """
+            Calculates bounding box which contains all segmentations
+
+            Returns
+            -------
+            BBox -> bounding box of segmentations
+
+            Raises
+            ------
+            ValueError -> if instance has no segmentation points
+        """
+
+        polygons = self.polygons
+        if sum(len(polygon) for polygon in polygons) == 0:
+            raise ValueError(">> [Coretex] Cannot calculate bounding box of instance without segmentations")
+
+        points = np.concatenate(polygons)
+        minX, minY = np.floor(points.min(axis = 0))
+        maxX, maxY = np.ceil(points.max(axis = 0))
+
+        return BBox.create(int(minX), int(minY), int(maxX), int(maxY))
+
+    def translate(self, offsetX: float, offsetY: float) -> None:
         """
+            Moves segmentations by the specified offset,
+            instance is converted to array backed storage
 
-        flattenedSegmentations = [element for sublist in self.segmentations for element in sublist]
+            Parameters
+            ----------
+            offsetX : float
+                offset along the x axis
+            offsetY : float
+                offset along the y axis
+        """
 
-        listCX = [value for index, value in enumerate(flattenedSegmentations) if index % 2 == 0]
-        centerX = sum(listCX) // len(listCX)
+        offset = np.array([offsetX, offsetY], dtype = np.float64)
+        self._segmentations = [polygon + offset for polygon in self.polygons]
 
-        listCY = [value for index, value in enumerate(flattenedSegmentations) if index % 2 != 0]
-        centerY = sum(listCY) // len(listCY)
+    def scale(self, factorX: float, factorY: Optional[float] = None, origin: Tuple[float, float] = (0, 0)) -> None:
+        """
+            Scales segmentations relative to the origin point,
+            instance is converted to array backed storage
 
-        return centerX, centerY
+            Parameters
+            ----------
+            factorX : float
+                scale factor along the x axis
+            factorY : Optional[float]
+                scale factor along the y axis, same as factorX if not provided
+            origin : Tuple[float, float]
+                x, y coordinates of the point which does not move, (0, 0) by default
+
+            Example
+            -------
+            >>> # Update instance after the image was resized to half of its size
+            >>> instance.scale(0.5)
+        """
+
+        if factorY is None:
+            factorY = factorX
+
+        factor = np.array([factorX, factorY], dtype = np.float64)
+        center = np.array(origin, dtype = np.float64)
+
+        self._segmentations = [(polygon - center) * factor + center for polygon in self.polygons]
 
     def centerSegmentations(self, newCentroid: Tuple[int, int]) -> None:
         """
@@ -184,64 +373,54 @@ class CoretexSegmentationInstance(Codable):
         newCenterX, newCenterY = newCentroid
         oldCenterX, oldCenterY = self.centroid()
 
-        modifiedSegmentations: List[List[int]] = []
-
-        for segmentation in self.segmentations:
-            modifiedSegmentation: List[int] = []
-
-            for i in range(0, len(segmentation), 2):
-                x = segmentation[i] + (newCenterX - oldCenterX)
-                y = segmentation[i+1] + (newCenterY - oldCenterY)
-
-                modifiedSegmentation.append(x)
-                modifiedSegmentation.append(y)
+        offset = np.array([newCenterX - oldCenterX, newCenterY - oldCenterY])
 
-            modifiedSegmentations.append(modifiedSegmentation)
-
-        self.segmentations = modifiedSegmentations
+        if self.isArrayBacked:
+            self._segmentations = [polygon + offset for polygon in self.polygons]
+        else:
+            self.segmentations = [_encodePolygon(polygon + offset) for polygon in self.polygons]  # type: ignore[misc]
 
     def rotateSegmentations(
         self,
-        degrees: int,
-        origin: Optional[Tuple[int, int]] = None
+        degrees: float,
+        origin: Optional[Tuple[float, float]] = None
     ) -> None:
 
         """
-            Rotates segmentations of CoretexSegmentationInstance object
+            Rotates segmentations of CoretexSegmentationInstance object\n
+            Segmentations of instances which are not array backed stay integers,
+            offsets of the rotated points from the origin are truncated
 
             Parameters
             ----------
-            degrees : int
+            degrees : float
                 degree of rotation
+            origin : Optional[Tuple[float, float]]
+                x, y coordinates of the rotation center, centroid is used if not provided
         """
 
         if origin is None:
             origin = self.centroid()
 
-        rotatedSegmentations: List[List[int]] = []
-        centerX, centerY = origin
+        center = np.array(origin, dtype = np.float64)
 
         # because rotations with image and segmentations doesn't go in same direction
         # one of the rotations has to be inverted so they go in same direction
         theta = radians(-degrees)
         cosang, sinang = cos(theta), sin(theta)
 
-        for segmentation in self.segmentations:
-            rotatedSegmentation: List[int] = []
-
-            for i in range(0, len(segmentation), 2):
-                x = segmentation[i] - centerX
-                y = segmentation[i + 1] - centerY
-
-                newX = int(x * cosang - y * sinang) + centerX
-                newY = int(x * sinang + y * cosang) + centerY
+        # Transposed rotation matrix, points are stored as rows
+        rotation = np.array([
+            [cosang, sinang],
+            [-sinang, cosang]
+        ])
 
-                rotatedSegmentation.append(newX)
-                rotatedSegmentation.append(newY)
+        rotated = [(polygon - center) @ rotation for polygon in self.polygons]
 
-            rotatedSegmentations.append(rotatedSegmentation)
-
-        self.segmentations = rotatedSegmentations
+        if self.isArrayBacked:
+            self._segmentations = [polygon + center for polygon in rotated]
+        else:
+            self.segmentations = [_encodePolygon(np.trunc(polygon) + center) for polygon in rotated]  # type: ignore[misc]
 
 
 class CoretexImageAnnotation(Codable):
@@ -324,17 +503,13 @@ class CoretexImageAnnotation(Codable):
         """
 
         image = Image.new("L", (self.width, self.height))
+        draw = ImageDraw.Draw(image)
 
         for instance in self.instances:
             labelId = classes.labelIdForClassId(instance.classId)
             if labelId is None:
                 continue
 
-            for segmentation in instance.segmentations:
-                if len(segmentation) < 4:
-                    raise ValueError(f">> [Coretex] Segmentation has too few values ({len(segmentation)}. Minimum: 4)")
-
-                draw = ImageDraw.Draw(image)
-                draw.polygon(toPoly(segmentation), fill = labelId + 1)
+            instance._drawSegmentations(draw, labelId + 1)
 
         return np.asarray(image)
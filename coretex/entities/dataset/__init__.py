@@ -16,9 +16,12 @@
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from .custom_dataset import CustomDataset, LocalCustomDataset
-from .image_dataset import ImageDataset, LocalImageDataset, augmentDataset
+from .image_dataset import ImageDataset, LocalImageDataset, ImageTensorCache, SegmentationMaskCache, MaskType, MaskStorage, augmentDataset
 from .dataset import Dataset
+from .data_loader import DataLoader, DataLoaderStatistics, defaultCollate
+from .sample_index import SampleMetadataIndex
 from .utils import createDataset
 from .local_dataset import LocalDataset
 from .network_dataset import NetworkDataset, DatasetState
+from .sample_import_result import SampleImportResult
 from .sequence_dataset import SequenceDataset, LocalSequenceDataset
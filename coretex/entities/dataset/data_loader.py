@@ -0,0 +1,307 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Any, Callable, Generic, Iterator, List, Optional, TypeVar, Deque
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, Future
+from collections import deque
+
+import time
+import random
+import logging
+
+import numpy as np
+
+from .dataset import Dataset
+from ..sample import Sample
+
+
+SampleType = TypeVar("SampleType", bound = "Sample")
+
+DEFAULT_LOADER_WORKERS = 4
+DEFAULT_PREFETCH_FACTOR = 2
+
+
+def loadSample(sample: Sample) -> Any:
+    """
+        Default data loader transform, loads the sample data
+    """
+
+    return sample.load()
+
+
+def defaultCollate(items: List[Any]) -> Any:
+    """
+        Combines transformed samples into a batch. Arrays and numbers are
+        stacked into a single array with batch as the first dimension,
+        tuples, lists and dictionaries are collated element by element,
+        while any other values are returned as a list.
+
+        Parameters
+        ----------
+        items : List[Any]
+            transformed samples of the batch
+
+        Returns
+        -------
+        Any -> batch
+    """
+
+    first = items[0]
+
+    if isinstance(first, np.ndarray):
+        return np.stack(items)
+
+    if isinstance(first, (bool, int, float, np.number)):
+        return np.array(items)
+
+    if isinstance(first, tuple):
+        return tuple(defaultCollate(list(values)) for values in zip(*items))
+
+    if isinstance(first, list):
+        return [defaultCollate(list(values)) for values in zip(*items)]
+
+    if isinstance(first, dict):
+        return { key: defaultCollate([item[key] for item in items]) for key in first }
+
+    return items
+
+
+def _loadBatch(samples: List[Any], transform: Callable[[Any], Any], collate: Callable[[List[Any]], Any]) -> Any:
+    # Whole batch is created by a single worker so only the
+    # collated batch is transferred from worker processes
+    return collate([transform(sample) for sample in samples])
+
+
+class DataLoaderStatistics:
+
+    """
+        Metrics of a single iteration over the data loader which
+        show if the consumer had to wait for batches to be loaded
+
+        Properties
+        ----------
+        batchCount : int
+            number of batches returned to the consumer
+        stallCount : int
+            number of batches the consumer had to wait for
+        stallTime : float
+            total time (in seconds) the consumer spent waiting for batches
+        queueDepths : List[int]
+            number of batches which were already loaded at the
+            moment the consumer requested the next batch
+    """
+
+    def __init__(self) -> None:
+        self.batchCount = 0
+        self.stallCount = 0
+        self.stallTime = 0.0
+        self.queueDepths: List[int] = []
+
+        self._startTime = time.perf_counter()
+        self._endTime: Optional[float] = None
+
+    @property
+    def elapsedTime(self) -> float:
+        endTime = self._endTime if self._endTime is not None else time.perf_counter()
+        return endTime - self._startTime
+
+    @property
+    def averageQueueDepth(self) -> float:
+        return sum(self.queueDepths) / len(self.queueDepths) if len(self.queueDepths) > 0 else 0.0
+
+    @property
+    def stallFraction(self) -> float:
+        """
+            Returns
+            -------
+            float -> fraction of the iteration time the consumer spent waiting for batches
+        """
+
+        elapsedTime = self.elapsedTime
+        return self.stallTime / elapsedTime if elapsedTime > 0 else 0.0
+
+    def _finish(self) -> None:
+        self._endTime = time.perf_counter()
+
+    def __str__(self) -> str:
+        return (
+            f"{self.batchCount} batches in {self.elapsedTime:.2f}s, "
+            f"stalled {self.stallCount} times for {self.stallTime:.2f}s ({self.stallFraction * 100:.0f}%), "
+            f"average queue depth {self.averageQueueDepth:.2f}"
+        )
+
+
+class DataLoader(Generic[SampleType]):
+
+    """
+        Iterates over the samples of a dataset in batches. Batches are
+        loaded in the background by a pool of threads (or processes) while
+        the previous batches are being consumed, so the training loop does
+        not wait for samples to be loaded.
+
+        Properties
+        ----------
+        dataset : Dataset[SampleType]
+            dataset whose samples are loaded
+        transform : Callable[[SampleType], Any]
+            function which turns a sample into training data, by default
+            sample data is loaded using "Sample.load"
+        batchSize : int
+            number of samples in a batch
+        shuffle : bool
+            if True order of samples is shuffled before every iteration
+        seed : Optional[int]
+            seed used for shuffling, same seed produces the same order of samples
+        workers : int
+            number of batches which are loaded in parallel
+        prefetchFactor : int
+            number of batches loaded in advance per worker
+        dropLast : bool
+            if True last batch is skipped if it has less than "batchSize" samples
+        useProcesses : bool
+            if True batches are loaded in separate processes, which avoids
+            the GIL for transforms implemented in Python. Samples, transform
+            and collate function must be picklable in that case
+        collate : Callable[[List[Any]], Any]
+            function which combines transformed samples into a batch
+        statistics : Optional[DataLoaderStatistics]
+            metrics of the last (or current) iteration
+
+        Example
+        -------
+        >>> from coretex import DataLoader
+        \b
+        >>> def transform(sample: ImageSample) -> np.ndarray:
+                image, _, _ = resizeWithPadding(sample.load().image, 224, 224)
+                return image
+        \b
+        >>> loader = DataLoader(dataset, transform, batchSize = 32, shuffle = True, seed = 42)
+        >>> for epoch in range(epochs):
+                for batch in loader:
+                    model.train_on_batch(batch)
+                print(loader.statistics)
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset[SampleType],
+        transform: Callable[[SampleType], Any] = loadSample,
+        batchSize: int = 1,
+        shuffle: bool = False,
+        seed: Optional[int] = None,
+        workers: int = DEFAULT_LOADER_WORKERS,
+        prefetchFactor: int = DEFAULT_PREFETCH_FACTOR,
+        dropLast: bool = False,
+        useProcesses: bool = False,
+        collate: Callable[[List[Any]], Any] = defaultCollate
+    ) -> None:
+
+        if batchSize <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"batchSize\" value \"{batchSize}\". Value must be greater than 0")
+
+        if workers <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"workers\" value \"{workers}\". Value must be greater than 0")
+
+        if prefetchFactor <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"prefetchFactor\" value \"{prefetchFactor}\". Value must be greater than 0")
+
+        self.dataset = dataset
+        self.transform = transform
+        self.batchSize = batchSize
+        self.shuffle = shuffle
+        self.seed = seed
+        self.workers = workers
+        self.prefetchFactor = prefetchFactor
+        self.dropLast = dropLast
+        self.useProcesses = useProcesses
+        self.collate = collate
+        self.statistics: Optional[DataLoaderStatistics] = None
+
+        self._epoch = 0
+
+    def __len__(self) -> int:
+        sampleCount = len(self.dataset.samples)
+
+        if self.dropLast:
+            return sampleCount // self.batchSize
+
+        return -(-sampleCount // self.batchSize)
+
+    def _batchIndices(self) -> List[List[int]]:
+        order = list(range(len(self.dataset.samples)))
+
+        if self.shuffle:
+            # Every iteration has a different, but reproducible, order
+            seed = None if self.seed is None else self.seed + self._epoch
+            random.Random(seed).shuffle(order)
+
+        self._epoch += 1
+
+        batches = [order[start:start + self.batchSize] for start in range(0, len(order), self.batchSize)]
+        if self.dropLast and len(batches) > 0 and len(batches[-1]) < self.batchSize:
+            batches.pop()
+
+        return batches
+
+    def _createExecutor(self) -> Executor:
+        if self.useProcesses:
+            return ProcessPoolExecutor(max_workers = self.workers)
+
+        return ThreadPoolExecutor(max_workers = self.workers)
+
+    def __iter__(self) -> Iterator[Any]:
+        samples = self.dataset.samples
+        batches = self._batchIndices()
+
+        statistics = DataLoaderStatistics()
+        self.statistics = statistics
+
+        executor = self._createExecutor()
+        pending: Deque[Future] = deque()
+        nextBatch = 0
+
+        try:
+            while nextBatch < len(batches) or len(pending) > 0:
+                # Keep the queue of loaded (and loading) batches full
+                while nextBatch < len(batches) and len(pending) < self.workers * self.prefetchFactor:
+                    batchSamples = [samples[index] for index in batches[nextBatch]]
+                    pending.append(executor.submit(_loadBatch, batchSamples, self.transform, self.collate))
+                    nextBatch += 1
+
+                statistics.queueDepths.append(sum(1 for future in pending if future.done()))
+
+                future = pending.popleft()
+                if not future.done():
+                    stallStart = time.perf_counter()
+                    future.result()
+
+                    statistics.stallCount += 1
+                    statistics.stallTime += time.perf_counter() - stallStart
+
+                batch = future.result()
+                statistics.batchCount += 1
+
+                yield batch
+        finally:
+            # Iteration finished or the consumer stopped iterating
+            for future in pending:
+                future.cancel()
+
+            executor.shutdown(wait = True)
+            statistics._finish()
+
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Data loader: {statistics}")
@@ -15,10 +15,11 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Optional, TypeVar, Generic, List, Callable
+from typing import Optional, TypeVar, Generic, List, Callable, Dict, Any
 from abc import ABC, abstractmethod
 from pathlib import Path
 
+from .sample_index import SampleIndex, SampleMetadataIndex, loadSampleMetadata
 from ..sample import Sample
 from ..utils import isEntityNameValid
 
@@ -60,7 +61,7 @@ class Dataset(ABC, Generic[SampleType]):
         pass
 
     @abstractmethod
-    def download(self, decrypt: bool = True, ignoreCache: bool = False) -> None:
+    def download(self, decrypt: bool = True, ignoreCache: bool = False, unzip: bool = False) -> None:
         pass
 
     def rename(self, name: str) -> bool:
@@ -87,9 +88,22 @@ class Dataset(ABC, Generic[SampleType]):
         self.name = name
         return True
 
+    def _sampleIndex(self) -> SampleIndex[SampleType]:
+        index: Optional[SampleIndex[SampleType]] = getattr(self, "_sampleIndexCache", None)
+
+        if index is None:
+            index = SampleIndex()
+            self._sampleIndexCache = index
+
+        return index
+
     def getSample(self, name: str) -> Optional[SampleType]:
         """
-            Retrieves sample which matches the provided name
+            Retrieves sample which matches the provided name. Samples are
+            indexed by name, so the lookup does not iterate over all samples.
+            Sample with the exact name is returned if it exists, otherwise
+            the first sample whose name starts with the provided name.
+            Samples replaced in place are found only after "reindex" is called.
 
             Parameters
             ----------
@@ -101,14 +115,70 @@ class Dataset(ABC, Generic[SampleType]):
             Optional[SampleType] -> sample object
         """
 
-        for sample in self.samples:
-            # startswith must be used since if we import sample
-            # with the same name twice, the second one will have
-            # suffix with it's serial number
-            if sample.name.startswith(name):
-                return sample
+        # If we import sample with the same name twice, the second one will
+        # have suffix with it's serial number, so if there is no sample
+        # with the exact name, first sample whose name starts with it is returned
+        return self._sampleIndex().byName(self.samples, name)
+
+    def reindex(self) -> None:
+        """
+            Rebuilds the index of samples by name and id. Samples added to
+            or removed from the dataset are indexed automatically, but after
+            a sample was replaced in place (e.g. "dataset.samples[i] = sample")
+            this must be called for "getSample" and "getSampleById" to find it.
+        """
+
+        self._sampleIndex().reindex()
+
+    def getSampleById(self, sampleId: int) -> Optional[SampleType]:
+        """
+            Retrieves sample which has the provided id
+
+            Parameters
+            ----------
+            sampleId : int
+                id of sample
+
+            Returns
+            -------
+            Optional[SampleType] -> sample object
+        """
+
+        return self._sampleIndex().byId(self.samples, sampleId)
+
+    def indexMetadata(
+        self,
+        loader: Optional[Callable[[SampleType], Dict[str, Any]]] = None,
+        indexedFields: Optional[List[str]] = None
+    ) -> SampleMetadataIndex[SampleType]:
+
+        """
+            Loads metadata of all samples, which can then be queried
+            without loading it again
+
+            Parameters
+            ----------
+            loader : Optional[Callable[[SampleType], Dict[str, Any]]]
+                function which loads metadata of a sample, if None
+                "loadMetadata" method of the sample is used (e.g. ImageSample)
+            indexedFields : Optional[List[str]]
+                metadata fields for which hash indexes are created
+
+            Returns
+            -------
+            SampleMetadataIndex[SampleType] -> metadata of samples which can be queried
+
+            Example
+            -------
+            >>> metadata = dataset.indexMetadata(indexedFields = ["split"])
+            >>> trainSamples = metadata.query(split = "train")
+        """
+
+        if loader is None:
+            loader = loadSampleMetadata
 
-        return None
+        samples = list(self.samples)
+        return SampleMetadataIndex(samples, [loader(sample) for sample in samples], indexedFields)
 
     def getSamples(self, filterFunc: Callable[[SampleType], bool]) -> List[SampleType]:
         filteredSamples: List[SampleType] = []
@@ -0,0 +1,227 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, Dict, Any, List, Set, Tuple
+from typing_extensions import Self
+from pathlib import Path
+from threading import Lock
+
+import os
+import json
+import logging
+
+from ..sample import NetworkSample
+
+
+MANIFEST_FILE_NAME = ".manifest.json"
+MANIFEST_VERSION = 1
+
+
+def listStoredSamples(samplesFolder: Path) -> Tuple[Dict[str, int], Set[str]]:
+    """
+        Not intended for outside use
+
+        Lists the samples folder once, so states of all samples
+        can be checked without filesystem calls for every sample
+
+        Returns
+        -------
+        Tuple[Dict[str, int], Set[str]] -> sizes of files mapped by file name,
+        names of directories (extracted samples)
+    """
+
+    files: Dict[str, int] = {}
+    directories: Set[str] = set()
+
+    with os.scandir(samplesFolder) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                directories.add(entry.name)
+            elif entry.is_file():
+                files[entry.name] = entry.stat().st_size
+
+    return files, directories
+
+
+class ManifestEntry:
+
+    """
+        Not intended for outside use
+
+        Local state of a single sample which belongs to the dataset
+
+        Properties
+        ----------
+        lastModified : float
+            timestamp of the last modification of the sample on Coretex.ai
+        size : int
+            size of the downloaded sample file
+        decrypted : bool
+            True if the sample was decrypted (or is not encrypted)
+        links : List[str]
+            names of the files linked into the dataset directory
+    """
+
+    def __init__(self, lastModified: float, size: int, decrypted: bool, links: List[str]) -> None:
+        self.lastModified = lastModified
+        self.size = size
+        self.decrypted = decrypted
+        self.links = links
+
+    def encode(self) -> Dict[str, Any]:
+        return {
+            "lastModified": self.lastModified,
+            "size": self.size,
+            "decrypted": self.decrypted,
+            "links": self.links
+        }
+
+    @classmethod
+    def decode(cls, value: Dict[str, Any]) -> Self:
+        return cls(float(value["lastModified"]), int(value["size"]), bool(value["decrypted"]), list(value["links"]))
+
+
+class DatasetManifest:
+
+    """
+        Not intended for outside use
+
+        Records which samples of a dataset are stored locally, so the
+        next download of the dataset transfers only the samples which
+        were added or modified since the last download.
+
+        Properties
+        ----------
+        path : Path
+            path to the manifest file
+        entries : Dict[int, ManifestEntry]
+            local state of the samples, mapped by sample id
+    """
+
+    def __init__(self, path: Path, entries: Optional[Dict[int, ManifestEntry]] = None) -> None:
+        if entries is None:
+            entries = {}
+
+        self.path = path
+        self.entries = entries
+
+        self._lock = Lock()
+
+    @classmethod
+    def load(cls, datasetPath: Path) -> Self:
+        path = datasetPath / MANIFEST_FILE_NAME
+        if not path.exists():
+            return cls(path)
+
+        try:
+            with path.open("r") as file:
+                data = json.load(file)
+
+            if data["version"] != MANIFEST_VERSION:
+                return cls(path)
+
+            entries = { int(sampleId): ManifestEntry.decode(entry) for sampleId, entry in data["samples"].items() }
+            return cls(path, entries)
+        except (ValueError, KeyError, TypeError) as exception:
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Ignoring invalid dataset manifest \"{path}\"", exc_info = exception)
+            return cls(path)
+
+    def isUpToDate(self, sample: NetworkSample, decrypt: bool, existingFiles: Set[str], storedFiles: Dict[str, int]) -> bool:
+        """
+            Checks if the local copy of the sample matches the sample on Coretex.ai
+
+            Parameters
+            ----------
+            sample : NetworkSample
+                sample from the dataset fetched from Coretex.ai
+            decrypt : bool
+                True if the sample should be decrypted
+            existingFiles : Set[str]
+                names of files inside the dataset directory
+            storedFiles : Dict[str, int]
+                sizes of files inside the samples folder (see "listStoredSamples")
+        """
+
+        entry = self.entries.get(sample.id)
+        if entry is None:
+            return False
+
+        if entry.lastModified != sample.lastModified.timestamp():
+            return False
+
+        if decrypt and sample.isEncrypted and not entry.decrypted:
+            return False
+
+        if sample.downloadPath.name not in storedFiles and sample.zipPath.name not in storedFiles:
+            return False
+
+        if not self.isIntact(sample, storedFiles):
+            return False
+
+        return len(entry.links) > 0 and all(link in existingFiles for link in entry.links)
+
+    def isIntact(self, sample: NetworkSample, storedFiles: Dict[str, int]) -> bool:
+        """
+            Checks if the stored sample file has the same size it had
+            once it was downloaded, file which was truncated or only partially
+            written is not intact. Returns True if the sample is not stored.
+        """
+
+        entry = self.entries.get(sample.id)
+        if entry is None:
+            return True
+
+        # Encrypted file is not stored if the sample was downloaded using "streamDownload"
+        size = storedFiles.get(sample.downloadPath.name, storedFiles.get(sample.zipPath.name))
+        if size is None:
+            return True
+
+        return size == entry.size
+
+    def update(self, sample: NetworkSample, links: List[Path]) -> None:
+        try:
+            size = sample.downloadPath.stat().st_size
+        except FileNotFoundError:
+            # Encrypted file is not stored if the sample was downloaded using "streamDownload"
+            size = sample.zipPath.stat().st_size
+
+        entry = ManifestEntry(
+            sample.lastModified.timestamp(),
+            size,
+            not sample.isEncrypted or sample.zipPath.exists(),
+            [link.name for link in links]
+        )
+
+        with self._lock:
+            self.entries[sample.id] = entry
+
+    def remove(self, sampleId: int) -> Optional[ManifestEntry]:
+        with self._lock:
+            return self.entries.pop(sampleId, None)
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "version": MANIFEST_VERSION,
+                "samples": { str(sampleId): entry.encode() for sampleId, entry in self.entries.items() }
+            }
+
+        tempPath = self.path.with_name(f"{self.path.name}.tmp")
+        with tempPath.open("w") as file:
+            json.dump(data, file)
+
+        os.replace(tempPath, self.path)
@@ -17,4 +17,6 @@
 
 from .image_dataset import ImageDataset
 from .local_image_dataset import LocalImageDataset
+from .tensor_cache import ImageTensorCache
+from .mask_cache import SegmentationMaskCache, MaskType, MaskStorage
 from .synthetic_image_generator import augmentDataset
@@ -18,13 +18,18 @@
 from typing import TypeVar, Generic, Optional, List
 from pathlib import Path
 
+import os
 import json
 
-from ...sample import Sample
+import numpy as np
+
+from .tensor_cache import ImageTensorCache, TENSOR_CACHE_FOLDER_NAME
+from .mask_cache import SegmentationMaskCache, MaskType, MaskStorage, MASK_CACHE_FOLDER_NAME, rasterizeMasks
+from ...sample import LocalImageSample
 from ...annotation import ImageDatasetClass, ImageDatasetClasses
 
 
-SampleType = TypeVar("SampleType", bound = "Sample")
+SampleType = TypeVar("SampleType", bound = "LocalImageSample")
 
 
 class BaseImageDataset(Generic[SampleType]):
@@ -84,3 +89,150 @@ class BaseImageDataset(Generic[SampleType]):
         self._writeClassesToFile()
 
         return True
+
+    def buildTensorCache(self, width: int, height: int, workers: Optional[int] = None, ignoreCache: bool = False) -> ImageTensorCache:
+        """
+            Decodes, resizes and pads (using "load" of the sample with
+            "targetSize") images of all samples in parallel and stores them in
+            a memory mapped array inside the dataset directory. Cache is
+            created only once for every image size, and is recreated only if
+            samples of the dataset were changed.
+            Images loaded from the cache are not decoded nor copied, which
+            makes repeated iteration over the dataset (multiple epochs,
+            multiple trainings) much faster.
+
+            Network samples which are not downloaded are downloaded first.
+
+            Parameters
+            ----------
+            width : int
+                width of the cached images
+            height : int
+                height of the cached images
+            workers : Optional[int]
+                number of images which are processed in parallel,
+                number of CPU cores is used if not provided
+            ignoreCache : bool
+                if True cache is recreated even if it is up to date
+
+            Returns
+            -------
+            ImageTensorCache -> cache with images of the dataset samples
+
+            Example
+            -------
+            >>> cache = dataset.buildTensorCache(640, 640)
+            >>> for epoch in range(epochs):
+                    for sample in dataset.samples:
+                        image = cache.image(sample)
+        """
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        path = self.path / TENSOR_CACHE_FOLDER_NAME / f"{width}x{height}"
+
+        if not ignoreCache:
+            cache = ImageTensorCache.load(path)
+            if cache is not None and cache.isValidFor(self.samples):
+                return cache
+
+        return ImageTensorCache.build(path, self.samples, width, height, workers)
+
+    def extractSegmentationMasks(
+        self,
+        maskType: MaskType = MaskType.label,
+        downscale: int = 1,
+        workers: Optional[int] = None,
+        useProcesses: bool = True
+    ) -> List[np.ndarray]:
+
+        """
+            Rasterizes segmentation masks of all samples in parallel.
+            Only annotations of the samples are loaded, images are not decoded.
+
+            Network samples which are not downloaded are downloaded first.
+
+            Parameters
+            ----------
+            maskType : MaskType
+                label masks contain label id of the class + 1 (same as
+                "AnnotatedImageSampleData.extractSegmentationMask"), instance
+                masks contain index of the instance inside the annotation + 1
+            downscale : int
+                factor by which masks are smaller than the images
+            workers : Optional[int]
+                number of samples which are processed in parallel,
+                number of CPU cores is used if not provided
+            useProcesses : bool
+                if True masks are rasterized in separate processes, otherwise threads are used
+
+            Returns
+            -------
+            List[np.ndarray] -> masks in the same order as dataset samples
+
+            Raises
+            ------
+            ValueError -> if a sample does not have an annotation
+        """
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        return list(rasterizeMasks(self.samples, self.classes, maskType, downscale, workers, useProcesses))
+
+    def buildMaskCache(
+        self,
+        maskType: MaskType = MaskType.label,
+        storage: MaskStorage = MaskStorage.memmap,
+        downscale: int = 1,
+        workers: Optional[int] = None,
+        useProcesses: bool = True,
+        ignoreCache: bool = False
+    ) -> SegmentationMaskCache:
+
+        """
+            Rasterizes segmentation masks of all samples in parallel (see
+            "extractSegmentationMasks") and stores them inside the dataset
+            directory. Cache is created only once for every mask type, storage
+            and downscale factor, and is recreated only if samples or classes
+            of the dataset were changed.
+
+            Parameters
+            ----------
+            maskType : MaskType
+                pixel values of the masks
+            storage : MaskStorage
+                masks are stored either in a single memory mapped file or as PNG images
+            downscale : int
+                factor by which masks are smaller than the images
+            workers : Optional[int]
+                number of samples which are processed in parallel,
+                number of CPU cores is used if not provided
+            useProcesses : bool
+                if True masks are rasterized in separate processes, otherwise threads are used
+            ignoreCache : bool
+                if True cache is recreated even if it is up to date
+
+            Returns
+            -------
+            SegmentationMaskCache -> cache with masks of the dataset samples
+
+            Example
+            -------
+            >>> masks = dataset.buildMaskCache(downscale = 2)
+            >>> for sample in dataset.samples:
+                    mask = masks.mask(sample)
+        """
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        path = self.path / MASK_CACHE_FOLDER_NAME / f"{maskType.value}-{storage.value}-{downscale}"
+
+        if not ignoreCache:
+            cache = SegmentationMaskCache.load(path)
+            if cache is not None and cache.isValidFor(self.samples, self.classes):
+                return cache
+
+        return SegmentationMaskCache.build(path, self.samples, self.classes, maskType, storage, downscale, workers, useProcesses)
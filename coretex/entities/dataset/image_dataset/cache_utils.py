@@ -0,0 +1,49 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import List
+
+from ...sample import LocalImageSample, NetworkSample
+
+
+INDEX_FILE_NAME = "index.json"
+
+
+def sampleKey(sample: LocalImageSample) -> str:
+    """
+        Not intended for outside use
+
+        Identifies the sample inside of the dataset caches
+    """
+
+    if isinstance(sample, NetworkSample):
+        return str(sample.id)
+
+    return sample.name
+
+
+def sampleFingerprint(sample: LocalImageSample) -> List[float]:
+    """
+        Not intended for outside use
+
+        Changes every time the sample is modified, used
+        to detect cache entries which are out of date
+    """
+
+    # Sample archive is replaced every time the sample is modified
+    stat = sample.zipPath.stat()
+    return [stat.st_size, stat.st_mtime]
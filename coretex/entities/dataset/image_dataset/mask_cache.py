@@ -0,0 +1,518 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, List, Dict, Any, Tuple, Union, Sequence, Iterator
+from typing_extensions import Self
+from pathlib import Path
+from enum import Enum
+from functools import partial
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+import os
+import json
+import time
+import shutil
+import logging
+
+from PIL import Image, ImageDraw
+
+import numpy as np
+
+from .cache_utils import INDEX_FILE_NAME, sampleKey, sampleFingerprint
+from ...sample import LocalImageSample, NetworkSample
+from ...annotation import CoretexImageAnnotation, ImageDatasetClasses
+
+
+MASK_CACHE_VERSION = 1
+MASK_CACHE_FOLDER_NAME = ".mask-cache"
+MASKS_FILE_NAME = "masks.bin"
+MASKS_FOLDER_NAME = "masks"
+
+# Number of samples which are sent to a worker process at once
+RASTERIZE_CHUNK_SIZE = 16
+
+
+class MaskType(Enum):
+
+    """
+        Pixel values of segmentation masks
+    """
+
+    # Label id of the instance class + 1, 0 is background
+    label = "label"
+
+    # Index of the instance inside the annotation + 1, 0 is background
+    instance = "instance"
+
+
+class MaskStorage(Enum):
+
+    """
+        How segmentation masks are stored inside the mask cache
+    """
+
+    # Single memory mapped file with all masks
+    memmap = "memmap"
+
+    # Single PNG image for every mask
+    png = "png"
+
+
+def labelIdMapping(classes: ImageDatasetClasses) -> Dict[str, int]:
+    """
+        Maps class ids to pixel values of label masks, value is the same
+        as the one used by "CoretexImageAnnotation.extractSegmentationMask"
+    """
+
+    labels = classes.labels
+    return { str(classId): labels.index(clazz.label) + 1 for clazz in classes for classId in clazz.classIds }
+
+
+def maskDtype(maskType: MaskType, classes: ImageDatasetClasses) -> np.dtype:
+    if maskType == MaskType.label and len(classes) < 255:
+        return np.dtype(np.uint8)
+
+    return np.dtype(np.uint16)
+
+
+def maskSize(annotation: CoretexImageAnnotation, downscale: int) -> Tuple[int, int]:
+    """
+        Returns
+        -------
+        Tuple[int, int] -> width and height of the mask, the same as
+        the size of the image reduced using "Image.reduce(downscale)"
+    """
+
+    return max(1, -(-annotation.width // downscale)), max(1, -(-annotation.height // downscale))
+
+
+def rasterizeMask(
+    annotation: CoretexImageAnnotation,
+    labelIds: Dict[str, int],
+    maskType: MaskType,
+    downscale: int = 1,
+    dtype: np.dtype = np.dtype(np.uint8)
+) -> np.ndarray:
+
+    """
+        Draws all instances of the annotation into a single mask. Instances
+        are drawn in the order in which they are stored in the annotation,
+        so later instances overwrite the earlier ones where they overlap.
+        Label masks skip instances whose class is not in "labelIds".
+
+        Parameters
+        ----------
+        annotation : CoretexImageAnnotation
+            annotation of the image
+        labelIds : Dict[str, int]
+            pixel values of label masks, mapped by class id (see "labelIdMapping")
+        maskType : MaskType
+            pixel values of the mask
+        downscale : int
+            factor by which the mask is smaller than the image
+        dtype : np.dtype
+            type of the mask values, uint8 or uint16
+
+        Returns
+        -------
+        np.ndarray -> mask with shape (height, width)
+
+        Raises
+        ------
+        ValueError -> if segmentation has less then 4 values or
+        mask value cannot be represented using dtype
+    """
+
+    maxValue = np.iinfo(dtype).max
+
+    # Pillow does not support drawing onto 16 bit images
+    image = Image.new("L" if dtype == np.uint8 else "I", maskSize(annotation, downscale))
+    draw = ImageDraw.Draw(image)
+
+    for index, instance in enumerate(annotation.instances):
+        if maskType == MaskType.label:
+            value = labelIds.get(str(instance.classId))
+            if value is None:
+                continue
+        else:
+            value = index + 1
+
+        if value > maxValue:
+            raise ValueError(f">> [Coretex] Mask value {value} is out of range for \"{dtype}\" masks")
+
+        instance._drawSegmentations(draw, value, downscale)
+
+    return np.asarray(image).astype(dtype, copy = False)
+
+
+def _rasterizeSample(
+    sample: LocalImageSample,
+    labelIds: Dict[str, int],
+    maskType: MaskType,
+    downscale: int,
+    dtype: np.dtype
+) -> np.ndarray:
+
+    # Image is not decoded, only the annotation is needed
+    annotation = sample.load(lazy = True).annotation
+    if annotation is None:
+        raise ValueError(f">> [Coretex] Sample \"{sample.name}\" does not have an annotation")
+
+    return rasterizeMask(annotation, labelIds, maskType, downscale, dtype)
+
+
+def _rasterizeSampleToPng(
+    sample: LocalImageSample,
+    path: Path,
+    labelIds: Dict[str, int],
+    maskType: MaskType,
+    downscale: int,
+    dtype: np.dtype
+) -> Tuple[int, int]:
+
+    mask = _rasterizeSample(sample, labelIds, maskType, downscale, dtype)
+    Image.fromarray(mask).save(path)
+
+    height, width = mask.shape
+    return height, width
+
+
+def _createExecutor(workers: int, useProcesses: bool) -> Executor:
+    if workers <= 0:
+        raise ValueError(f">> [Coretex] Invalid \"workers\" value \"{workers}\". Value must be greater than 0")
+
+    if useProcesses:
+        return ProcessPoolExecutor(max_workers = workers)
+
+    return ThreadPoolExecutor(max_workers = workers)
+
+
+def _prepareSamples(samples: Sequence[LocalImageSample]) -> None:
+    for sample in samples:
+        if isinstance(sample, NetworkSample):
+            sample.download()
+
+
+def rasterizeMasks(
+    samples: Sequence[LocalImageSample],
+    classes: ImageDatasetClasses,
+    maskType: MaskType,
+    downscale: int,
+    workers: int,
+    useProcesses: bool = True
+) -> Iterator[np.ndarray]:
+
+    """
+        Rasterizes masks of the provided samples in parallel
+
+        Returns
+        -------
+        Iterator[np.ndarray] -> masks in the same order as samples
+    """
+
+    if downscale < 1:
+        raise ValueError(f">> [Coretex] Invalid \"downscale\" value \"{downscale}\". Value must be at least 1")
+
+    _prepareSamples(samples)
+
+    rasterize = partial(
+        _rasterizeSample,
+        labelIds = labelIdMapping(classes),
+        maskType = maskType,
+        downscale = downscale,
+        dtype = maskDtype(maskType, classes)
+    )
+
+    with _createExecutor(workers, useProcesses) as executor:
+        yield from executor.map(rasterize, samples, chunksize = RASTERIZE_CHUNK_SIZE)
+
+
+class SegmentationMaskCache:
+
+    """
+        Segmentation masks of the dataset samples which were rasterized
+        from their annotations and stored inside the dataset directory.
+        Masks are stored either in a single memory mapped file, in which
+        case loading a mask does not copy the data, or as PNG images.
+
+        Cache is created using "buildMaskCache" of the image dataset.
+
+        Properties
+        ----------
+        path : Path
+            directory where the cache is stored
+        maskType : MaskType
+            pixel values of the cached masks
+        storage : MaskStorage
+            how masks are stored
+        downscale : int
+            factor by which masks are smaller than the images
+        dtype : np.dtype
+            type of the mask values
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        maskType: MaskType,
+        storage: MaskStorage,
+        downscale: int,
+        dtype: np.dtype,
+        labelIds: Dict[str, int],
+        entries: List[Dict[str, Any]],
+        masks: Optional[np.ndarray] = None
+    ) -> None:
+
+        self.path = path
+        self.maskType = maskType
+        self.storage = storage
+        self.downscale = downscale
+        self.dtype = dtype
+
+        self._labelIds = labelIds
+        self._entries = entries
+        self._rows = { entry["key"]: row for row, entry in enumerate(entries) }
+        self._masks = masks
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, sample: Any) -> bool:
+        return isinstance(sample, LocalImageSample) and sampleKey(sample) in self._rows
+
+    def rowOf(self, sample: LocalImageSample) -> int:
+        """
+            Returns
+            -------
+            int -> index of the cached mask of the sample
+
+            Raises
+            ------
+            KeyError -> if the sample is not cached
+        """
+
+        return self._rows[sampleKey(sample)]
+
+    def mask(self, sample: Union[LocalImageSample, int]) -> np.ndarray:
+        """
+            Returns the cached mask of the sample, masks stored in the memory
+            mapped file are a read-only view of the file and are not copied
+
+            Parameters
+            ----------
+            sample : Union[LocalImageSample, int]
+                sample or the row of the sample
+
+            Returns
+            -------
+            np.ndarray -> mask with shape (height, width)
+
+            Raises
+            ------
+            KeyError -> if the sample is not cached
+        """
+
+        row = sample if isinstance(sample, int) else self.rowOf(sample)
+        entry = self._entries[row]
+        height, width = entry["shape"]
+
+        if self.storage == MaskStorage.png:
+            with Image.open(self.path / MASKS_FOLDER_NAME / f"{row}.png") as image:
+                return np.asarray(image).astype(self.dtype, copy = False)
+
+        if self._masks is None:
+            raise RuntimeError(">> [Coretex] Memory mapped masks are not loaded")
+
+        offset = entry["offset"]
+
+        mask: np.ndarray = self._masks[offset:offset + height * width].reshape(height, width)
+        return mask
+
+    def isValidFor(self, samples: Sequence[LocalImageSample], classes: ImageDatasetClasses) -> bool:
+        """
+            Checks if the cache contains up to date masks of all provided samples
+        """
+
+        if len(samples) != len(self._entries):
+            return False
+
+        if self.maskType == MaskType.label and self._labelIds != labelIdMapping(classes):
+            return False
+
+        if self.dtype != maskDtype(self.maskType, classes):
+            return False
+
+        for sample in samples:
+            row = self._rows.get(sampleKey(sample))
+            if row is None or not sample.zipPath.exists():
+                return False
+
+            if self._entries[row]["fingerprint"] != sampleFingerprint(sample):
+                return False
+
+        return True
+
+    @classmethod
+    def load(cls, path: Path) -> Optional[Self]:
+        """
+            Loads the cache stored in the provided directory
+
+            Returns
+            -------
+            Optional[SegmentationMaskCache] -> loaded cache, None if the
+            cache does not exist or it is not valid
+        """
+
+        indexPath = path / INDEX_FILE_NAME
+        if not indexPath.exists():
+            return None
+
+        try:
+            with indexPath.open("r") as file:
+                index = json.load(file)
+
+            if index["version"] != MASK_CACHE_VERSION:
+                return None
+
+            maskType = MaskType(index["maskType"])
+            storage = MaskStorage(index["storage"])
+            downscale = int(index["downscale"])
+            dtype = np.dtype(index["dtype"])
+            labelIds = { str(key): int(value) for key, value in index["labelIds"].items() }
+            entries = list(index["samples"])
+
+            masks: Optional[np.ndarray] = None
+
+            if storage == MaskStorage.memmap:
+                masksPath = path / MASKS_FILE_NAME
+                expectedSize = sum(height * width for height, width in (entry["shape"] for entry in entries))
+
+                if not masksPath.exists() or masksPath.stat().st_size != expectedSize * dtype.itemsize:
+                    return None
+
+                # Empty files cannot be memory mapped
+                masks = np.memmap(masksPath, dtype = dtype, mode = "r") if expectedSize > 0 else np.empty(0, dtype = dtype)
+            elif not (path / MASKS_FOLDER_NAME).is_dir():
+                return None
+
+            return cls(path, maskType, storage, downscale, dtype, labelIds, entries, masks)
+        except (ValueError, KeyError, TypeError) as exception:
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Ignoring invalid mask cache \"{path}\"", exc_info = exception)
+            return None
+
+    @classmethod
+    def build(
+        cls,
+        path: Path,
+        samples: Sequence[LocalImageSample],
+        classes: ImageDatasetClasses,
+        maskType: MaskType,
+        storage: MaskStorage,
+        downscale: int,
+        workers: int,
+        useProcesses: bool = True
+    ) -> Self:
+
+        """
+            Rasterizes masks of the provided samples in parallel and stores
+            them into the cache in the provided directory. Existing cache
+            in the directory is replaced.
+
+            Returns
+            -------
+            SegmentationMaskCache -> created cache
+        """
+
+        if downscale < 1:
+            raise ValueError(f">> [Coretex] Invalid \"downscale\" value \"{downscale}\". Value must be at least 1")
+
+        start = time.perf_counter()
+
+        # Cache is written to a temporary directory which replaces
+        # the existing cache only once all masks were stored
+        tempPath = path.with_name(f"{path.name}.tmp")
+        if tempPath.exists():
+            shutil.rmtree(tempPath)
+
+        tempPath.mkdir(parents = True)
+
+        labelIds = labelIdMapping(classes)
+        dtype = maskDtype(maskType, classes)
+        entries: List[Dict[str, Any]] = []
+
+        try:
+            if storage == MaskStorage.png:
+                masksPath = tempPath / MASKS_FOLDER_NAME
+                masksPath.mkdir()
+
+                _prepareSamples(samples)
+                entries = [{ "key": sampleKey(sample), "fingerprint": sampleFingerprint(sample) } for sample in samples]
+
+                rasterize = partial(_rasterizeSampleToPng, labelIds = labelIds, maskType = maskType, downscale = downscale, dtype = dtype)
+                paths = [masksPath / f"{row}.png" for row in range(len(samples))]
+
+                with _createExecutor(workers, useProcesses) as executor:
+                    for entry, shape in zip(entries, executor.map(rasterize, samples, paths, chunksize = RASTERIZE_CHUNK_SIZE)):
+                        entry["shape"] = list(shape)
+            else:
+                offset = 0
+
+                # Masks have different sizes so they are written one after another
+                # and the cache stores the offset and the shape of every mask
+                with (tempPath / MASKS_FILE_NAME).open("wb") as file:
+                    masks = rasterizeMasks(samples, classes, maskType, downscale, workers, useProcesses)
+
+                    for sample, mask in zip(samples, masks):
+                        file.write(np.ascontiguousarray(mask).tobytes())
+
+                        entries.append({
+                            "key": sampleKey(sample),
+                            "fingerprint": sampleFingerprint(sample),
+                            "shape": list(mask.shape),
+                            "offset": offset
+                        })
+
+                        offset += mask.size
+
+            index = {
+                "version": MASK_CACHE_VERSION,
+                "maskType": maskType.value,
+                "storage": storage.value,
+                "downscale": downscale,
+                "dtype": dtype.name,
+                "labelIds": labelIds,
+                "samples": entries
+            }
+
+            with (tempPath / INDEX_FILE_NAME).open("w") as file:
+                json.dump(index, file)
+
+            if path.exists():
+                shutil.rmtree(path)
+
+            os.replace(tempPath, path)
+        except BaseException:
+            shutil.rmtree(tempPath, ignore_errors = True)
+            raise
+
+        logging.getLogger("coretexpylib").info(f">> [Coretex] Rasterized {len(samples)} {maskType.value} masks in {time.perf_counter() - start:.2f}s")
+
+        cache = cls.load(path)
+        if cache is None:
+            raise RuntimeError(f">> [Coretex] Failed to load created mask cache \"{path}\"")
+
+        return cache
@@ -0,0 +1,272 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, List, Dict, Any, Tuple, Union, Sequence
+from typing_extensions import Self
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import os
+import json
+import time
+import shutil
+import logging
+
+import numpy as np
+
+from .cache_utils import INDEX_FILE_NAME, sampleKey, sampleFingerprint
+from ...sample import LocalImageSample, NetworkSample
+
+
+TENSOR_CACHE_VERSION = 2
+TENSOR_CACHE_FOLDER_NAME = ".tensor-cache"
+IMAGES_FILE_NAME = "images.npy"
+
+
+class ImageTensorCache:
+
+    """
+        Images of the dataset which were decoded, resized and padded
+        (using "load" with "targetSize") to the same size and stored in a single
+        memory mapped array. Image of a sample is a row of the array, so loading
+        it does not decode the image file nor copy the data.
+
+        Cache is created using "buildTensorCache" of the image dataset.
+
+        Properties
+        ----------
+        path : Path
+            directory where the cache is stored
+        width : int
+            width of the cached images
+        height : int
+            height of the cached images
+        images : np.ndarray
+            read-only memory mapped array of images with
+            shape (sampleCount, height, width, 3) and type uint8
+    """
+
+    def __init__(self, path: Path, width: int, height: int, images: np.ndarray, entries: List[Dict[str, Any]]) -> None:
+        self.path = path
+        self.width = width
+        self.height = height
+        self.images = images
+
+        self._entries = entries
+        self._rows = { entry["key"]: row for row, entry in enumerate(entries) }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, sample: Any) -> bool:
+        return isinstance(sample, LocalImageSample) and sampleKey(sample) in self._rows
+
+    def rowOf(self, sample: LocalImageSample) -> int:
+        """
+            Returns
+            -------
+            int -> row of the "images" array which contains the image of the sample
+
+            Raises
+            ------
+            KeyError -> if the sample is not cached
+        """
+
+        return self._rows[sampleKey(sample)]
+
+    def image(self, sample: Union[LocalImageSample, int]) -> np.ndarray:
+        """
+            Returns the cached image of the sample, image is
+            a view of the memory mapped array and is not copied
+
+            Parameters
+            ----------
+            sample : Union[LocalImageSample, int]
+                sample or the row of the sample
+
+            Returns
+            -------
+            np.ndarray -> read-only image with shape (height, width, 3)
+
+            Raises
+            ------
+            KeyError -> if the sample is not cached
+        """
+
+        row = sample if isinstance(sample, int) else self.rowOf(sample)
+
+        image: np.ndarray = self.images[row]
+        return image
+
+    def padding(self, sample: Union[LocalImageSample, int]) -> Tuple[int, int]:
+        """
+            Returns
+            -------
+            Tuple[int, int] -> number of pixels of padding from top/bottom
+            and left/right which was added when the image was resized
+
+            Raises
+            ------
+            KeyError -> if the sample is not cached
+        """
+
+        row = sample if isinstance(sample, int) else self.rowOf(sample)
+        top, left = self._entries[row]["padding"]
+
+        return top, left
+
+    def isValidFor(self, samples: Sequence[LocalImageSample]) -> bool:
+        """
+            Checks if the cache contains up to date images of all provided samples
+        """
+
+        if len(samples) != len(self._entries):
+            return False
+
+        for sample in samples:
+            row = self._rows.get(sampleKey(sample))
+            if row is None or not sample.zipPath.exists():
+                return False
+
+            if self._entries[row]["fingerprint"] != sampleFingerprint(sample):
+                return False
+
+        return True
+
+    @classmethod
+    def load(cls, path: Path) -> Optional[Self]:
+        """
+            Loads the cache stored in the provided directory
+
+            Returns
+            -------
+            Optional[ImageTensorCache] -> loaded cache, None if the cache
+            does not exist or it is not valid
+        """
+
+        indexPath = path / INDEX_FILE_NAME
+        imagesPath = path / IMAGES_FILE_NAME
+
+        if not indexPath.exists() or not imagesPath.exists():
+            return None
+
+        try:
+            with indexPath.open("r") as file:
+                index = json.load(file)
+
+            if index["version"] != TENSOR_CACHE_VERSION:
+                return None
+
+            width, height = int(index["width"]), int(index["height"])
+            entries = list(index["samples"])
+
+            images = np.load(imagesPath, mmap_mode = "r")
+            if images.shape != (len(entries), height, width, 3):
+                return None
+
+            return cls(path, width, height, images, entries)
+        except (ValueError, KeyError, TypeError) as exception:
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Ignoring invalid tensor cache \"{path}\"", exc_info = exception)
+            return None
+
+    @classmethod
+    def build(cls, path: Path, samples: Sequence[LocalImageSample], width: int, height: int, workers: int) -> Self:
+        """
+            Decodes, resizes and pads images of the provided samples in parallel
+            and stores them into the cache in the provided directory. Existing
+            cache in the directory is replaced.
+
+            Returns
+            -------
+            ImageTensorCache -> created cache
+        """
+
+        if width <= 0 or height <= 0:
+            raise ValueError(f">> [Coretex] Invalid tensor cache image size \"{width}x{height}\"")
+
+        if workers <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"workers\" value \"{workers}\". Value must be greater than 0")
+
+        start = time.perf_counter()
+
+        # Cache is written to a temporary directory which replaces
+        # the existing cache only once all images were stored
+        tempPath = path.with_name(f"{path.name}.tmp")
+        if tempPath.exists():
+            shutil.rmtree(tempPath)
+
+        tempPath.mkdir(parents = True)
+
+        images = np.lib.format.open_memmap(  # type: ignore[no-untyped-call]
+            tempPath / IMAGES_FILE_NAME,
+            mode = "w+",
+            dtype = np.uint8,
+            shape = (len(samples), height, width, 3)
+        )
+        entries: List[Dict[str, Any]] = [{} for _ in samples]
+
+        def store(row: int, sample: LocalImageSample) -> None:
+            if isinstance(sample, NetworkSample):
+                sample.download()
+
+            # Images are decoded at a reduced resolution if the format supports it
+            data = sample.load(targetSize = (width, height))
+            top, left = data.padding
+
+            images[row] = data.image
+
+            entries[row] = {
+                "key": sampleKey(sample),
+                "fingerprint": sampleFingerprint(sample),
+                "padding": [top, left]
+            }
+
+        try:
+            with ThreadPoolExecutor(max_workers = workers) as executor:
+                futures = [executor.submit(store, row, sample) for row, sample in enumerate(samples)]
+
+            for future in futures:
+                future.result()
+
+            images.flush()
+            del images
+
+            index = {
+                "version": TENSOR_CACHE_VERSION,
+                "width": width,
+                "height": height,
+                "samples": entries
+            }
+
+            with (tempPath / INDEX_FILE_NAME).open("w") as file:
+                json.dump(index, file)
+
+            if path.exists():
+                shutil.rmtree(path)
+
+            os.replace(tempPath, path)
+        except BaseException:
+            shutil.rmtree(tempPath, ignore_errors = True)
+            raise
+
+        logging.getLogger("coretexpylib").info(f">> [Coretex] Cached {len(samples)} images ({width}x{height}) in {time.perf_counter() - start:.2f}s")
+
+        cache = cls.load(path)
+        if cache is None:
+            raise RuntimeError(f">> [Coretex] Failed to load created tensor cache \"{path}\"")
+
+        return cache
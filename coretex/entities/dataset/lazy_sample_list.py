@@ -0,0 +1,264 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Optional, Sequence, Type, TypeVar, Union, overload
+from collections import OrderedDict
+from threading import Lock
+
+import logging
+
+from ..sample import NetworkSample
+
+
+SampleType = TypeVar("SampleType", bound = "NetworkSample")
+
+DEFAULT_SAMPLE_PAGE_SIZE = 1000
+DEFAULT_MAX_CACHED_PAGES = 64
+
+
+class LazySampleList(Generic[SampleType], Sequence[SampleType]):
+
+    """
+        List of dataset samples which fetches samples from Coretex.ai
+        page by page, only once they are accessed. Used for datasets
+        with a large number of samples, where fetching and decoding all
+        samples when the dataset is fetched would be too slow.
+
+        Samples which are appended to the list (e.g. using NetworkDataset.add)
+        are kept in memory. Any other modification fetches all samples and
+        the list continues to work as a regular list.
+
+        Properties
+        ----------
+        sampleType : Type[SampleType]
+            type of samples in the dataset
+        datasetId : int
+            id of the dataset to which the samples belong
+        pageSize : int
+            number of samples fetched with a single request
+        fields : Optional[List[str]]
+            if not None only these fields of the samples are fetched
+        maxCachedPages : Optional[int]
+            maximum number of pages kept in memory, if None all fetched pages are kept
+    """
+
+    def __init__(
+        self,
+        sampleType: Type[SampleType],
+        datasetId: int,
+        count: Optional[int] = None,
+        pageSize: int = DEFAULT_SAMPLE_PAGE_SIZE,
+        fields: Optional[List[str]] = None,
+        maxCachedPages: Optional[int] = DEFAULT_MAX_CACHED_PAGES
+    ) -> None:
+
+        if pageSize <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"pageSize\" value \"{pageSize}\". Value must be greater than 0")
+
+        if maxCachedPages is not None and maxCachedPages <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"maxCachedPages\" value \"{maxCachedPages}\". Value must be greater than 0")
+
+        self.sampleType = sampleType
+        self.datasetId = datasetId
+        self.pageSize = pageSize
+        self.fields = fields
+        self.maxCachedPages = maxCachedPages
+
+        self._remoteCount = count
+        self._pages: "OrderedDict[int, List[SampleType]]" = OrderedDict()
+        self._appended: List[SampleType] = []
+        self._materialized: Optional[List[SampleType]] = None
+        self._lock = Lock()
+
+    @property
+    def isMaterialized(self) -> bool:
+        """
+            Returns
+            -------
+            bool -> True if all samples were fetched because the list was modified
+        """
+
+        return self._materialized is not None
+
+    def configure(self, pageSize: int = DEFAULT_SAMPLE_PAGE_SIZE, fields: Optional[List[str]] = None) -> None:
+        """
+            Changes how samples are fetched, already fetched pages are dropped
+
+            Parameters
+            ----------
+            pageSize : int
+                number of samples fetched with a single request
+            fields : Optional[List[str]]
+                if not None only these fields of the samples are fetched
+        """
+
+        if pageSize <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"pageSize\" value \"{pageSize}\". Value must be greater than 0")
+
+        with self._lock:
+            self.pageSize = pageSize
+            self.fields = fields
+            self._pages.clear()
+
+    def _fetchPage(self, page: int) -> List[SampleType]:
+        parameters: Dict[str, Any] = {
+            "dataset_id": self.datasetId,
+            "page": page + 1,  # Pages on Coretex.ai start from 1
+            "page_size": self.pageSize
+        }
+
+        if self.fields is not None:
+            # Id is required to identify the sample
+            parameters["fields"] = ",".join(["id"] + [field for field in self.fields if field != "id"])
+
+        logging.getLogger("coretexpylib").debug(f">> [Coretex] Fetching page {page} of dataset {self.datasetId} samples")
+        return [self.sampleType.decode(value) for value in self.sampleType._fetchPage(parameters)]
+
+    def _page(self, page: int) -> List[SampleType]:
+        with self._lock:
+            samples = self._pages.get(page)
+            if samples is not None:
+                self._pages.move_to_end(page)
+                return samples
+
+        samples = self._fetchPage(page)
+
+        with self._lock:
+            self._pages[page] = samples
+
+            if self.maxCachedPages is not None and len(self._pages) > self.maxCachedPages:
+                self._pages.popitem(last = False)
+
+        return samples
+
+    def _countRemote(self) -> int:
+        if self._remoteCount is not None:
+            return self._remoteCount
+
+        # Dataset response did not contain the number of samples,
+        # it is counted by fetching pages until the last (partial) page
+        page = 0
+        count = 0
+
+        while True:
+            samples = self._page(page)
+            count += len(samples)
+
+            if len(samples) < self.pageSize:
+                break
+
+            page += 1
+
+        self._remoteCount = count
+        return count
+
+    def _remoteSample(self, index: int) -> SampleType:
+        samples = self._page(index // self.pageSize)
+
+        offset = index % self.pageSize
+        if offset >= len(samples):
+            # Sample was removed from the dataset after it was fetched
+            raise IndexError(f">> [Coretex] Sample at index {index} of dataset {self.datasetId} no longer exists")
+
+        return samples[offset]
+
+    def _materialize(self) -> List[SampleType]:
+        if self._materialized is None:
+            self._materialized = list(self)
+
+        return self._materialized
+
+    def __len__(self) -> int:
+        if self._materialized is not None:
+            return len(self._materialized)
+
+        return self._countRemote() + len(self._appended)
+
+    @overload
+    def __getitem__(self, index: int) -> SampleType:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[SampleType]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SampleType, List[SampleType]]:
+        if self._materialized is not None:
+            return self._materialized[index]
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        length = len(self)
+        if index < 0:
+            index += length
+
+        if index < 0 or index >= length:
+            raise IndexError(">> [Coretex] Sample index out of range")
+
+        remoteCount = self._countRemote()
+        if index >= remoteCount:
+            return self._appended[index - remoteCount]
+
+        return self._remoteSample(index)
+
+    def __iter__(self) -> Iterator[SampleType]:
+        if self._materialized is not None:
+            yield from self._materialized
+            return
+
+        remoteCount = self._countRemote()
+
+        for page in range((remoteCount + self.pageSize - 1) // self.pageSize):
+            samples = self._page(page)
+            yield from samples[:remoteCount - page * self.pageSize]
+
+            if len(samples) < self.pageSize:
+                break
+
+        yield from self._appended
+
+    def append(self, sample: SampleType) -> None:
+        if self._materialized is not None:
+            self._materialized.append(sample)
+        else:
+            self._appended.append(sample)
+
+    def extend(self, samples: Iterable[SampleType]) -> None:
+        for sample in samples:
+            self.append(sample)
+
+    def remove(self, sample: SampleType) -> None:
+        self._materialize().remove(sample)
+
+    def pop(self, index: int = -1) -> SampleType:
+        return self._materialize().pop(index)
+
+    def insert(self, index: int, sample: SampleType) -> None:
+        self._materialize().insert(index, sample)
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        self._materialize().sort(*args, **kwargs)
+
+    def __setitem__(self, index: int, sample: SampleType) -> None:
+        self._materialize()[index] = sample
+
+    def __delitem__(self, index: int) -> None:
+        del self._materialize()[index]
+
+    def __repr__(self) -> str:
+        return f"LazySampleList(datasetId = {self.datasetId}, count = {len(self)})"
@@ -110,7 +110,7 @@ class LocalDataset(Generic[SampleType], Dataset[SampleType]):
 
         return self.__path
 
-    def download(self, decrypt: bool = True, ignoreCache: bool = False) -> None:
+    def download(self, decrypt: bool = True, ignoreCache: bool = False, unzip: bool = False) -> None:
         logging.getLogger("coretexpylib").warning(">> [Coretex] Local dataset cannot be downloaded")
 
     def add(self, samplePath: Union[Path, str], sampleName: Optional[str] = None, **metadata: Any) -> SampleType:
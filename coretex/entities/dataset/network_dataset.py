@@ -15,34 +15,57 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Optional, TypeVar, Generic, List, Dict, Any, Type, Union
-from typing_extensions import Self
+from typing import Optional, TypeVar, Generic, List, Dict, Any, Type, Union, Iterator, Callable, Sequence, Set, Tuple, BinaryIO
+from typing_extensions import Self, Buffer
 from datetime import datetime
 from pathlib import Path
 from abc import ABC, abstractmethod
-from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from threading import Lock
+from zipfile import ZipFile, ZipInfo
 
+import io
+import os
+import shutil
 import hashlib
 import base64
 import logging
+import zipfile
 
 from .dataset import Dataset
 from .state import DatasetState
+from .dataset_manifest import DatasetManifest, listStoredSamples
+from .lazy_sample_list import LazySampleList, DEFAULT_SAMPLE_PAGE_SIZE
+from .sample_import_result import SampleImportResult
 from ..tag import EntityTagType, Taggable
 from ..sample import NetworkSample
+from ..sample.sample_link_index import linkSample, sampleLinkIndex
 from ..utils import isEntityNameValid
 from ..._folder_manager import folder_manager
 from ...codable import KeyDescriptor
 from ...networking import NetworkObject, \
-    fileChunkUpload, networkManager, NetworkRequestError
-from ...threading import MultithreadedDataProcessor
+    fileChunkUpload, StreamChunkUploadSession, networkManager, NetworkRequestError, DEFAULT_PAGE_SIZE
+from ...threading import Pipeline, PipelineStage
 from ...cryptography import aes, getProjectKey
-from ...utils.file import isArchive, archive
+from ...utils.file import isArchive
 
 
 SampleType = TypeVar("SampleType", bound = "NetworkSample")
 NAME_VALIDATION_MESSAGE = ">> [Coretex] Entity name is invalid. Requirements: alphanumeric characters (\"a-z\", and \"0-9\") and dash (\"-\") with length between 3 to 50"
 MAX_DATASET_NAME_LENGTH = 50
+DEFAULT_DOWNLOAD_WORKERS = 8
+DEFAULT_UNZIP_WORKERS = 4
+DEFAULT_IMPORT_WORKERS = 8
+ENCRYPTED_UPLOAD_CHUNK_SIZE = 16 * 1024 * 1024  # 16 MiB
+ENCRYPTION_BUFFER_SIZE = 1024 * 1024  # 1 MiB
+
+
+def _fileSize(getPath: Callable[[NetworkSample], Path]) -> Callable[[NetworkSample], int]:
+    def sizeOf(sample: NetworkSample) -> int:
+        path = getPath(sample)
+        return path.stat().st_size if path.exists() else 0
+
+    return sizeOf
 
 
 def _hashDependencies(dependencies: List[str]) -> str:
@@ -58,11 +81,11 @@ def _hashDependencies(dependencies: List[str]) -> str:
     return hashString
 
 
-def _chunkSampleImport(sampleType: Type[SampleType], sampleName: str, samplePath: Path, datasetId: int) -> SampleType:
+def _createSample(sampleType: Type[SampleType], sampleName: str, fileId: str, datasetId: int, samplePath: Path) -> SampleType:
     parameters = {
         "name": sampleName,
         "dataset_id": datasetId,
-        "file_id": fileChunkUpload(samplePath)
+        "file_id": fileId
     }
 
     response = networkManager.formData("session/import", parameters, timeout = (5, 300))
@@ -72,24 +95,125 @@ def _chunkSampleImport(sampleType: Type[SampleType], sampleName: str, samplePath
     return sampleType.decode(response.getJson(dict))
 
 
+def _chunkSampleImport(sampleType: Type[SampleType], sampleName: str, samplePath: Path, datasetId: int) -> SampleType:
+    fileId = fileChunkUpload(samplePath, journalDirectory = folder_manager.uploadsFolder)
+    return _createSample(sampleType, sampleName, fileId, datasetId, samplePath)
+
+
+class _EncryptedUploadWriter(io.RawIOBase):
+
+    # Encrypts written data and passes it to the upload session,
+    # IV is uploaded first so the result matches "aes.encryptFile"
+
+    def __init__(self, key: bytes, session: StreamChunkUploadSession) -> None:
+        super().__init__()
+
+        self._encryptor = aes.StreamEncryptor(key, chunkSize = ENCRYPTION_BUFFER_SIZE)
+        self._session = session
+        self._session.write(self._encryptor.iv)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Buffer) -> int:
+        data = bytes(data)
+
+        for encryptedData in self._encryptor.feed(data):
+            self._session.write(encryptedData)
+
+        return len(data)
+
+    def finish(self) -> None:
+        self._session.write(self._encryptor.flush())
+
+
+def _archiveMembers(samplePath: Path) -> List[Tuple[Path, ZipInfo]]:
+    # Same files and names as "archive" stores
+    if samplePath.is_file():
+        paths = [(samplePath, samplePath.name)]
+    else:
+        paths = [(path, str(path.relative_to(samplePath))) for path in samplePath.rglob("*") if path.is_file()]
+
+    return [(path, ZipInfo.from_file(path, name)) for path, name in paths]
+
+
+def _storedArchiveSize(members: List[ZipInfo]) -> int:
+    # Size of the archive which "ZipFile" writes to an unseekable stream without
+    # compression, it depends only on sizes and names of the files
+    offset = 0
+    centralDirectorySize = 0
+
+    for member in members:
+        try:
+            nameSize = len(member.filename.encode("ascii"))
+        except UnicodeEncodeError:
+            nameSize = len(member.filename.encode("utf-8"))
+
+        # Local header has a zip64 extra field if the file might exceed the limit,
+        # data descriptor follows the data since sizes are not known in advance
+        isZip64 = member.file_size * 1.05 > zipfile.ZIP64_LIMIT
+        headerOffset = offset
+        offset += 30 + nameSize + (20 if isZip64 else 0) + member.file_size + (24 if isZip64 else 16)
+
+        zip64Values = 0
+        if member.file_size > zipfile.ZIP64_LIMIT:
+            zip64Values += 2
+
+        if headerOffset > zipfile.ZIP64_LIMIT:
+            zip64Values += 1
+
+        centralDirectorySize += 46 + nameSize + (4 + 8 * zip64Values if zip64Values > 0 else 0)
+
+    size = offset + centralDirectorySize + 22
+
+    if len(members) > zipfile.ZIP_FILECOUNT_LIMIT or offset > zipfile.ZIP64_LIMIT or centralDirectorySize > zipfile.ZIP64_LIMIT:
+        # Zip64 end of central directory record and its locator
+        size += 56 + 20
+
+    return size
+
+
+def _writeStoredArchive(members: List[Tuple[Path, ZipInfo]], destination: BinaryIO) -> None:
+    with ZipFile(destination, "w", zipfile.ZIP_STORED) as zipFile:
+        for path, member in members:
+            with path.open("rb") as source, zipFile.open(member, "w") as target:
+                shutil.copyfileobj(source, target, ENCRYPTION_BUFFER_SIZE)
+
+
 def _encryptedSampleImport(sampleType: Type[SampleType], sampleName: str, samplePath: Path, datasetId: int, key: bytes) -> SampleType:
-    with ExitStack() as stack:
-        if isArchive(samplePath):
-            archivePath = samplePath
-        else:
-            archivePath = stack.enter_context(folder_manager.tempFile())
-            archive(samplePath, archivePath)
+    # Sample is archived, encrypted and uploaded in a single pass without
+    # storing anything to the disk. Upload must be started with the final size,
+    # so samples which are not archives are archived without compression,
+    # in which case the size of the archive is calculated from the file sizes.
+    # Upload session fails if a file was changed while it was uploaded.
+    sampleIsArchive = isArchive(samplePath)
+
+    if sampleIsArchive:
+        members: List[Tuple[Path, ZipInfo]] = []
+        archiveSize = samplePath.stat().st_size
+    else:
+        members = _archiveMembers(samplePath)
+        archiveSize = _storedArchiveSize([member for _, member in members])
 
-        encryptedPath = stack.enter_context(folder_manager.tempFile())
-        aes.encryptFile(key, archivePath, encryptedPath)
+    session = StreamChunkUploadSession(aes.encryptedSize(archiveSize), samplePath.name, ENCRYPTED_UPLOAD_CHUNK_SIZE)
 
-        return _chunkSampleImport(sampleType, sampleName, encryptedPath, datasetId)
+    try:
+        encryptedWriter = _EncryptedUploadWriter(key, session)
 
-    # ExitStack is marked as something that can "swallow" exceptions raised
-    # in "with" block. In this case ExitStack does not enter any context
-    # which can swallow the exceptions so this is not reachable, but mypy
-    # is complaning about this and we silence it by raising an exception here
-    raise RuntimeError("Unreachable statement was reached.")
+        with io.BufferedWriter(encryptedWriter, ENCRYPTION_BUFFER_SIZE) as writer:
+            if sampleIsArchive:
+                with samplePath.open("rb") as file:
+                    shutil.copyfileobj(file, writer, ENCRYPTION_BUFFER_SIZE)
+            else:
+                _writeStoredArchive(members, writer)
+
+        encryptedWriter.finish()
+        fileId = session.finish()
+    except BaseException:
+        session.abort()
+        raise
+
+    return _createSample(sampleType, sampleName, fileId, datasetId, samplePath)
 
 
 class NetworkDataset(Generic[SampleType], Dataset[SampleType], NetworkObject, Taggable, ABC):
@@ -106,6 +230,9 @@ class NetworkDataset(Generic[SampleType], Dataset[SampleType], NetworkObject, Ta
             id of created dataset id
         isLocked : bool
             availabilty of dataset for modifications
+        sampleCount : Optional[int]
+            number of samples in the dataset, only returned if samples
+            were not fetched together with the dataset
     """
 
     projectId: int
@@ -114,9 +241,11 @@ class NetworkDataset(Generic[SampleType], Dataset[SampleType], NetworkObject, Ta
     isLocked: bool
     isEncrypted: bool
     meta: Optional[Dict[str, Any]]
+    sampleCount: Optional[int]
 
     def __init__(self, sampleType: Type[SampleType]) -> None:
         self._sampleType = sampleType
+        self.sampleCount = None
 
     @property
     def path(self) -> Path:
@@ -142,9 +271,18 @@ class NetworkDataset(Generic[SampleType], Dataset[SampleType], NetworkObject, Ta
 
         descriptors["projectId"] = KeyDescriptor("project_id")
         descriptors["samples"] = KeyDescriptor("sessions", NetworkSample, list)
+        descriptors["sampleCount"] = KeyDescriptor("sessions_count", isEncodable = False)
 
         return descriptors
 
+    def onDecode(self) -> None:
+        super().onDecode()
+
+        # Samples are not a part of the response if the dataset was fetched
+        # without them, in that case they are fetched once they are accessed
+        if "samples" not in self.__dict__:
+            self.samples = LazySampleList(self._sampleType, self.id, self.sampleCount)  # type: ignore[assignment]
+
     # NetworkObject overrides
 
     @classmethod
@@ -152,11 +290,68 @@ class NetworkDataset(Generic[SampleType], Dataset[SampleType], NetworkObject, Ta
         return "dataset"
 
     @classmethod
-    def fetchById(cls, objectId: int, **kwargs: Any) -> Self:
-        if "include_sessions" not in kwargs:
-            kwargs["include_sessions"] = 1
+    def fetchById(
+        cls,
+        objectId: int,
+        *,
+        lazy: bool = False,
+        samplePageSize: int = DEFAULT_SAMPLE_PAGE_SIZE,
+        sampleFields: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> Self:
+
+        """
+            Fetches a single dataset with the matching id
+
+            Parameters
+            ----------
+            objectId : int
+                id of the dataset
+            lazy : bool
+                if True only the dataset is fetched, its samples are fetched
+                page by page once they are accessed. Should be used for
+                datasets with a large number of samples
+            samplePageSize : int
+                number of samples fetched with a single request if lazy is True
+            sampleFields : Optional[List[str]]
+                if lazy is True and this is not None only these fields of
+                samples are fetched (e.g. ["id", "name"]), accessing other
+                sample fields raises AttributeError
+            **kwargs : Optional[Dict[str, Any]]
+                query parameters (predicate) which will be appended to URL
+
+            Returns
+            -------
+            Self -> fetched dataset
+
+            Raises
+            ------
+            NetworkRequestError -> If the request for fetching failed
+
+            Example
+            -------
+            >>> from coretex import ImageDataset
+            \b
+            >>> dataset = ImageDataset.fetchById(1023, lazy = True, sampleFields = ["id", "name"])
+            >>> print(dataset.count)
+            >>> print(dataset.samples[150000].name)
+        """
+
+        if not lazy:
+            if "include_sessions" not in kwargs:
+                kwargs["include_sessions"] = 1
+
+            return super().fetchById(objectId, **kwargs)
 
-        return super().fetchById(objectId, **kwargs)
+        kwargs["include_sessions"] = 0
+        dataset = super().fetchById(objectId, **kwargs)
+
+        # Some datasets (e.g. SequenceDataset) process the samples once
+        # they are decoded, those keep a regular list of samples
+        if isinstance(dataset.samples, LazySampleList) and not dataset.samples.isMaterialized:
+            dataset.samples.configure(samplePageSize, sampleFields)
+
+        return dataset
 
     @classmethod
     def fetchAll(cls, **kwargs: Any) -> List[Self]:
@@ -165,6 +360,13 @@ class NetworkDataset(Generic[SampleType], Dataset[SampleType], NetworkObject, Ta
 
         return super().fetchAll(**kwargs)
 
+    @classmethod
+    def iterAll(cls, pageSize: int = DEFAULT_PAGE_SIZE, limit: Optional[int] = None, **kwargs: Any) -> Iterator[Self]:
+        if "include_sessions" not in kwargs:
+            kwargs["include_sessions"] = 1
+
+        return super().iterAll(pageSize, limit, **kwargs)
+
     @classmethod
     def fetchCachedDataset(cls, dependencies: List[str]) -> Self:
         """
@@ -316,51 +518,152 @@ class NetworkDataset(Generic[SampleType], Dataset[SampleType], NetworkObject, Ta
 
         return self.update(name = self.name, state = DatasetState.final)
 
-    def _linkSamplePath(self, samplePath: Path) -> None:
+    def _linkSamplePath(self, samplePath: Path) -> Path:
         linkPath = self.path / samplePath.name
-        if linkPath.exists():
-            linkPath.unlink()
+        linkSample(samplePath, linkPath)
 
-        samplePath.link_to(linkPath)
+        return linkPath
+
+    def download(
+        self,
+        decrypt: bool = True,
+        ignoreCache: bool = False,
+        unzip: bool = False,
+        streaming: bool = False,
+        downloadWorkers: int = DEFAULT_DOWNLOAD_WORKERS,
+        decryptWorkers: Optional[int] = None,
+        unzipWorkers: int = DEFAULT_UNZIP_WORKERS
+    ) -> None:
 
-    def download(self, decrypt: bool = True, ignoreCache: bool = False) -> None:
         """
-            Downloads dataset from Coretex
+            Downloads dataset from Coretex. Dataset keeps a manifest of
+            downloaded samples, so only samples which were added or modified
+            since the last download are downloaded again
+
+            Samples are processed by a pipeline: download, decrypt and unzip
+            stages have separate pools of workers, so downloading of a sample
+            overlaps with decryption and extraction of the previous samples
 
             Parameters
             ----------
+            decrypt : bool
+                if True encrypted samples will be decrypted
             ignoreCache : bool
                 if dataset is already downloaded and ignoreCache
                 is True it will be downloaded again (not required)
+            unzip : bool
+                if True samples will also be extracted
+            streaming : bool
+                if True every sample is downloaded, decrypted and extracted
+                in a single pass (see NetworkSample.streamDownload), encrypted
+                sample files are not stored
+            downloadWorkers : int
+                number of samples which are downloaded at the same time
+            decryptWorkers : Optional[int]
+                number of samples which are decrypted at the same time,
+                if None number of CPU cores is used
+            unzipWorkers : int
+                number of samples which are extracted at the same time
+
+            Raises
+            ------
+            ValueError -> if unzip or streaming is True for encrypted dataset which is not decrypted
 
             Example
             -------
             >>> from coretex import NetworkDataset
             \b
             >>> dummyDataset = NetworkDataset.fetchById(1023)
-            >>> dummyDataset.download()
+            >>> dummyDataset.download(unzip = True)
         """
 
+        if unzip and not decrypt and self.isEncrypted:
+            raise ValueError(">> [Coretex] Encrypted dataset must be decrypted to be unzipped")
+
+        if streaming and not decrypt and self.isEncrypted:
+            raise ValueError(">> [Coretex] Encrypted dataset is always decrypted when streaming")
+
+        if decryptWorkers is None:
+            decryptWorkers = os.cpu_count() or 1
+
         self.path.mkdir(exist_ok = True)
 
+        manifest = DatasetManifest.load(self.path)
+
+        # Remove samples which are no longer a part of the dataset
+        sampleIds = set(sample.id for sample in self.samples)
+        for sampleId in [sampleId for sampleId in manifest.entries if sampleId not in sampleIds]:
+            entry = manifest.remove(sampleId)
+            if entry is not None:
+                for link in entry.links:
+                    (self.path / link).unlink(missing_ok = True)
+                    sampleLinkIndex().remove(self.path / link)
+
+        if ignoreCache:
+            samples = list(self.samples)
+        else:
+            # Single listing of the dataset directory and the samples folder
+            # instead of checking files of every sample
+            existingFiles = set(os.listdir(self.path))
+            storedFiles, storedDirectories = listStoredSamples(folder_manager.samplesFolder)
+
+            samples = [
+                sample for sample in self.samples
+                if not manifest.isUpToDate(sample, decrypt, existingFiles, storedFiles) or (unzip and sample.path.name not in storedDirectories)
+            ]
+
+            for sample in samples:
+                if not manifest.isIntact(sample, storedFiles):
+                    # Existing sample file would be reused by the download otherwise
+                    logging.getLogger("coretexpylib").debug(f">> [Coretex] Sample \"{sample.name}\" is damaged, downloading it again")
+                    sample._removeLocalCopy()
+
+        logging.getLogger("coretexpylib").debug(f">> [Coretex] {len(self.samples) - len(samples)} samples of dataset \"{self.name}\" are up to date")
+
         def sampleDownloader(sample: SampleType) -> None:
-            sample.download(decrypt, ignoreCache)
+            if streaming:
+                sample.streamDownload(ignoreCache, unzip)
+            else:
+                sample.download(False, ignoreCache)
+
+        def sampleDecryptor(sample: SampleType) -> None:
+            # Streamed samples are decrypted while downloading
+            if decrypt and not streaming:
+                sample.decrypt(ignoreCache)
+
+            links: List[Path] = []
 
             if sample.downloadPath.exists():
-                self._linkSamplePath(sample.downloadPath)
+                links.append(self._linkSamplePath(sample.downloadPath))
 
-            if sample.zipPath.exists():
-                self._linkSamplePath(sample.zipPath)
+            # Download path and zip path are the same for samples which are not encrypted
+            if sample.zipPath.exists() and sample.zipPath != sample.downloadPath:
+                links.append(self._linkSamplePath(sample.zipPath))
+
+            manifest.update(sample, links)
 
             logging.getLogger("coretexpylib").info(f"\tDownloaded \"{sample.name}\"")
 
-        processor = MultithreadedDataProcessor(
-            self.samples,
-            sampleDownloader,
-            message = f"Downloading dataset \"{self.name}\"..."
-        )
+        def sampleUnzipper(sample: SampleType) -> None:
+            sample.unzip(ignoreCache)
+
+        stages: List[PipelineStage[SampleType]] = [
+            PipelineStage("download", sampleDownloader, downloadWorkers, sizeOf = _fileSize(lambda sample: sample.zipPath if streaming else sample.downloadPath)),
+            PipelineStage("decrypt", sampleDecryptor, decryptWorkers, sizeOf = _fileSize(lambda sample: sample.zipPath))
+        ]
+
+        if unzip and not streaming:
+            stages.append(PipelineStage("unzip", sampleUnzipper, unzipWorkers, sizeOf = _fileSize(lambda sample: sample.zipPath)))
+
+        try:
+            if len(samples) > 0:
+                pipeline = Pipeline(stages, message = f"Downloading dataset \"{self.name}\"...")
 
-        processor.process()
+                for statistics in pipeline.process(samples):
+                    logging.getLogger("coretexpylib").info(f"\t{statistics}")
+        finally:
+            # Progress is stored even if download failed
+            manifest.save()
 
     def rename(self, name: str) -> bool:
         if not isEntityNameValid(name):
@@ -379,6 +682,12 @@ class NetworkDataset(Generic[SampleType], Dataset[SampleType], NetworkObject, Ta
         # to implement a specific way of uploading samples
         pass
 
+    def _importSample(self, samplePath: Path, sampleName: str, **metadata: Any) -> SampleType:
+        if self.isEncrypted:
+            return _encryptedSampleImport(self._sampleType, sampleName, samplePath, self.id, getProjectKey(self.projectId))
+
+        return self._uploadSample(samplePath, sampleName, **metadata)
+
     def add(self, samplePath: Union[Path, str], sampleName: Optional[str] = None, **metadata: Any) -> SampleType:
         """
             Uploads the provided archive (.zip, .tar.gz) as Sample to
@@ -400,12 +709,131 @@ class NetworkDataset(Generic[SampleType], Dataset[SampleType], NetworkObject, Ta
         if sampleName is None:
             sampleName = samplePath.stem
 
-        if self.isEncrypted:
-            sample = _encryptedSampleImport(self._sampleType, sampleName, samplePath, self.id, getProjectKey(self.projectId))
-        else:
-            sample = self._uploadSample(samplePath, sampleName, **metadata)
+        sample = self._importSample(samplePath, sampleName, **metadata)
 
         # Append the newly created sample to the list of samples
         self.samples.append(sample)
 
         return sample
+
+    def addMany(
+        self,
+        samplePaths: Sequence[Union[Path, str]],
+        sampleNames: Optional[Sequence[str]] = None,
+        workers: int = DEFAULT_IMPORT_WORKERS,
+        onProgress: Optional[Callable[[int, int], None]] = None,
+        **metadata: Any
+    ) -> List[SampleImportResult[SampleType]]:
+
+        """
+            Uploads multiple samples concurrently. Archiving, encryption and
+            upload of different samples overlap, so import time depends on the
+            available bandwidth instead of the latency of requests. Only
+            "workers" samples are processed at the same time, which limits
+            memory and disk space used for temporary archives.
+
+            Failed imports do not stop the import of other samples, their
+            errors are returned as a part of the result.
+
+            Parameters
+            ----------
+            samplePaths : Sequence[Union[Path, str]]
+                paths to data which will be uploaded
+            sampleNames : Optional[Sequence[str]]
+                names of samples, if None file names (without extension) are used
+            workers : int
+                number of samples which are imported at the same time
+            onProgress : Optional[Callable[[int, int], None]]
+                function which is called after each sample is processed
+                with the number of processed samples and the total number of samples
+            **metadata : Any
+                passed to the upload of every sample
+
+            Returns
+            -------
+            List[SampleImportResult[SampleType]] -> result of every import, in the
+            same order as the provided paths. Created samples are appended
+            to "samples" in the same order
+
+            Raises
+            ------
+            ValueError -> if the number of names does not match the number of paths
+
+            Example
+            -------
+            >>> from pathlib import Path
+            >>> from coretex import CustomDataset
+            \b
+            >>> dataset = CustomDataset.fetchById(1023)
+            >>> results = dataset.addMany(list(Path("samples").glob("*.zip")), workers = 16)
+            >>> for result in results:
+                    if not result.succeeded:
+                        print(f"Failed to import {result.path}: {result.error}")
+        """
+
+        if workers <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"workers\" value \"{workers}\". Value must be greater than 0")
+
+        paths = [Path(path) for path in samplePaths]
+
+        if sampleNames is None:
+            names = [path.stem for path in paths]
+        else:
+            names = list(sampleNames)
+
+        if len(names) != len(paths):
+            raise ValueError(">> [Coretex] Number of sample names must match the number of sample paths")
+
+        results: List[SampleImportResult[SampleType]] = [SampleImportResult(path, name) for path, name in zip(paths, names)]
+
+        progressLock = Lock()
+        processedCount = 0
+
+        def importSample(result: SampleImportResult[SampleType]) -> None:
+            nonlocal processedCount
+
+            try:
+                result.sample = self._importSample(result.path, result.name, **metadata)
+            except Exception as exception:
+                logging.getLogger("coretexpylib").debug(f">> [Coretex] Failed to import sample \"{result.path}\"", exc_info = exception)
+                result.error = exception
+
+            with progressLock:
+                processedCount += 1
+                processed = processedCount
+
+                if onProgress is not None:
+                    onProgress(processed, len(results))
+
+            logging.getLogger("coretexpylib").info(f"\tImported {processed}/{len(results)} samples")
+
+        logging.getLogger("coretexpylib").info(f">> [Coretex] Importing {len(results)} samples to dataset \"{self.name}\" using {workers} workers")
+
+        with ThreadPoolExecutor(max_workers = workers) as pool:
+            # Number of submitted imports is limited, so memory
+            # does not grow with the number of samples
+            pending: Set[Future] = set()
+
+            for result in results:
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when = FIRST_COMPLETED)
+
+                    # Import errors are stored in the results, anything
+                    # raised here (e.g. by "onProgress") stops the import
+                    for future in done:
+                        future.result()
+
+                pending.add(pool.submit(importSample, result))
+
+            for future in pending:
+                future.result()
+
+        for result in results:
+            if result.sample is not None:
+                self.samples.append(result.sample)
+
+        failedCount = sum(1 for result in results if not result.succeeded)
+        if failedCount > 0:
+            logging.getLogger("coretexpylib").warning(f">> [Coretex] Failed to import {failedCount} of {len(results)} samples")
+
+        return results
@@ -0,0 +1,58 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Generic, Optional, TypeVar
+from pathlib import Path
+
+from ..sample import NetworkSample
+
+
+SampleType = TypeVar("SampleType", bound = "NetworkSample")
+
+
+class SampleImportResult(Generic[SampleType]):
+
+    """
+        Result of importing a single sample using NetworkDataset.addMany
+
+        Properties
+        ----------
+        path : Path
+            path to the data which was imported
+        name : str
+            name of the sample
+        sample : Optional[SampleType]
+            created sample, None if import failed
+        error : Optional[Exception]
+            exception which caused the import to fail, None if import succeeded
+    """
+
+    def __init__(self, path: Path, name: str, sample: Optional[SampleType] = None, error: Optional[Exception] = None) -> None:
+        self.path = path
+        self.name = name
+        self.sample = sample
+        self.error = error
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and self.sample is not None
+
+    def __repr__(self) -> str:
+        if self.succeeded:
+            return f"SampleImportResult(path = {self.path}, sample = {self.sample.id})"  # type: ignore[union-attr]
+
+        return f"SampleImportResult(path = {self.path}, error = {self.error!r})"
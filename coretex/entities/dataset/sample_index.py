@@ -0,0 +1,286 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Set, TypeVar
+from bisect import bisect_left
+
+from ..sample import Sample
+
+
+SampleType = TypeVar("SampleType", bound = "Sample")
+
+
+class SampleIndex(Generic[SampleType]):
+
+    """
+        Not intended for outside use
+
+        Hash indexes of dataset samples by name and id. Index is synchronized
+        with the list of samples before every lookup: samples appended to
+        the list are indexed incrementally, the index is rebuilt if the
+        list was replaced or if samples were removed from it.
+
+        Found sample is checked to still have the indexed name/id, and the
+        index is rebuilt if it does not. Lookups which find nothing do not
+        check the samples, so after a sample was replaced in place
+        (e.g. "samples[i] = other") "reindex" must be called for the new
+        sample to be found.
+    """
+
+    def __init__(self) -> None:
+        self._samples: Optional[Sequence[SampleType]] = None
+        self._count = 0
+        self._names: List[str] = []
+        self._byName: Dict[str, int] = {}
+        self._byId: Dict[int, int] = {}
+        self._sortedNames: Optional[List[str]] = None
+
+    def _sync(self, samples: Sequence[SampleType], rebuild: bool = False) -> None:
+        if rebuild or samples is not self._samples or len(samples) < self._count:
+            self._samples = samples
+            self._count = 0
+            self._names.clear()
+            self._byName.clear()
+            self._byId.clear()
+            self._sortedNames = None
+
+        count = len(samples)
+        if count == self._count:
+            return
+
+        for position in range(self._count, count):
+            sample = samples[position]
+            sampleId = getattr(sample, "id", None)
+
+            self._names.append(sample.name)
+
+            # First sample with the name/id is kept, same as a linear search would find
+            self._byName.setdefault(sample.name, position)
+
+            if sampleId is not None:
+                self._byId.setdefault(sampleId, position)
+
+        self._count = count
+        self._sortedNames = None
+
+    def reindex(self) -> None:
+        """
+            Rebuilds the index during the next lookup
+        """
+
+        self._samples = None
+
+    def _prefixMatch(self, name: str) -> Optional[int]:
+        # Samples imported with the same name get a suffix with their serial
+        # number, so the first sample whose name starts with the name is returned
+        if self._sortedNames is None:
+            self._sortedNames = sorted(self._byName)
+
+        positions: List[int] = []
+        index = bisect_left(self._sortedNames, name)
+
+        while index < len(self._sortedNames) and self._sortedNames[index].startswith(name):
+            positions.append(self._byName[self._sortedNames[index]])
+            index += 1
+
+        if len(positions) == 0:
+            return None
+
+        return min(positions)
+
+    def _findByName(self, name: str) -> Optional[int]:
+        position = self._byName.get(name)
+        if position is not None:
+            return position
+
+        return self._prefixMatch(name)
+
+    def byName(self, samples: Sequence[SampleType], name: str) -> Optional[SampleType]:
+        """
+            Returns the sample with the exact name if it exists, otherwise
+            the first sample (in list order) whose name starts with the name.
+            Unlike a linear search over names, sample with the exact name
+            is returned even if a sample before it starts with the name.
+        """
+
+        self._sync(samples)
+
+        position = self._findByName(name)
+        if position is not None and samples[position].name != self._names[position]:
+            self._sync(samples, rebuild = True)
+            position = self._findByName(name)
+
+        if position is None:
+            return None
+
+        return samples[position]
+
+    def byId(self, samples: Sequence[SampleType], sampleId: int) -> Optional[SampleType]:
+        self._sync(samples)
+
+        position = self._byId.get(sampleId)
+        if position is not None and getattr(samples[position], "id", None) != sampleId:
+            self._sync(samples, rebuild = True)
+            position = self._byId.get(sampleId)
+
+        if position is None:
+            return None
+
+        return samples[position]
+
+
+class SampleMetadataIndex(Generic[SampleType]):
+
+    """
+        Metadata of dataset samples stored by field, used for querying
+        samples by their metadata without loading it for every query.
+        Equality conditions on indexed fields are resolved using hash
+        indexes, other conditions only check the remaining candidates.
+
+        Properties
+        ----------
+        samples : List[SampleType]
+            samples whose metadata is indexed
+        fields : Dict[str, List[Any]]
+            metadata values by field, value of a field which sample does not have is None
+        indexedFields : Set[str]
+            fields which have a hash index
+
+        Example
+        -------
+        >>> from coretex import ImageDataset
+        \b
+        >>> dataset = ImageDataset.fetchById(1023)
+        >>> dataset.download(unzip = True)
+        >>> metadata = dataset.indexMetadata(indexedFields = ["camera"])
+        >>> samples = metadata.query(camera = "front", width = lambda width: width > 1024)
+    """
+
+    def __init__(self, samples: Sequence[SampleType], metadata: Sequence[Dict[str, Any]], indexedFields: Optional[List[str]] = None) -> None:
+        if len(samples) != len(metadata):
+            raise ValueError(">> [Coretex] Number of samples and metadata objects must be equal")
+
+        self.samples = list(samples)
+        self.fields: Dict[str, List[Any]] = {}
+        self.indexedFields: Set[str] = set()
+
+        self._indexes: Dict[str, Dict[Any, List[int]]] = {}
+
+        for position, values in enumerate(metadata):
+            for field, value in values.items():
+                column = self.fields.get(field)
+                if column is None:
+                    column = [None] * len(self.samples)
+                    self.fields[field] = column
+
+                column[position] = value
+
+        for field in indexedFields or []:
+            self.createIndex(field)
+
+    def createIndex(self, field: str) -> None:
+        """
+            Creates a hash index for the field. Values
+            of indexed fields must be hashable.
+
+            Parameters
+            ----------
+            field : str
+                name of the metadata field
+        """
+
+        index: Dict[Any, List[int]] = {}
+
+        for position, value in enumerate(self.fields.get(field, [None] * len(self.samples))):
+            index.setdefault(value, []).append(position)
+
+        self._indexes[field] = index
+        self.indexedFields.add(field)
+
+    def _candidates(self, field: str, condition: Any) -> Optional[List[int]]:
+        index = self._indexes.get(field)
+        if index is None or callable(condition):
+            return None
+
+        return index.get(condition, [])
+
+    def _matches(self, field: str, condition: Any, positions: Sequence[int]) -> List[int]:
+        column = self.fields.get(field)
+        if column is None:
+            column = [None] * len(self.samples)
+
+        if callable(condition):
+            return [position for position in positions if column[position] is not None and condition(column[position])]
+
+        return [position for position in positions if column[position] == condition]
+
+    def query(self, **conditions: Any) -> List[SampleType]:
+        """
+            Returns samples whose metadata matches all conditions, in the
+            order of samples in the dataset
+
+            Parameters
+            ----------
+            **conditions : Any
+                field name mapped to either a value which the field must
+                be equal to, or a function which receives the value of the
+                field and returns True if the sample should be returned.
+                Functions are not called for samples which do not have the field
+
+            Returns
+            -------
+            List[SampleType] -> samples which match the conditions
+        """
+
+        indexed: Optional[List[int]] = None
+        remaining: Dict[str, Any] = {}
+
+        for field, condition in conditions.items():
+            candidates = self._candidates(field, condition)
+            if candidates is None:
+                remaining[field] = condition
+                continue
+
+            if indexed is None:
+                indexed = candidates
+            else:
+                candidateSet = set(candidates)
+                indexed = [position for position in indexed if position in candidateSet]
+
+        positions: Sequence[int] = indexed if indexed is not None else range(len(self.samples))
+
+        for field, condition in remaining.items():
+            positions = self._matches(field, condition, positions)
+
+        return [self.samples[position] for position in positions]
+
+    def values(self, field: str) -> List[Any]:
+        """
+            Returns
+            -------
+            List[Any] -> values of the field for every sample, None if sample does not have the field
+        """
+
+        return list(self.fields.get(field, [None] * len(self.samples)))
+
+
+def loadSampleMetadata(sample: Sample) -> Dict[str, Any]:
+    loadMetadata: Optional[Callable[[], Dict[str, Any]]] = getattr(sample, "loadMetadata", None)
+    if loadMetadata is None:
+        raise ValueError(f">> [Coretex] Sample \"{sample.name}\" does not have metadata, provide a function which loads it")
+
+    return loadMetadata()
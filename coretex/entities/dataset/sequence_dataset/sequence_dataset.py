@@ -22,10 +22,12 @@ from pathlib import Path
 import logging
 
 from .base import BaseSequenceDataset
-from ..network_dataset import NetworkDataset, _chunkSampleImport, _encryptedSampleImport
+from ..network_dataset import NetworkDataset, _chunkSampleImport, _encryptedSampleImport, \
+    DEFAULT_DOWNLOAD_WORKERS, DEFAULT_UNZIP_WORKERS
 from ...sample import SequenceSample, CustomSample
 from ...._folder_manager import folder_manager
 from ....codable import KeyDescriptor
+from ....networking.upload_journal import UploadJournal, retainedUploadFile
 from ....cryptography import getProjectKey
 from ....utils import file as file_utils
 
@@ -50,6 +52,8 @@ class SequenceDataset(BaseSequenceDataset, NetworkDataset[SequenceSample]):
         return descriptors
 
     def onDecode(self) -> None:
+        super().onDecode()
+
         metadataSample = self.getSample("_metadata")
         if metadataSample is None:
             raise FileNotFoundError(">> [Coretex] _metadata sample could not be found in the dataset")
@@ -106,11 +110,28 @@ class SequenceDataset(BaseSequenceDataset, NetworkDataset[SequenceSample]):
 
         return dataset
 
-    def download(self, decrypt: bool = True, ignoreCache: bool = False) -> None:
-        super().download(decrypt, ignoreCache)
+    def download(
+        self,
+        decrypt: bool = True,
+        ignoreCache: bool = False,
+        unzip: bool = False,
+        streaming: bool = False,
+        downloadWorkers: int = DEFAULT_DOWNLOAD_WORKERS,
+        decryptWorkers: Optional[int] = None,
+        unzipWorkers: int = DEFAULT_UNZIP_WORKERS
+    ) -> None:
+
+        super().download(decrypt, ignoreCache, unzip, streaming, downloadWorkers, decryptWorkers, unzipWorkers)
+
+        if streaming:
+            self.metadata.streamDownload(ignoreCache, unzip)
+            return
 
         self.metadata.download(decrypt, ignoreCache)
 
+        if unzip:
+            self.metadata.unzip(ignoreCache)
+
     def isPairedEnd(self) -> bool:
         """
             This function returns True if the dataset holds paired-end reads and
@@ -144,10 +165,15 @@ class SequenceDataset(BaseSequenceDataset, NetworkDataset[SequenceSample]):
         if file_utils.isArchive(samplePath):
             sample = _chunkSampleImport(self._sampleType, sampleName, samplePath, self.id)
         else:
-            with folder_manager.tempFile() as archivePath:
+            def archiveSample(archivePath: Path) -> None:
                 logging.getLogger("coretexpylib").info(f">> [Coretex] Provided Sample \"{samplePath}\" is not an archive, zipping...")
                 file_utils.archive(samplePath, archivePath)
 
+            # Archive is kept until the upload finishes, so the failed upload of the unchanged sample can be resumed
+            identity = f"dataset-{self.id}-{samplePath.resolve()}"
+            fingerprint = UploadJournal.fingerprintFile(samplePath)
+
+            with retainedUploadFile(folder_manager.uploadsFolder, identity, fingerprint, ".zip", archiveSample) as archivePath:
                 sample = _chunkSampleImport(self._sampleType, sampleName, archivePath, self.id)
 
         return sample
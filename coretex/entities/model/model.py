@@ -27,7 +27,9 @@ import logging
 from ..tag import Taggable, EntityTagType
 from ..utils import isEntityNameValid
 from ..._folder_manager import folder_manager
-from ...networking import networkManager, NetworkObject, ChunkUploadSession, MAX_CHUNK_SIZE, NetworkRequestError
+from ...networking import networkManager, NetworkObject, ChunkUploadSession, MAX_CHUNK_SIZE, \
+    NetworkRequestError, segmentedDownload
+from ...networking.upload_journal import UploadJournal, retainedUploadFile
 from ...codable import KeyDescriptor
 
 
@@ -231,19 +233,18 @@ class Model(NetworkObject, Taggable):
             return
 
         modelZip = path.with_suffix(".zip")
-        response = networkManager.download(f"{self._endpoint()}/download", modelZip, {
+        segmentedDownload(f"{self._endpoint()}/download", modelZip, {
             "id": self.id
         })
 
-        if response.hasFailed():
-            raise NetworkRequestError(response, "Failed to download Model")
-
         with ZipFile(modelZip) as zipFile:
             zipFile.extractall(path)
 
     def upload(self, path: Union[Path, str]) -> None:
         """
-            Uploads the provided model folder as zip file to Coretex.ai
+            Uploads the provided model folder as zip file to Coretex.ai\n
+            Archive is kept until the upload finishes, so if the upload fails
+            and the model folder is not changed the next upload is resumed
 
             Parameters
             ----------
@@ -268,22 +269,26 @@ class Model(NetworkObject, Taggable):
         if not path.is_dir():
             raise ValueError("\"path\" must be a directory")
 
-        zipPath = path.with_suffix(".zip")
-        with ZipFile(zipPath, "w") as zipFile:
-            for value in path.rglob("*"):
-                if not value.is_file():
-                    continue
+        def archiveModel(zipPath: Path) -> None:
+            with ZipFile(zipPath, "w") as zipFile:
+                for value in path.rglob("*"):
+                    if not value.is_file():
+                        continue
+
+                    zipFile.write(value, value.relative_to(path))
 
-                zipFile.write(value, value.relative_to(path))
+        fingerprint = UploadJournal.fingerprintDirectory(path)
 
-        uploadSession = ChunkUploadSession(MAX_CHUNK_SIZE, zipPath)
-        uploadId = uploadSession.run()
+        # Archive is not created again for the same model folder, so the journal of the failed upload matches it
+        with retainedUploadFile(folder_manager.uploadsFolder, f"model-{self.id}", fingerprint, ".zip", archiveModel) as zipPath:
+            uploadSession = ChunkUploadSession(MAX_CHUNK_SIZE, zipPath, journalDirectory = folder_manager.uploadsFolder)
+            uploadId = uploadSession.run()
 
-        parameters = {
-            "id": self.id,
-            "file_id": uploadId
-        }
+            parameters = {
+                "id": self.id,
+                "file_id": uploadId
+            }
 
-        response = networkManager.formData("model/upload", parameters)
-        if response.hasFailed():
-            raise NetworkRequestError(response, "Failed to upload model")
+            response = networkManager.formData("model/upload", parameters)
+            if response.hasFailed():
+                raise NetworkRequestError(response, "Failed to upload model")
@@ -19,6 +19,8 @@ from .custom_sample import LocalCustomSample, CustomSample
 from .image_sample import AnnotatedImageSampleData, LocalImageSample, ImageSample
 from .any_local_sample import AnyLocalSample
 from .sample import Sample
+from .sample_archive import SampleArchive
+from .sample_content import SampleContent, ContentFile, FileRole
 from .local_sample import LocalSample
 from .network_sample import NetworkSample
 from .sequence_sample import LocalSequenceSample, SequenceSample
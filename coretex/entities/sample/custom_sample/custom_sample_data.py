@@ -15,8 +15,11 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from typing import Optional, Iterator
 from pathlib import Path
 
+from ..sample_content import SampleContent
+
 
 class CustomSampleData:
 
@@ -24,5 +27,10 @@ class CustomSampleData:
         Contains file and folder contents of the custom sample
     """
 
-    def __init__(self, path: Path) -> None:
-        self.folderContent = path.glob("*")
+    def __init__(self, path: Path, content: Optional[SampleContent] = None) -> None:
+        self.folderContent: Iterator[Path]
+
+        if content is None:
+            self.folderContent = path.glob("*")
+        else:
+            self.folderContent = (path / name for name in content.topLevelNames())
@@ -34,4 +34,7 @@ class LocalCustomSample(LocalSample[CustomSampleData]):
             -------
             CustomSampleData -> file and folder contents of the custom sample
         """
-        return CustomSampleData(Path(self.path))
+
+        # Stored sample content is used instead of listing the sample directory
+        content = self.content if self.path.exists() else None
+        return CustomSampleData(Path(self.path), content)
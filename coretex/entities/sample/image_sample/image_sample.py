@@ -15,7 +15,7 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 from .image_sample_data import AnnotatedImageSampleData
 from .local_image_sample import LocalImageSample
@@ -36,6 +36,9 @@ class ImageSample(NetworkSample[AnnotatedImageSampleData], LocalImageSample):
     def __init__(self) -> None:
         NetworkSample.__init__(self)
 
+    def load(self, targetSize: Optional[Tuple[int, int]] = None, mode: str = "RGB", lazy: bool = False) -> AnnotatedImageSampleData:
+        return LocalImageSample.load(self, targetSize, mode, lazy)
+
     def saveAnnotation(self, coretexAnnotation: CoretexImageAnnotation) -> bool:
         # Encrypted sample must be downloaded for annotation to be updated
         if self.isEncrypted:
@@ -15,16 +15,17 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Final, Optional
+from typing import Optional, Union, Callable, Tuple, IO
 from pathlib import Path
 
 import json
 
-from PIL import Image, ImageOps
+from PIL import Image, ImageOps, ExifTags
 
 import numpy as np
 
 from .image_format import ImageFormat
+from ..sample_archive import SampleArchive
 from ...annotation import CoretexImageAnnotation, ImageDatasetClasses
 
 
@@ -39,15 +40,61 @@ def _findImage(path: Path) -> Path:
     raise RuntimeError
 
 
-def _readImageData(path: Path) -> np.ndarray:
-    image = ImageOps.exif_transpose(Image.open(path))
-    if image.mode != "RGB":
-        image = image.convert("RGB")
+def _findImageMember(archive: SampleArchive) -> str:
+    for format in ImageFormat:
+        imageNames = [name for name in archive.glob(f"*.{format.extension}") if not "thumb" in name]
+
+        if len(imageNames) > 0:
+            return imageNames[0]
+
+    raise RuntimeError
+
+
+def _readImageData(source: Union[Path, IO[bytes]], targetSize: Optional[Tuple[int, int]] = None, mode: str = "RGB") -> Tuple[np.ndarray, int, int]:
+    with Image.open(source) as image:
+        # EXIF orientation 5-8 means that the image is stored rotated by 90 degrees
+        orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+        isTransposed = orientation in (5, 6, 7, 8)
+
+        originalWidth, originalHeight = image.size
+        if isTransposed:
+            originalWidth, originalHeight = originalHeight, originalWidth
+
+        if targetSize is not None:
+            # Image keeps its aspect ratio and the remaining space is padded, same as "resizeWithPadding"
+            width, height = targetSize
+            ratio = min(width / originalWidth, height / originalHeight)
+
+            resizedWidth = max(1, int(originalWidth * ratio))
+            resizedHeight = max(1, int(originalHeight * ratio))
 
-    imageData = np.frombuffer(image.tobytes(), dtype = np.uint8)
-    imageData = imageData.reshape((image.size[1], image.size[0], 3))
+            # JPEG images are decoded at the lowest resolution which is not smaller than
+            # the resized image (scale 1/2, 1/4 or 1/8), other formats ignore the draft request
+            image.draft(mode, (resizedHeight, resizedWidth) if isTransposed else (resizedWidth, resizedHeight))
 
-    return imageData
+        # Transposing copies the image, so it is performed only if it is needed
+        result = ImageOps.exif_transpose(image) if orientation != 1 else image
+
+        if result.mode != mode:
+            result = result.convert(mode)
+
+        top = 0
+        left = 0
+
+        if targetSize is not None:
+            if result.size != (resizedWidth, resizedHeight):
+                result = result.resize((resizedWidth, resizedHeight))
+
+            if result.size != targetSize:
+                top = (height - resizedHeight) // 2
+                left = (width - resizedWidth) // 2
+
+                paddedImage = Image.new(result.mode, targetSize, 0)
+                paddedImage.paste(result, (left, top))
+
+                result = paddedImage
+
+        return np.asarray(result), top, left
 
 
 def _readAnnotationData(path: Path) -> CoretexImageAnnotation:
@@ -57,20 +104,104 @@ def _readAnnotationData(path: Path) -> CoretexImageAnnotation:
         )
 
 
+def _readArchiveAnnotationData(archive: SampleArchive) -> Optional[CoretexImageAnnotation]:
+    if not "annotations.json" in archive:
+        return None
+
+    return CoretexImageAnnotation.decode(json.loads(archive.read("annotations.json")))
+
+
 class AnnotatedImageSampleData:
 
     """
         Contains image data as well as its annotation\n
-        Annotation is expected to be in Coretex.ai format
+        Annotation is expected to be in Coretex.ai format\n
+        Data can be loaded either from the extracted sample
+        directory or directly from the sample archive
+
+        Properties
+        ----------
+        image : np.ndarray
+            read-only image data, if the data was loaded lazily
+            the image is decoded the first time it is accessed
+        annotation : Optional[CoretexImageAnnotation]
+            annotation of the image, None if the sample is not annotated
+        padding : Tuple[int, int]
+            number of pixels of padding from top/bottom and left/right
+            which was added when the image was resized to the target size
     """
 
-    def __init__(self, path: Path) -> None:
-        self.image: Final = _readImageData(_findImage(path))
-        self.annotation: Optional[CoretexImageAnnotation] = None
+    def __init__(
+        self,
+        path: Union[Path, SampleArchive],
+        imageName: Optional[str] = None,
+        targetSize: Optional[Tuple[int, int]] = None,
+        mode: str = "RGB",
+        lazy: bool = False
+    ) -> None:
+
+        self._image: Optional[np.ndarray] = None
+        self._padding = (0, 0)
+        self._loadImage: Callable[[], Tuple[np.ndarray, int, int]]
+
+        self.annotation: Optional[CoretexImageAnnotation]
+
+        if isinstance(path, SampleArchive):
+            archive = path
+            archiveImageName = _findImageMember(archive)
+
+            def loadArchiveImage() -> Tuple[np.ndarray, int, int]:
+                # Archive is opened again since the image might be loaded after it was closed
+                with SampleArchive(archive.path) as imageArchive, imageArchive.open(archiveImageName) as imageFile:
+                    return _readImageData(imageFile, targetSize, mode)
+
+            self._loadImage = loadArchiveImage
+
+            if not lazy:
+                with archive.open(archiveImageName) as imageFile:
+                    self.__setImage(*_readImageData(imageFile, targetSize, mode))
+
+            self.annotation = _readArchiveAnnotationData(archive)
+        else:
+            # Image is searched for only if its name is not known from the sample content
+            imagePath = _findImage(path) if imageName is None else path / imageName
+
+            self._loadImage = lambda: _readImageData(imagePath, targetSize, mode)
+
+            if not lazy:
+                self.__setImage(*self._loadImage())
+
+            self.annotation = None
+
+            annotationPath = path / "annotations.json"
+            if annotationPath.exists():
+                self.annotation = _readAnnotationData(annotationPath)
+
+    def __setImage(self, image: np.ndarray, top: int, left: int) -> None:
+        self._image = image
+        self._padding = (top, left)
+
+    @property
+    def image(self) -> np.ndarray:
+        if self._image is None:
+            image, top, left = self._loadImage()
+            self.__setImage(image, top, left)
+
+            return image
+
+        return self._image
+
+    @property
+    def padding(self) -> Tuple[int, int]:
+        # Padding is known only once the image is decoded
+        if self._image is None:
+            self.__setImage(*self._loadImage())
+
+        return self._padding
 
-        annotationPath = path / "annotations.json"
-        if annotationPath.exists():
-            self.annotation = _readAnnotationData(annotationPath)
+    @property
+    def isImageLoaded(self) -> bool:
+        return self._image is not None
 
     def extractSegmentationMask(self, classes: ImageDatasetClasses) -> np.ndarray:
         """
@@ -15,7 +15,7 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
 import json
@@ -23,6 +23,7 @@ import json
 from .image_sample_data import AnnotatedImageSampleData
 from .image_format import ImageFormat
 from ..local_sample import LocalSample
+from ..sample_content import FileRole
 from ...annotation import CoretexImageAnnotation
 
 
@@ -35,16 +36,42 @@ class LocalImageSample(LocalSample[AnnotatedImageSampleData]):
         manipulate local image data and annotations
     """
 
-    @property
-    def imagePath(self) -> Path:
+    @classmethod
+    def _detectFileRole(cls, name: str) -> Optional[FileRole]:
+        # Only files from the sample root are used
+        if "/" in name:
+            return None
+
+        if name == "annotations.json":
+            return FileRole.annotation
+
+        if name == "metadata.json":
+            return FileRole.metadata
+
+        for format in ImageFormat:
+            if name.endswith(f".{format.extension}"):
+                return FileRole.thumbnail if "thumb" in name else FileRole.image
+
+        return None
+
+    def _findImageName(self) -> Optional[str]:
+        images = self.content.withRole(FileRole.image)
+
+        # Formats are checked in order of preference
         for format in ImageFormat:
-            imagePaths = list(self.path.glob(f"*.{format.extension}"))
-            imagePaths = [path for path in imagePaths if not "thumbnail" in str(path)]
+            for image in images:
+                if image.name.endswith(f".{format.extension}"):
+                    return image.name
 
-            if len(imagePaths) > 0:
-                return Path(imagePaths[0])
+        return None
 
-        raise FileNotFoundError
+    @property
+    def imagePath(self) -> Path:
+        imageName = self._findImageName()
+        if imageName is None:
+            raise FileNotFoundError
+
+        return self.path / imageName
 
     @property
     def annotationPath(self) -> Path:
@@ -54,16 +81,42 @@ class LocalImageSample(LocalSample[AnnotatedImageSampleData]):
     def metadataPath(self) -> Path:
         return self.path / "metadata.json"
 
-    def load(self) -> AnnotatedImageSampleData:
+    def load(self, targetSize: Optional[Tuple[int, int]] = None, mode: str = "RGB", lazy: bool = False) -> AnnotatedImageSampleData:
         """
-            Loads image and its annotation if it exists
+            Loads image and its annotation if it exists. If the sample
+            was not extracted the data is read directly from the sample archive.
+
+            Parameters
+            ----------
+            targetSize : Optional[Tuple[int, int]]
+                (width, height) to which the image is resized, the image keeps
+                its aspect ratio and the remaining space is filled with symmetrical
+                padding (same as "resizeWithPadding"), JPEG images are decoded
+                directly at a reduced resolution which is much faster than decoding
+                the full image and resizing it
+            mode : str
+                PIL mode of the loaded image, "RGB" by default
+            lazy : bool
+                if True the image is decoded only once it is accessed,
+                which avoids decoding images if only the annotation is used
 
             Returns
             -------
             AnnotatedImageSampleData -> image data and annotation in Coretex.ai format
+
+            Example
+            -------
+            >>> data = sample.load(targetSize = (224, 224))
+            >>> print(data.image.shape)
+            (224, 224, 3)
         """
 
-        return AnnotatedImageSampleData(self.path)
+        if not self.path.exists() and self.zipPath.exists():
+            with self.openArchive() as archive:
+                return AnnotatedImageSampleData(archive, targetSize = targetSize, mode = mode, lazy = lazy)
+
+        imageName = self._findImageName() if self.path.exists() else None
+        return AnnotatedImageSampleData(self.path, imageName, targetSize, mode, lazy)
 
     def loadMetadata(self) -> Dict[str, Any]:
         """
@@ -15,7 +15,7 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import TypeVar, Generic, Dict, Any, List
+from typing import TypeVar, Generic, Dict, Any, List, Optional, BinaryIO
 from typing_extensions import override
 from datetime import datetime
 from pathlib import Path
@@ -23,28 +23,25 @@ from pathlib import Path
 import os
 import time
 import shutil
+import logging
 
 from .sample import Sample
+from .sample_link_index import relinkSample
 from ..project import ProjectType
 from ..._folder_manager import folder_manager
 from ...codable import KeyDescriptor
 from ...networking import NetworkObject, networkManager, NetworkRequestError, \
-    fileChunkUpload, MAX_CHUNK_SIZE, FileData
+    fileChunkUpload, MAX_CHUNK_SIZE, FileData, segmentedDownload, RequestType
+from ...networking.upload_journal import UploadJournal, retainedUploadFile
 from ...utils import TIME_ZONE
+from ...utils.zip_stream import ZipStreamExtractor, UnsupportedZipEntry
 from ...cryptography import getProjectKey, aes
 
 
 SampleDataType = TypeVar("SampleDataType")
 
-
-def _relinkSample(samplePath: Path) -> None:
-    for datasetPath in folder_manager.datasetsFolder.iterdir():
-        linkPath = datasetPath / samplePath.name
-        if not linkPath.exists():
-            continue
-
-        linkPath.unlink()
-        os.link(samplePath, linkPath)
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+STREAM_DOWNLOAD_TIMEOUT = (5, 60)
 
 
 class NetworkSample(Generic[SampleDataType], Sample[SampleDataType], NetworkObject):
@@ -117,15 +114,33 @@ class NetworkSample(Generic[SampleDataType], Sample[SampleDataType], NetworkObje
             FileNotFoundError -> sample file cannot be found
         """
 
-        if not self.downloadPath.exists():
+        localPath = self._localCopyPath()
+        if localPath is None:
             raise FileNotFoundError(
                 f">> [Coretex] Sample file could not be found at {self.downloadPath}. "
                 "Cannot check if file has been modified since last download"
             )
 
-        lastModified = datetime.fromtimestamp(self.downloadPath.stat().st_mtime).astimezone(TIME_ZONE)
+        lastModified = datetime.fromtimestamp(localPath.stat().st_mtime).astimezone(TIME_ZONE)
         return self.lastModified > lastModified
 
+    def _localCopyPath(self) -> Optional[Path]:
+        # Samples downloaded using "streamDownload" do not store the
+        # encrypted file, only the archive and/or the extracted folder
+        for path in [self.downloadPath, self.zipPath, self.path]:
+            if path.exists():
+                return path
+
+        return None
+
+    def _removeLocalCopy(self) -> None:
+        self.downloadPath.unlink(missing_ok = True)
+        self.zipPath.unlink(missing_ok = True)
+        self._contentManifestPath.unlink(missing_ok = True)
+
+        if self.path.exists():
+            shutil.rmtree(self.path)
+
     def decrypt(self, ignoreCache: bool = False) -> None:
         """
             Decrypts the content of this Sample and caches
@@ -151,35 +166,25 @@ class NetworkSample(Generic[SampleDataType], Sample[SampleDataType], NetworkObje
         aes.decryptFile(getProjectKey(self.projectId), self.downloadPath, self.zipPath)
 
         # Relink sample to all datasets to which it belongs
-        _relinkSample(self.zipPath)
+        relinkSample(self.zipPath)
 
     def _download(self, ignoreCache: bool = False) -> None:
-        if self.downloadPath.exists() and self.modifiedSinceLastDownload():
+        if self._localCopyPath() is not None and self.modifiedSinceLastDownload():
             ignoreCache = True
 
-        if ignoreCache and self.downloadPath.exists():
-            self.downloadPath.unlink()
-            if self.path.exists():
-                shutil.rmtree(self.path)
-
-            if self.zipPath.exists() and self.isEncrypted:
-                self.zipPath.unlink()
+        if ignoreCache:
+            self._removeLocalCopy()
 
-        if not ignoreCache and self.downloadPath.exists():
+        if self.downloadPath.exists():
             return
 
         params = {
             "id": self.id
         }
 
-        response = networkManager.streamDownload(
-            f"{self._endpoint()}/export",
-            self.downloadPath,
-            params
-        )
-
-        if response.hasFailed():
-            raise NetworkRequestError(response, f"Failed to download Sample \"{self.name}\"")
+        # Large samples are split into byte ranges which are downloaded
+        # concurrently, interrupted downloads are resumed on the next call
+        segmentedDownload(f"{self._endpoint()}/export", self.downloadPath, params)
 
     @override
     def download(self, decrypt: bool = True, ignoreCache: bool = False) -> None:
@@ -207,15 +212,168 @@ class NetworkSample(Generic[SampleDataType], Sample[SampleDataType], NetworkObje
         os.utime(self.downloadPath, (os.stat(self.downloadPath).st_atime, time.time()))
 
         # If sample was downloaded succesfully relink it to datasets to which it is linked
-        _relinkSample(self.downloadPath)
+        relinkSample(self.downloadPath)
+
+    def _streamArchive(self, unzip: bool, keepArchive: bool) -> None:
+        response = networkManager.request(
+            f"{self._endpoint()}/export",
+            RequestType.get,
+            query = { "id": self.id },
+            stream = True,
+            timeout = STREAM_DOWNLOAD_TIMEOUT
+        )
+
+        if response.hasFailed():
+            raise NetworkRequestError(response, f"Failed to download Sample \"{self.name}\"")
+
+        extractor = ZipStreamExtractor(self.path) if unzip else None
+        archive: Optional[BinaryIO] = self.zipPath.open("wb") if keepArchive else None
+
+        def consume(data: bytes) -> None:
+            nonlocal extractor
+
+            if archive is not None:
+                archive.write(data)
+
+            if extractor is None:
+                return
+
+            try:
+                extractor.feed(data)
+            except UnsupportedZipEntry:
+                if archive is None:
+                    raise
+
+                # Archive is still being stored, it is extracted once it is downloaded
+                extractor.abort()
+                extractor = None
+
+        try:
+            decryptor: Optional[aes.StreamDecryptor] = None
+            header = bytearray()
+
+            for chunk in response.stream(STREAM_CHUNK_SIZE):
+                if not self.isEncrypted:
+                    consume(chunk)
+                    continue
+
+                if decryptor is None:
+                    # First bytes of the encrypted file are the IV
+                    header.extend(chunk)
+                    if len(header) < aes.IV_SIZE:
+                        continue
+
+                    decryptor = aes.StreamDecryptor(getProjectKey(self.projectId), bytes(header[:aes.IV_SIZE]), STREAM_CHUNK_SIZE)
+                    chunk = bytes(header[aes.IV_SIZE:])
+
+                for data in decryptor.feed(chunk):
+                    consume(data)
+
+            if self.isEncrypted:
+                if decryptor is None:
+                    raise ValueError(f">> [Coretex] Encrypted Sample \"{self.name}\" is empty")
+
+                consume(decryptor.flush())
+        finally:
+            response._raw.close()
+
+            if archive is not None:
+                archive.close()
+
+        if extractor is not None:
+            extractor.close()
+            self._saveContent()
+        elif unzip:
+            shutil.rmtree(self.path)
+            super().unzip()
+
+    def streamDownload(self, ignoreCache: bool = False, unzip: bool = True, keepArchive: bool = True) -> None:
+        """
+            Downloads the sample in a single pass: downloaded data is decrypted
+            and unzipped while it is being received, so the encrypted file is
+            never stored and the archive does not have to be read again.
+            Compared to "download" followed by "unzip" this reduces disk usage
+            and the amount of data written to and read from the disk.
+
+            Parameters
+            ----------
+            ignoreCache : bool
+                if True sample is downloaded even if it is already stored locally
+            unzip : bool
+                if True sample archive is extracted to "path"
+            keepArchive : bool
+                if True decrypted archive is stored to "zipPath", if False only
+                the extracted folder is kept
+
+            Raises
+            ------
+            ValueError -> if both unzip and keepArchive are False
+            NetworkRequestError -> if some kind of error happened during
+            the download process
+
+            Example
+            -------
+            >>> from coretex import CustomSample
+            \b
+            >>> sample = CustomSample.fetchById(1023)
+            >>> sample.streamDownload(keepArchive = False)
+            >>> print(list(sample.path.iterdir()))
+        """
+
+        if not unzip and not keepArchive:
+            raise ValueError(">> [Coretex] Sample must be either unzipped or its archive must be kept")
+
+        if self._localCopyPath() is not None and self.modifiedSinceLastDownload():
+            ignoreCache = True
+
+        if not ignoreCache:
+            isUnzipped = not unzip or self.path.exists()
+            hasArchive = not keepArchive or self.zipPath.exists()
+
+            if isUnzipped and hasArchive:
+                return
+
+            if self.zipPath.exists():
+                # Decrypted archive is already stored
+                if unzip:
+                    super().unzip()
+
+                if not keepArchive:
+                    self.zipPath.unlink()
+
+                return
+
+        self._removeLocalCopy()
+
+        try:
+            try:
+                self._streamArchive(unzip, keepArchive)
+            except UnsupportedZipEntry as exception:
+                self._removeLocalCopy()
+
+                logging.getLogger("coretexpylib").warning(f">> [Coretex] Sample \"{self.name}\" cannot be unzipped while downloading ({exception}), downloading it again")
+
+                self._streamArchive(unzip, True)
+                self.zipPath.unlink()
+        except BaseException:
+            # Do not leave partially downloaded sample behind
+            self._removeLocalCopy()
+            raise
+
+        if keepArchive:
+            # Relink sample to all datasets to which it belongs
+            relinkSample(self.zipPath)
 
     @override
     def unzip(self, ignoreCache: bool = False) -> None:
-        if not self.downloadPath.exists():
-            raise RuntimeError("You must first download the Sample before you can unzip it")
+        if self.path.exists() and not ignoreCache:
+            return
+
+        if not self.zipPath.exists():
+            if self.isEncrypted and self.downloadPath.exists():
+                raise RuntimeError("You must first decrypt the Sample before you can unzip it")
 
-        if not self.zipPath.exists() and self.isEncrypted:
-            raise RuntimeError("You must first decrypt the Sample before you can unzip it")
+            raise RuntimeError("You must first download the Sample before you can unzip it")
 
         super().unzip(ignoreCache)
 
@@ -234,9 +392,14 @@ class NetworkSample(Generic[SampleDataType], Sample[SampleDataType], NetworkObje
         if not self.isEncrypted:
             raise RuntimeError("Only encrypted samples can be overwriten.")
 
-        with folder_manager.tempFile() as encryptedPath:
+        def encryptSample(encryptedPath: Path) -> None:
             aes.encryptFile(getProjectKey(self.projectId), samplePath, encryptedPath)
 
+        # Encryption uses a random IV, so the encrypted file is kept until the upload
+        # finishes and the failed upload of the unchanged sample can be resumed
+        fingerprint = UploadJournal.fingerprintFile(samplePath)
+
+        with retainedUploadFile(folder_manager.uploadsFolder, f"sample-{self.id}", fingerprint, ".bin", encryptSample) as encryptedPath:
             params: Dict[str, Any] = {
                 "id": self.id
             }
@@ -248,7 +411,7 @@ class NetworkSample(Generic[SampleDataType], Sample[SampleDataType], NetworkObje
             size = encryptedPath.stat().st_size
 
             if size > MAX_CHUNK_SIZE:
-                params["file_id"] = fileChunkUpload(encryptedPath)
+                params["file_id"] = fileChunkUpload(encryptedPath, journalDirectory = folder_manager.uploadsFolder)
             else:
                 files.append(FileData.createFromPath("file", encryptedPath))
 
@@ -15,12 +15,17 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import TypeVar, Generic, Union
+from typing import TypeVar, Generic, Union, Optional
 from abc import ABC, abstractmethod
 from zipfile import BadZipFile, ZipFile
 from pathlib import Path
 
 import shutil
+import hashlib
+
+from .sample_archive import SampleArchive
+from .sample_content import SampleContent, FileRole
+from ..._folder_manager import folder_manager
 
 
 SampleDataType = TypeVar("SampleDataType")
@@ -55,7 +60,68 @@ class Sample(ABC, Generic[SampleDataType]):
 
         pass
 
+    @property
+    def _contentManifestPath(self) -> Path:
+        # Listing is stored outside of the sample directory, keyed by the sample path
+        key = hashlib.sha256(str(self.path.absolute()).encode("utf-8")).hexdigest()
+        return folder_manager.sampleContentFolder / f"{key}.json"
+
+    @classmethod
+    def _detectFileRole(cls, name: str) -> Optional[FileRole]:
+        """
+            Detects the role of a sample file from its name (path relative
+            to the sample root). Overriden by the samples which know which
+            files they contain.
+        """
+
+        return None
+
+    def _saveContent(self) -> SampleContent:
+        content = SampleContent.scanDirectory(self.path, self.zipPath, self._detectFileRole)
+        content.save(self._contentManifestPath)
+
+        return content
+
+    @property
+    def content(self) -> SampleContent:
+        """
+            Listing of the sample files with their sizes and detected roles.
+            Listing of the extracted sample is stored when the sample is unzipped,
+            so accessing it does not scan the sample directory. If the sample
+            was not extracted the listing is read from the sample archive.
+
+            Returns
+            -------
+            SampleContent -> files which are a part of the sample
+
+            Raises
+            ------
+            FileNotFoundError -> if the sample was neither extracted nor downloaded
+
+            Example
+            -------
+            >>> annotation = sample.content.find(FileRole.annotation)
+            >>> if annotation is not None:
+                    print(sample.joinPath(annotation.name))
+        """
+
+        if self.path.exists():
+            content = SampleContent.load(self._contentManifestPath)
+            if content is not None and content.isExtracted and content.isValidFor(self.zipPath):
+                return content
+
+            # Sample was extracted before the listing was stored, or it was updated since
+            return self._saveContent()
+
+        if not self.zipPath.exists():
+            raise FileNotFoundError(f"Sample \"{self.name}\" does not exist at path \"{self.path}\" or \"{self.zipPath}\"")
+
+        return SampleContent.readArchive(self.zipPath, self._detectFileRole)
+
     def __unzipSample(self) -> None:
+        if self._contentManifestPath.exists():
+            self._contentManifestPath.unlink()
+
         if self.path.exists():
             shutil.rmtree(self.path)
 
@@ -91,6 +157,33 @@ class Sample(ABC, Generic[SampleDataType]):
             # Try to unzip - if it fails again it should crash
             self.__unzipSample()
 
+        self._saveContent()
+
+    def openArchive(self) -> SampleArchive:
+        """
+            Opens the sample archive for reading without extracting it.
+            Files can be listed, read as streams or memory mapped
+            (if they are not compressed) directly from the archive.
+
+            Returns
+            -------
+            SampleArchive -> read-only view of the sample archive
+
+            Raises
+            ------
+            FileNotFoundError -> if the sample archive does not exist
+
+            Example
+            -------
+            >>> with sample.openArchive() as archive:
+                    print(archive.namelist())
+        """
+
+        if not self.zipPath.exists():
+            raise FileNotFoundError(f"Sample \"{self.name}\" archive does not exist at path \"{self.zipPath}\"")
+
+        return SampleArchive(self.zipPath)
+
     @abstractmethod
     def load(self) -> SampleDataType:
         pass
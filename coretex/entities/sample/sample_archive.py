@@ -0,0 +1,281 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, List, Dict, IO, Any
+from typing_extensions import Self
+from types import TracebackType
+from pathlib import Path
+from zipfile import ZipFile, ZipInfo, ZIP_STORED
+
+import mmap
+import struct
+import fnmatch
+
+
+# Local file header: signature, version, flags, compression, time, date,
+# crc, sizes, file name length and extra field length
+_LOCAL_HEADER_STRUCT = struct.Struct("<4s5H3L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+def _matches(name: str, pattern: str) -> bool:
+    # Same as Path.glob, "*" does not match across directories
+    nameParts = name.split("/")
+    patternParts = pattern.split("/")
+
+    if len(nameParts) != len(patternParts):
+        return False
+
+    return all(fnmatch.fnmatchcase(namePart, patternPart) for namePart, patternPart in zip(nameParts, patternParts))
+
+
+class SampleArchive:
+
+    """
+        Read-only view of the sample archive which provides access
+        to the files of the sample without extracting the archive.
+
+        Files can be opened as streams, while stored (uncompressed)
+        files can also be memory mapped directly from the archive.
+        Archive must be closed after use, preferably by using
+        it as a context manager.
+
+        Properties
+        ----------
+        path : Path
+            path to the sample archive
+
+        Example
+        -------
+        >>> with sample.openArchive() as archive:
+                for name in archive.glob("*.png"):
+                    with archive.open(name) as file:
+                        image = Image.open(file)
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+        self._zipFile = ZipFile(path)
+        self._members: Dict[str, ZipInfo] = {
+            member.filename: member
+            for member in self._zipFile.infolist()
+            if not member.is_dir()
+        }
+
+        self._file: Optional[IO[bytes]] = None
+        self._mmap: Optional[mmap.mmap] = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exceptionType: Optional[type],
+        exception: Optional[BaseException],
+        traceback: Optional[TracebackType]
+    ) -> None:
+
+        self.close()
+
+    def __contains__(self, name: Any) -> bool:
+        return name in self._members
+
+    def __getMember(self, name: str) -> ZipInfo:
+        member = self._members.get(name)
+        if member is None:
+            raise FileNotFoundError(f">> [Coretex] File \"{name}\" does not exist in archive \"{self.path}\"")
+
+        return member
+
+    def namelist(self) -> List[str]:
+        """
+            Returns
+            -------
+            List[str] -> names (paths relative to the sample root)
+            of all files inside the archive
+        """
+
+        return list(self._members)
+
+    def glob(self, pattern: str) -> List[str]:
+        """
+            Finds files whose names match the provided pattern.
+            Matching follows the rules of "Path.glob", "*" does
+            not match the directory separator.
+
+            Parameters
+            ----------
+            pattern : str
+                pattern relative to the sample root, for example "*.png"
+
+            Returns
+            -------
+            List[str] -> names of the matching files, in archive order
+        """
+
+        return [name for name in self._members if _matches(name, pattern)]
+
+    def size(self, name: str) -> int:
+        """
+            Returns
+            -------
+            int -> uncompressed size of the file
+
+            Raises
+            ------
+            FileNotFoundError -> if the file does not exist inside the archive
+        """
+
+        return self.__getMember(name).file_size
+
+    def isStored(self, name: str) -> bool:
+        """
+            Returns
+            -------
+            bool -> True if the file is stored without compression
+            and can be memory mapped, False otherwise
+
+            Raises
+            ------
+            FileNotFoundError -> if the file does not exist inside the archive
+        """
+
+        member = self.__getMember(name)
+        return member.compress_type == ZIP_STORED and member.flag_bits & 0x1 == 0
+
+    def open(self, name: str) -> IO[bytes]:
+        """
+            Opens a file from the archive as a binary stream. File is
+            decompressed while it is being read. Stream can be used
+            even after the archive is closed.
+
+            Parameters
+            ----------
+            name : str
+                name of the file inside the archive
+
+            Returns
+            -------
+            IO[bytes] -> readable binary stream
+
+            Raises
+            ------
+            FileNotFoundError -> if the file does not exist inside the archive
+        """
+
+        return self._zipFile.open(self.__getMember(name))
+
+    def read(self, name: str) -> bytes:
+        """
+            Reads the whole file from the archive
+
+            Parameters
+            ----------
+            name : str
+                name of the file inside the archive
+
+            Returns
+            -------
+            bytes -> content of the file
+
+            Raises
+            ------
+            FileNotFoundError -> if the file does not exist inside the archive
+        """
+
+        return self._zipFile.read(self.__getMember(name))
+
+    def __openFile(self) -> IO[bytes]:
+        if self._file is None:
+            self._file = self.path.open("rb")
+
+        return self._file
+
+    def __dataOffset(self, member: ZipInfo) -> int:
+        file = self.__openFile()
+
+        # Extra field in the local header can be different
+        # from the one in the central directory
+        file.seek(member.header_offset)
+        header = _LOCAL_HEADER_STRUCT.unpack(file.read(_LOCAL_HEADER_STRUCT.size))
+
+        if header[0] != _LOCAL_HEADER_SIGNATURE:
+            raise ValueError(f">> [Coretex] Invalid local file header for \"{member.filename}\" in archive \"{self.path}\"")
+
+        fileNameLength: int = header[9]
+        extraFieldLength: int = header[10]
+
+        return member.header_offset + _LOCAL_HEADER_STRUCT.size + fileNameLength + extraFieldLength
+
+    def mmap(self, name: str) -> memoryview:
+        """
+            Memory maps a stored (uncompressed) file directly from the archive,
+            file data is not copied. Returned view must be released before
+            the archive is closed.
+
+            Parameters
+            ----------
+            name : str
+                name of the file inside the archive
+
+            Returns
+            -------
+            memoryview -> read-only view of the file data
+
+            Raises
+            ------
+            FileNotFoundError -> if the file does not exist inside the archive
+            ValueError -> if the file is compressed or encrypted
+
+            Example
+            -------
+            >>> with sample.openArchive() as archive:
+                    view = archive.mmap("features.bin")
+                    features = np.frombuffer(view, dtype = np.float32)
+        """
+
+        member = self.__getMember(name)
+        if not self.isStored(name):
+            raise ValueError(f">> [Coretex] File \"{name}\" is compressed or encrypted and cannot be memory mapped")
+
+        if member.file_size == 0:
+            return memoryview(b"")
+
+        offset = self.__dataOffset(member)
+
+        if self._mmap is None:
+            # Whole archive is mapped once and shared by all views
+            self._mmap = mmap.mmap(self.__openFile().fileno(), 0, access = mmap.ACCESS_READ)
+
+        return memoryview(self._mmap)[offset:offset + member.file_size]
+
+    def close(self) -> None:
+        """
+            Closes the archive. Streams returned by "open" remain usable,
+            while views returned by "mmap" must be released before this call.
+        """
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        self._zipFile.close()
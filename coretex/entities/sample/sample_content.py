@@ -0,0 +1,247 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, Callable, Dict, List, Any
+from typing_extensions import Self
+from enum import Enum
+from pathlib import Path
+from zipfile import ZipFile
+
+import os
+import json
+import logging
+
+
+CONTENT_MANIFEST_VERSION = 1
+
+
+class FileRole(Enum):
+
+    """
+        Role of a file inside the sample, detected from its name
+    """
+
+    image          = "image"
+    thumbnail      = "thumbnail"
+    annotation     = "annotation"
+    metadata       = "metadata"
+    sequence       = "sequence"
+    forwardReads   = "forwardReads"
+    reverseReads   = "reverseReads"
+
+
+RoleDetector = Callable[[str], Optional[FileRole]]
+
+
+class ContentFile:
+
+    """
+        File which is a part of the sample
+
+        Properties
+        ----------
+        name : str
+            path of the file relative to the sample root, uses "/" as separator
+        size : int
+            size of the file in bytes
+        role : Optional[FileRole]
+            detected role of the file, None if the role is unknown
+    """
+
+    def __init__(self, name: str, size: int, role: Optional[FileRole]) -> None:
+        self.name = name
+        self.size = size
+        self.role = role
+
+    @property
+    def isTopLevel(self) -> bool:
+        return "/" not in self.name
+
+    def encode(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": self.size,
+            "role": None if self.role is None else self.role.value
+        }
+
+    @classmethod
+    def decode(cls, value: Dict[str, Any]) -> Self:
+        role = value["role"]
+        return cls(str(value["name"]), int(value["size"]), None if role is None else FileRole(role))
+
+
+def _archiveState(zipPath: Path) -> Optional[List[float]]:
+    if not zipPath.exists():
+        return None
+
+    stat = zipPath.stat()
+    return [stat.st_size, stat.st_mtime]
+
+
+class SampleContent:
+
+    """
+        Listing of the files which are a part of the sample. It is stored
+        in the local storage when the sample is unzipped, so looking up
+        sample files does not require scanning the sample directory.
+
+        Properties
+        ----------
+        files : List[ContentFile]
+            all files of the sample (directories are not included)
+        isExtracted : bool
+            True if the listing was created from the extracted sample directory,
+            False if it was read from the sample archive
+    """
+
+    def __init__(self, files: List[ContentFile], isExtracted: bool, archiveState: Optional[List[float]] = None) -> None:
+        self.files = files
+        self.isExtracted = isExtracted
+
+        self._archiveState = archiveState
+        self._filesByName = { file.name: file for file in files }
+
+    def __contains__(self, name: Any) -> bool:
+        return name in self._filesByName
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def get(self, name: str) -> Optional[ContentFile]:
+        """
+            Returns
+            -------
+            Optional[ContentFile] -> file with the provided name, None if it does not exist
+        """
+
+        return self._filesByName.get(name)
+
+    def add(self, file: ContentFile) -> None:
+        """
+            Adds the file to the listing, replacing the file with the same name if it exists
+
+            Parameters
+            ----------
+            file : ContentFile
+                file which was added to the sample
+        """
+
+        existing = self._filesByName.get(file.name)
+        if existing is not None:
+            self.files.remove(existing)
+
+        self.files.append(file)
+        self._filesByName[file.name] = file
+
+    def withRole(self, *roles: FileRole) -> List[ContentFile]:
+        """
+            Returns
+            -------
+            List[ContentFile] -> files which have any of the provided roles, in listing order
+        """
+
+        return [file for file in self.files if file.role in roles]
+
+    def find(self, *roles: FileRole) -> Optional[ContentFile]:
+        """
+            Returns
+            -------
+            Optional[ContentFile] -> first file which has any of the provided roles, None if there is no such file
+        """
+
+        for file in self.files:
+            if file.role in roles:
+                return file
+
+        return None
+
+    def topLevelNames(self) -> List[str]:
+        """
+            Returns
+            -------
+            List[str] -> names of files and directories in the sample root,
+            same as names of paths returned by "Path.glob("*")" on the sample directory
+        """
+
+        names: Dict[str, None] = {}
+        for file in self.files:
+            names[file.name.split("/", 1)[0]] = None
+
+        return list(names)
+
+    def isValidFor(self, zipPath: Path) -> bool:
+        # Listing is outdated if the sample archive was replaced or updated
+        state = _archiveState(zipPath)
+        return state is None or state == self._archiveState
+
+    @classmethod
+    def scanDirectory(cls, directory: Path, zipPath: Path, detectRole: RoleDetector) -> Self:
+        files: List[ContentFile] = []
+
+        for root, directoryNames, fileNames in os.walk(directory):
+            relativeRoot = Path(root).relative_to(directory)
+
+            for fileName in fileNames:
+                name = (relativeRoot / fileName).as_posix()
+                files.append(ContentFile(name, os.stat(os.path.join(root, fileName)).st_size, detectRole(name)))
+
+        return cls(files, True, _archiveState(zipPath))
+
+    @classmethod
+    def readArchive(cls, zipPath: Path, detectRole: RoleDetector) -> Self:
+        with ZipFile(zipPath) as zipFile:
+            files = [
+                ContentFile(member.filename, member.file_size, detectRole(member.filename))
+                for member in zipFile.infolist()
+                if not member.is_dir()
+            ]
+
+        return cls(files, False, _archiveState(zipPath))
+
+    @classmethod
+    def load(cls, path: Path) -> Optional[Self]:
+        if not path.exists():
+            return None
+
+        try:
+            with path.open("r") as file:
+                data = json.load(file)
+
+            if data["version"] != CONTENT_MANIFEST_VERSION:
+                return None
+
+            archiveState = data["archive"]
+            files = [ContentFile.decode(value) for value in data["files"]]
+
+            return cls(files, bool(data["extracted"]), None if archiveState is None else list(archiveState))
+        except (ValueError, KeyError, TypeError) as exception:
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Ignoring invalid sample content manifest \"{path}\"", exc_info = exception)
+            return None
+
+    def save(self, path: Path) -> None:
+        data = {
+            "version": CONTENT_MANIFEST_VERSION,
+            "extracted": self.isExtracted,
+            "archive": self._archiveState,
+            "files": [file.encode() for file in self.files]
+        }
+
+        tempPath = path.with_name(f"{path.name}.tmp")
+        with tempPath.open("w") as file:
+            json.dump(data, file)
+
+        os.replace(tempPath, path)
@@ -0,0 +1,138 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, List
+from pathlib import Path
+from threading import Lock
+
+import os
+import sqlite3
+import logging
+
+from ..._folder_manager import folder_manager
+
+
+class SampleLinkIndex:
+
+    """
+        Not intended for outside use
+
+        Persistent index of hardlinks which datasets create for samples,
+        maps sample file path to the paths of its links inside dataset
+        directories. Used to update links after a sample file is replaced
+        without scanning every dataset directory.
+
+        Index is stored in a SQLite database so it can be shared by
+        multiple threads and processes.
+    """
+
+    def __init__(self, path: Path, samplesFolder: Path, datasetsFolder: Path) -> None:
+        isNew = not path.exists()
+
+        self._lock = Lock()
+        self._connection = sqlite3.connect(str(path), timeout = 30, check_same_thread = False)
+
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS links (sample TEXT NOT NULL, link TEXT NOT NULL, PRIMARY KEY (sample, link))")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS links_link ON links (link)")
+
+        if isNew:
+            self._indexExistingLinks(samplesFolder, datasetsFolder)
+
+    def _indexExistingLinks(self, samplesFolder: Path, datasetsFolder: Path) -> None:
+        # Datasets which were downloaded before the index existed
+        # link samples using the sample file name
+        sampleNames = set(os.listdir(samplesFolder))
+        rows: List[tuple] = []
+
+        for datasetPath in datasetsFolder.iterdir():
+            if not datasetPath.is_dir():
+                continue
+
+            for name in os.listdir(datasetPath):
+                if name in sampleNames:
+                    rows.append((str(samplesFolder / name), str(datasetPath / name)))
+
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR IGNORE INTO links (sample, link) VALUES (?, ?)", rows)
+
+        logging.getLogger("coretexpylib").debug(f">> [Coretex] Indexed {len(rows)} existing sample links")
+
+    def add(self, samplePath: Path, linkPath: Path) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR IGNORE INTO links (sample, link) VALUES (?, ?)", (str(samplePath), str(linkPath)))
+
+    def remove(self, linkPath: Path) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM links WHERE link = ?", (str(linkPath), ))
+
+    def links(self, samplePath: Path) -> List[Path]:
+        with self._lock:
+            cursor = self._connection.execute("SELECT link FROM links WHERE sample = ?", (str(samplePath), ))
+            return [Path(row[0]) for row in cursor.fetchall()]
+
+
+_sampleLinkIndex: Optional[SampleLinkIndex] = None
+_sampleLinkIndexLock = Lock()
+
+
+def sampleLinkIndex() -> SampleLinkIndex:
+    global _sampleLinkIndex
+
+    with _sampleLinkIndexLock:
+        if _sampleLinkIndex is None:
+            _sampleLinkIndex = SampleLinkIndex(
+                folder_manager.sampleLinksIndexPath,
+                folder_manager.samplesFolder,
+                folder_manager.datasetsFolder
+            )
+
+        return _sampleLinkIndex
+
+
+def linkSample(samplePath: Path, linkPath: Path) -> None:
+    """
+        Creates a hardlink of the sample file and stores it in the index
+    """
+
+    if linkPath.exists():
+        linkPath.unlink()
+
+    os.link(samplePath, linkPath)
+    sampleLinkIndex().add(samplePath, linkPath)
+
+
+def relinkSample(samplePath: Path) -> None:
+    """
+        Updates all hardlinks of the sample file after it was replaced
+    """
+
+    index = sampleLinkIndex()
+
+    for linkPath in index.links(samplePath):
+        if not linkPath.exists():
+            # Link (or the whole dataset) was deleted
+            index.remove(linkPath)
+            continue
+
+        if linkPath.samefile(samplePath):
+            continue
+
+        linkPath.unlink()
+        os.link(samplePath, linkPath)
@@ -15,11 +15,14 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import List
-from pathlib import Path
-from zipfile import ZipFile
+from typing import List, Optional, Callable, IO
+from pathlib import Path, PurePosixPath
+
+import io
+import gzip
 
 from ..local_sample import LocalSample
+from ..sample_content import ContentFile, FileRole
 from ....utils import file as file_utils
 
 
@@ -47,6 +50,36 @@ def getReverseSequenceFile(directoryPath: Path, extensions: List[str]) -> Path:
     raise FileNotFoundError(f">> [Coretex] {directoryPath} has no files with \"_R2_\" in name and extensions \"{extensions}\"")
 
 
+def _findSequenceMember(names: List[str], extensions: List[str], marker: Optional[str]) -> Optional[str]:
+    for name in names:
+        # Only files from the sample root are used, same as when the sample is extracted
+        if "/" in name:
+            continue
+
+        if marker is not None and marker not in name:
+            continue
+
+        if any(name.endswith(extension) or name.endswith(f"{extension}.gz") for extension in extensions):
+            return name
+
+    return None
+
+
+class _GzipMemberStream(gzip.GzipFile):
+
+    # GzipFile does not close the file object it reads from
+    def __init__(self, source: IO[bytes]) -> None:
+        super().__init__(fileobj = source, mode = "rb")
+
+        self._source = source
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._source.close()
+
+
 class LocalSequenceSample(LocalSample):
 
     """
@@ -58,6 +91,29 @@ class LocalSequenceSample(LocalSample):
     def supportedExtensions(cls) -> List[str]:
         return [".fasta", ".fastq", ".fa", ".fq"]
 
+    @classmethod
+    def _detectFileRole(cls, name: str) -> Optional[FileRole]:
+        # Same rules as "getSequenceFile", only uncompressed files from the sample root are used
+        if "/" in name or PurePosixPath(name).suffix not in cls.supportedExtensions():
+            return None
+
+        if "_R1_" in name:
+            return FileRole.forwardReads
+
+        if "_R2_" in name:
+            return FileRole.reverseReads
+
+        return FileRole.sequence
+
+    def _findSequenceFile(self, findFile: Callable[[Path, List[str]], Path], *roles: FileRole) -> Path:
+        # Stored sample content is used instead of listing the sample directory
+        if self.path.exists():
+            file = self.content.find(*roles)
+            if file is not None:
+                return self.path / file.name
+
+        return findFile(self.path, self.supportedExtensions())
+
     @property
     def sequencePath(self) -> Path:
         """
@@ -70,7 +126,7 @@ class LocalSequenceSample(LocalSample):
             ------
             FileNotFoundError -> if no .fasta, .fastq, .fq, or .fq files are found inside the sample
         """
-        return getSequenceFile(self.path, self.supportedExtensions())
+        return self._findSequenceFile(getSequenceFile, FileRole.sequence, FileRole.forwardReads, FileRole.reverseReads)
 
     @property
     def forwardPath(self) -> Path:
@@ -85,7 +141,7 @@ class LocalSequenceSample(LocalSample):
             ------
             FileNotFoundError -> if no .fasta, .fastq, .fq, or .fq files are found inside the sample
         """
-        return getForwardSequenceFile(self.path, self.supportedExtensions())
+        return self._findSequenceFile(getForwardSequenceFile, FileRole.forwardReads)
 
     @property
     def reversePath(self) -> Path:
@@ -100,16 +156,101 @@ class LocalSequenceSample(LocalSample):
             ------
             FileNotFoundError -> if no .fasta, .fastq, .fq, or .fq files are found inside the sample
         """
-        return getReverseSequenceFile(self.path, self.supportedExtensions())
+        return self._findSequenceFile(getReverseSequenceFile, FileRole.reverseReads)
+
+    def _openSequenceFile(self, marker: Optional[str], getPath: Callable[[], Path]) -> IO[bytes]:
+        if self.path.exists():
+            return getPath().open("rb")
+
+        with self.openArchive() as archive:
+            name = _findSequenceMember(archive.namelist(), self.supportedExtensions(), marker)
+            if name is None:
+                markerDescription = "" if marker is None else f" with \"{marker}\" in name"
+                raise FileNotFoundError(f">> [Coretex] Sample \"{self.name}\" has no sequence files{markerDescription}")
+
+            # Stream remains readable after the archive is closed
+            stream = archive.open(name)
+
+        if name.endswith(".gz"):
+            return io.BufferedReader(_GzipMemberStream(stream))
+
+        return stream
+
+    def openSequence(self) -> IO[bytes]:
+        """
+            Opens the .fasta or .fastq sequence file contained inside the sample
+            as a binary stream. If the sample was not extracted the file is read
+            directly from the sample archive, and gzip compressed sequences
+            are decompressed while they are being read.
+
+            Returns
+            -------
+            IO[bytes] -> readable binary stream of the sequence file
+
+            Raises
+            ------
+            FileNotFoundError -> if no .fasta, .fastq, .fa, or .fq files are found inside the sample
+        """
+
+        return self._openSequenceFile(None, lambda: self.sequencePath)
+
+    def openForwardSequence(self) -> IO[bytes]:
+        """
+            Opens the forward sequence file ("_R1_" in the filename) as a binary
+            stream. If the sample was not extracted the file is read directly from
+            the sample archive, and gzip compressed sequences are decompressed
+            while they are being read.
+
+            Returns
+            -------
+            IO[bytes] -> readable binary stream of the forward sequence file
+
+            Raises
+            ------
+            FileNotFoundError -> if no forward sequence file is found inside the sample
+        """
+
+        return self._openSequenceFile("_R1_", lambda: self.forwardPath)
+
+    def openReverseSequence(self) -> IO[bytes]:
+        """
+            Opens the reverse sequence file ("_R2_" in the filename) as a binary
+            stream. If the sample was not extracted the file is read directly from
+            the sample archive, and gzip compressed sequences are decompressed
+            while they are being read.
+
+            Returns
+            -------
+            IO[bytes] -> readable binary stream of the reverse sequence file
+
+            Raises
+            ------
+            FileNotFoundError -> if no reverse sequence file is found inside the sample
+        """
+
+        return self._openSequenceFile("_R2_", lambda: self.reversePath)
 
     def unzip(self, ignoreCache: bool = False) -> None:
         super().unzip(ignoreCache)
+
+        # Listing stored by the unzip is reused to find compressed sequences
+        content = self.content
+
         for extension in self.supportedExtensions():
-            for compressedSequencePath in self.path.glob(f"*{extension}.gz"):
+            for file in list(content.files):
+                if not file.isTopLevel or not file.name.endswith(f"{extension}.gz"):
+                    continue
+
+                compressedSequencePath = self.path / file.name
                 decompressedSequencePath = compressedSequencePath.parent / compressedSequencePath.stem
 
                 file_utils.gzipDecompress(compressedSequencePath, decompressedSequencePath)
 
+                name = decompressedSequencePath.name
+                content.add(ContentFile(name, decompressedSequencePath.stat().st_size, self._detectFileRole(name)))
+
+        content.save(self._contentManifestPath)
+
     def isPairedEnd(self) -> bool:
         """
             This function returns True if the sample holds paired-end reads and
@@ -125,7 +266,7 @@ class LocalSequenceSample(LocalSample):
                 or paired-end sequencing reads
         """
 
-        with ZipFile(self.zipPath, "r") as archive:
+        with self.openArchive() as archive:
             sampleContent = archive.namelist()
 
         for extension in self.supportedExtensions():
@@ -342,6 +342,56 @@ class TaskRun(NetworkObject, Generic[DatasetType]):
         response = networkManager.post(f"{self._endpoint()}/metrics", parameters)
         return not response.hasFailed()
 
+    def submitNetworkMetrics(self) -> bool:
+        """
+            Submits totals of networkManager request statistics (requests, retries,
+            bytes sent/received and time spent waiting for responses) as metrics.
+            Metrics are created the first time this function is called.
+            Per endpoint statistics are available using networkManager.statistics
+
+            Returns
+            -------
+            bool -> True if metrics were submitted, False otherwise
+
+            Raises
+            ------
+            NetworkRequestError -> if the metrics could not be created
+
+            Example
+            -------
+            >>> from coretex import currentTaskRun
+            \b
+            >>> taskRun = currentTaskRun()
+            >>> for epoch in range(epochs):
+                    train(taskRun.dataset)
+                    taskRun.submitNetworkMetrics()
+        """
+
+        metrics = [
+            Metric.create("network_requests", "time (s)", MetricType.interval, "requests", MetricType.int),
+            Metric.create("network_retries", "time (s)", MetricType.interval, "retries", MetricType.int),
+            Metric.create("network_bytes_sent", "time (s)", MetricType.interval, "bytes", MetricType.bytes),
+            Metric.create("network_bytes_received", "time (s)", MetricType.interval, "bytes", MetricType.bytes),
+            Metric.create("network_time", "time (s)", MetricType.interval, "time (s)", MetricType.float)
+        ]
+
+        existing = [metric.name for metric in self.metrics]
+        missing = [metric for metric in metrics if metric.name not in existing]
+
+        if len(missing) > 0:
+            self.createMetrics(missing)
+
+        summary = networkManager.statistics.summary()
+        x = time.time()
+
+        return self.submitMetrics({
+            "network_requests": (x, summary["requests"]),
+            "network_retries": (x, summary["retries"]),
+            "network_bytes_sent": (x, summary["bytesSent"]),
+            "network_bytes_received": (x, summary["bytesReceived"]),
+            "network_time": (x, summary["totalDuration"])
+        })
+
     def submitOutput(self, parameterName: str, value: Any) -> None:
         """
             Submit an output of this task to act as a parameter in tasks
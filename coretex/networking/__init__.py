@@ -18,7 +18,12 @@
 from .network_manager_base import NetworkManagerBase, RequestFailedError
 from .network_manager import networkManager
 from .network_object import NetworkObject, DEFAULT_PAGE_SIZE
-from .network_response import NetworkResponse, NetworkRequestError
+from .network_response import NetworkResponse, NetworkRequestError, DOWNLOAD_CHUNK_SIZE
 from .request_type import RequestType
-from .chunk_upload_session import ChunkUploadSession, MAX_CHUNK_SIZE, fileChunkUpload
+from .chunk_upload_session import ChunkUploadSession, StreamChunkUploadSession, MAX_CHUNK_SIZE, fileChunkUpload
 from .file_data import FileData
+from .download_statistics import DownloadStatistics
+from .segmented_download import SegmentedDownloadSession, segmentedDownload
+from .response_cache import ResponseCache
+from .rate_limiter import AdaptiveRateLimiter
+from .request_statistics import RequestStatistics, EndpointStatistics
@@ -15,23 +15,80 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Union
+from typing import Any, Optional, Union, Iterator, Dict, List
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from threading import Lock, BoundedSemaphore
 
+import mmap
+import time
 import logging
 
 from .network_manager_base import FileData
 from .network_manager import networkManager
 from .network_response import NetworkRequestError
+from .upload_journal import UploadJournal
+from .utils import FileBytesType
 
 
 MAX_CHUNK_SIZE = 128 * 1024 * 1024  # 128 MiB
+DEFAULT_WORKER_COUNT = 4
+DEFAULT_MAX_MEMORY = 1024 * 1024 * 1024  # 1 GiB
 
+# requests builds the whole multipart body in memory, which means that
+# a chunk is copied twice while it is being uploaded (body buffer + body)
+CHUNK_MEMORY_OVERHEAD = 2
 
-def _loadChunk(filePath: Path, start: int, chunkSize: int) -> bytes:
-    with filePath.open("rb") as file:
-        file.seek(start)
-        return file.read(chunkSize)
+
+def _startUpload(size: int, name: str) -> str:
+    parameters = {
+        "size": size
+    }
+
+    response = networkManager.post("upload/start", parameters)
+    if response.hasFailed():
+        raise NetworkRequestError(response, f"Failed to start chunked upload for \"{name}\"")
+
+    uploadId = response.getJson(dict).get("id")
+
+    if not isinstance(uploadId, str):
+        raise ValueError(f">> [Coretex] Invalid API response, invalid value \"{uploadId}\" for field \"id\"")
+
+    return uploadId
+
+
+def _uploadChunk(uploadId: str, start: int, chunk: FileBytesType, name: str) -> None:
+    end = start + len(chunk)
+
+    parameters = {
+        "id": uploadId,
+        "start": start,
+        "end": end - 1  # API expects start/end to be inclusive
+    }
+
+    files = [
+        FileData.createFromBytes("file", chunk, name)
+    ]
+
+    response = networkManager.formData("upload/chunk", parameters, files)
+    if response.hasFailed():
+        raise NetworkRequestError(response, f"Failed to upload file chunk with byte range \"{start}-{end}\"")
+
+
+@contextmanager
+def _mapChunk(filePath: Path, start: int, size: int) -> Iterator[memoryview]:
+    # mmap offset must be a multiple of the allocation granularity
+    offset = start - start % mmap.ALLOCATIONGRANULARITY
+    padding = start - offset
+
+    with filePath.open("rb") as file, mmap.mmap(file.fileno(), padding + size, offset = offset, access = mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)[padding:padding + size]
+
+        try:
+            yield view
+        finally:
+            view.release()
 
 
 class ChunkUploadSession:
@@ -44,6 +101,11 @@ class ChunkUploadSession:
 
         Maximum chunk size is 128 MiB.
 
+        Chunks are memory mapped from the file, and multiple
+        chunks can be uploaded concurrently.
+        Number of chunks which are uploaded at the same time is limited
+        by both "workerCount" and "maxMemory".
+
         Properties
         ----------
         chunkSize : int
@@ -53,52 +115,85 @@ class ChunkUploadSession:
             path to the file which will be uploaded
         fileSize : int
             size of the file which will be uploaded
+        workerCount : int
+            maximum number of chunks which are uploaded concurrently
+        maxMemory : int
+            upper bound (in bytes) for memory used by chunks which are
+            being uploaded, at least one chunk is always uploaded
+        chunkDurations : Dict[int, float]
+            upload duration (in seconds) of every uploaded chunk,
+            mapped by the start of the chunk byte range
+        journalDirectory : Optional[Path]
+            if set, progress of the upload is stored in a journal inside
+            this directory and a failed upload of the same (unchanged)
+            file continues from the chunks which were not uploaded
     """
 
-    def __init__(self, chunkSize: int, filePath: Union[Path, str]) -> None:
+    def __init__(
+        self,
+        chunkSize: int,
+        filePath: Union[Path, str],
+        workerCount: int = DEFAULT_WORKER_COUNT,
+        maxMemory: int = DEFAULT_MAX_MEMORY,
+        journalDirectory: Optional[Path] = None
+    ) -> None:
+
         if chunkSize <= 0 or chunkSize > MAX_CHUNK_SIZE:
             raise ValueError(f">> [Coretex] Invalid \"chunkSize\" value \"{chunkSize}\". Value must be in range 0-{MAX_CHUNK_SIZE}")
 
+        if workerCount <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"workerCount\" value \"{workerCount}\". Value must be greater than 0")
+
         if isinstance(filePath, str):
             filePath = Path(filePath)
 
         self.chunkSize = chunkSize
         self.filePath = filePath
         self.fileSize = filePath.lstat().st_size
+        self.workerCount = workerCount
+        self.maxMemory = maxMemory
+        self.chunkDurations: Dict[int, float] = {}
+        self.journalDirectory = journalDirectory
 
-    def __start(self) -> str:
-        parameters = {
-            "size": self.fileSize
-        }
+        self._lock = Lock()
+
+    @property
+    def chunkCount(self) -> int:
+        chunkCount = self.fileSize // self.chunkSize
+        if self.fileSize % self.chunkSize != 0:
+            chunkCount += 1
 
-        response = networkManager.post("upload/start", parameters)
-        if response.hasFailed():
-            raise NetworkRequestError(response, f"Failed to start chunked upload for \"{self.filePath}\"")
+        return chunkCount
 
-        uploadId = response.getJson(dict).get("id")
+    @property
+    def concurrentChunkCount(self) -> int:
+        """
+            Number of chunks which will be uploaded at the same time
+        """
 
-        if not isinstance(uploadId, str):
-            raise ValueError(f">> [Coretex] Invalid API response, invalid value \"{uploadId}\" for field \"id\"")
+        memoryLimitedCount = self.maxMemory // (self.chunkSize * CHUNK_MEMORY_OVERHEAD)
+        return max(1, min(self.workerCount, memoryLimitedCount, self.chunkCount))
+
+    def __start(self) -> str:
+        return _startUpload(self.fileSize, self.filePath.name)
 
-        return uploadId
+    def __uploadChunk(self, journal: UploadJournal, start: int, end: int) -> None:
+        if journal.isUploaded(start, end):
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Skipping already uploaded chunk with range \"{start}-{end}\"")
+            return
 
-    def __uploadChunk(self, uploadId: str, start: int, end: int) -> None:
-        parameters = {
-            "id": uploadId,
-            "start": start,
-            "end": end - 1  # API expects start/end to be inclusive
-        }
+        uploadStart = time.perf_counter()
 
-        chunk = _loadChunk(self.filePath, start, self.chunkSize)
-        files = [
-            FileData.createFromBytes("file", chunk, self.filePath.name)
-        ]
+        with _mapChunk(self.filePath, start, end - start) as chunk:
+            _uploadChunk(journal.uploadId, start, chunk, self.filePath.name)
 
-        response = networkManager.formData("upload/chunk", parameters, files)
-        if response.hasFailed():
-            raise NetworkRequestError(response, f"Failed to upload file chunk with byte range \"{start}-{end}\"")
+        duration = time.perf_counter() - uploadStart
+        with self._lock:
+            self.chunkDurations[start] = duration
 
-        logging.getLogger("coretexpylib").debug(f">> [Coretex] Uploaded chunk with range \"{start}-{end}\"")
+        journal.acknowledge(start, end)
+
+        logging.getLogger("coretexpylib").debug(f">> [Coretex] Uploaded chunk with range \"{start}-{end}\" in {duration:.3f}s")
 
     def run(self) -> str:
         """
@@ -128,22 +223,272 @@ class ChunkUploadSession:
         """
         logging.getLogger("coretexpylib").debug(f">> [Coretex] Starting upload for \"{self.filePath}\"")
 
-        uploadId = self.__start()
+        fingerprint: Dict[str, Any] = {}
+        journal: Optional[UploadJournal] = None
 
-        chunkCount = self.fileSize // self.chunkSize
-        if self.fileSize % self.chunkSize != 0:
-            chunkCount += 1
+        if self.journalDirectory is not None:
+            fingerprint = UploadJournal.fingerprintFile(self.filePath)
+            journal = UploadJournal.load(self.journalDirectory, self.filePath, self.chunkSize, fingerprint)
+
+        if journal is not None:
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Resuming upload \"{journal.uploadId}\" for \"{self.filePath}\"")
+
+            try:
+                return self.__uploadChunks(journal)
+            except NetworkRequestError:
+                # Upload session might have expired on the server, so if
+                # no progress was made start a new upload session instead
+                if journal.acknowledgedCount > 0:
+                    raise
+
+                logging.getLogger("coretexpylib").debug(f">> [Coretex] Failed to resume upload \"{journal.uploadId}\", starting a new upload")
+                journal.remove()
+
+        journal = UploadJournal(self.journalDirectory, self.filePath, self.__start(), self.chunkSize, fingerprint)
+        journal.save()
+
+        return self.__uploadChunks(journal)
+
+    def __uploadChunks(self, journal: UploadJournal) -> str:
+        futures: List[Future] = []
+
+        with ThreadPoolExecutor(max_workers = self.concurrentChunkCount) as pool:
+            for i in range(self.chunkCount):
+                start = i * self.chunkSize
+                end = min(start + self.chunkSize, self.fileSize)
+
+                futures.append(pool.submit(self.__uploadChunk, journal, start, end))
+
+        for future in futures:
+            exception = future.exception()
+            if exception is not None:
+                raise exception
+
+        journal.remove()
+        return journal.uploadId
+
+
+class StreamChunkUploadSession:
+
+    """
+        A class which uploads a stream of bytes chunk by chunk, without
+        storing the data to a file first. Data passed to "write" is collected
+        in memory until a whole chunk is available, after which the chunk is
+        uploaded in the background while the next chunk is being collected.
+        "write" blocks while the maximum number of chunks is being uploaded,
+        so memory usage is bounded by "maxMemory".
+
+        Total size of the stream must be known before the upload starts.
+
+        Properties
+        ----------
+        size : int
+            total number of bytes which will be written to the session
+        name : str
+            name of the uploaded file
+        chunkSize : int
+            size of chunks into which the stream will be split
+            maximum value is 128 MiB, while the minimum value is 1
+        workerCount : int
+            maximum number of chunks which are uploaded concurrently
+        maxMemory : int
+            upper bound (in bytes) for memory used by chunks which are
+            being uploaded, at least one chunk is always uploaded
+        chunkDurations : Dict[int, float]
+            upload duration (in seconds) of every uploaded chunk,
+            mapped by the start of the chunk byte range
+    """
+
+    def __init__(
+        self,
+        size: int,
+        name: str,
+        chunkSize: int = MAX_CHUNK_SIZE,
+        workerCount: int = DEFAULT_WORKER_COUNT,
+        maxMemory: int = DEFAULT_MAX_MEMORY
+    ) -> None:
+
+        if chunkSize <= 0 or chunkSize > MAX_CHUNK_SIZE:
+            raise ValueError(f">> [Coretex] Invalid \"chunkSize\" value \"{chunkSize}\". Value must be in range 0-{MAX_CHUNK_SIZE}")
+
+        if workerCount <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"workerCount\" value \"{workerCount}\". Value must be greater than 0")
+
+        if size < 0:
+            raise ValueError(f">> [Coretex] Invalid \"size\" value \"{size}\". Value must not be negative")
+
+        self.size = size
+        self.name = name
+        self.chunkSize = chunkSize
+        self.workerCount = workerCount
+        self.maxMemory = maxMemory
+        self.chunkDurations: Dict[int, float] = {}
+
+        self._lock = Lock()
+        self._uploadId: Optional[str] = None
+        self._buffer = bytearray()
+        self._position = 0
+        self._futures: List[Future] = []
+        self._pool = ThreadPoolExecutor(max_workers = self.concurrentChunkCount)
+        self._slots = BoundedSemaphore(self.concurrentChunkCount)
+
+    @property
+    def concurrentChunkCount(self) -> int:
+        """
+            Number of chunks which will be uploaded at the same time
+        """
+
+        memoryLimitedCount = self.maxMemory // (self.chunkSize * CHUNK_MEMORY_OVERHEAD)
+        return max(1, min(self.workerCount, memoryLimitedCount))
+
+    @property
+    def uploadedSize(self) -> int:
+        """
+            Number of bytes which were passed to the upload workers
+        """
+
+        return self._position
+
+    def __uploadChunk(self, uploadId: str, start: int, chunk: bytearray) -> None:
+        uploadStart = time.perf_counter()
+        _uploadChunk(uploadId, start, chunk, self.name)
+        duration = time.perf_counter() - uploadStart
+
+        with self._lock:
+            self.chunkDurations[start] = duration
+
+        logging.getLogger("coretexpylib").debug(f">> [Coretex] Uploaded chunk with range \"{start}-{start + len(chunk)}\" in {duration:.3f}s")
+
+    def __raiseFailure(self) -> None:
+        pending: List[Future] = []
+
+        for future in self._futures:
+            if not future.done():
+                pending.append(future)
+                continue
+
+            exception = future.exception()
+            if exception is not None:
+                raise exception
+
+        # Keep only the uploads which are still running
+        self._futures = pending
+
+    def __submit(self) -> None:
+        chunk = self._buffer
+        self._buffer = bytearray()
+
+        if self._position + len(chunk) > self.size:
+            raise ValueError(f">> [Coretex] Stream \"{self.name}\" is larger than the declared size of {self.size} bytes")
+
+        if self._uploadId is None:
+            self._uploadId = _startUpload(self.size, self.name)
+
+        # Waits until one of the chunks is uploaded if maximum number of chunks is being uploaded
+        self._slots.acquire()
+
+        try:
+            self.__raiseFailure()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future = self._pool.submit(self.__uploadChunk, self._uploadId, self._position, chunk)
+        future.add_done_callback(lambda _: self._slots.release())
+
+        self._futures.append(future)
+        self._position += len(chunk)
+
+    def write(self, data: FileBytesType) -> int:
+        """
+            Adds data to the uploaded stream. Whole chunks are uploaded
+            in the background as soon as they are collected.
+
+            Parameters
+            ----------
+            data : FileBytesType
+                next part of the stream
+
+            Returns
+            -------
+            int -> number of written bytes
+
+            Raises
+            ------
+            NetworkRequestError -> if upload of one of the previous chunks failed
+            ValueError -> if the stream is larger than the declared size
+        """
+
+        view = memoryview(data).cast("B")
+        offset = 0
+
+        while offset < len(view):
+            count = min(self.chunkSize - len(self._buffer), len(view) - offset)
+            self._buffer += view[offset:offset + count]
+            offset += count
+
+            if len(self._buffer) == self.chunkSize:
+                self.__submit()
+
+        return len(view)
+
+    def finish(self) -> str:
+        """
+            Uploads the remaining data and waits until all chunks are uploaded
+
+            Returns
+            -------
+            str -> ID of the uploaded file
+
+            Raises
+            ------
+            NetworkRequestError -> if upload of any chunk failed
+            ValueError -> if the number of written bytes does not match the declared size
+        """
+
+        try:
+            if len(self._buffer) > 0:
+                self.__submit()
+
+            if self._uploadId is None:
+                # Nothing was written, upload of an empty file still has to be started
+                self._uploadId = _startUpload(self.size, self.name)
+
+            for future in self._futures:
+                exception = future.exception()
+                if exception is not None:
+                    raise exception
+
+            if self._position != self.size:
+                raise ValueError(f">> [Coretex] Stream \"{self.name}\" has {self._position} bytes, but {self.size} bytes were declared")
+
+            return self._uploadId
+        finally:
+            self.abort()
+
+    def abort(self) -> None:
+        """
+            Cancels chunks which were not uploaded yet and waits for
+            the active chunk uploads to finish
+        """
+
+        for future in self._futures:
+            future.cancel()
 
-        for i in range(chunkCount):
-            start = i * self.chunkSize
-            end = min(start + self.chunkSize, self.fileSize)
+        self._pool.shutdown(wait = True)
+        self._futures.clear()
+        self._buffer = bytearray()
 
-            self.__uploadChunk(uploadId, start, end)
 
-        return uploadId
+def fileChunkUpload(
+    path: Path,
+    chunkSize: int = MAX_CHUNK_SIZE,
+    workerCount: int = DEFAULT_WORKER_COUNT,
+    maxMemory: int = DEFAULT_MAX_MEMORY,
+    journalDirectory: Optional[Path] = None
+) -> str:
 
 
-def fileChunkUpload(path: Path, chunkSize: int = MAX_CHUNK_SIZE) -> str:
     """
         Uploads file in chunks to Coretex.ai server.
         Should be used when uploading large files.
@@ -155,6 +500,14 @@ def fileChunkUpload(path: Path, chunkSize: int = MAX_CHUNK_SIZE) -> str:
         chunkSize : int
             Size of the chunks into which file will be split
             before uploading. Maximum value is 128 MiBs
+        workerCount : int
+            Maximum number of chunks which are uploaded concurrently
+        maxMemory : int
+            Upper bound (in bytes) for memory used by chunks
+            which are being uploaded
+        journalDirectory : Optional[Path]
+            Directory where upload progress is stored. If set and a previous
+            upload of the same file failed only chunks which were not uploaded are sent
 
         Returns
         -------
@@ -167,5 +520,5 @@ def fileChunkUpload(path: Path, chunkSize: int = MAX_CHUNK_SIZE) -> str:
     if chunkSize > MAX_CHUNK_SIZE:
         chunkSize = MAX_CHUNK_SIZE
 
-    uploadSession = ChunkUploadSession(MAX_CHUNK_SIZE, path)
+    uploadSession = ChunkUploadSession(chunkSize, path, workerCount, maxMemory, journalDirectory)
     return uploadSession.run()
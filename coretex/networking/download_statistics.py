@@ -0,0 +1,72 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional
+
+import time
+
+
+class DownloadStatistics:
+
+    """
+        Contains transfer statistics of a single file download
+
+        Properties
+        ----------
+        bytesDownloaded : int
+            number of bytes written to the destination
+        timeToFirstByte : Optional[float]
+            seconds between sending the request and receiving
+            the first chunk of the body, None if body was empty
+        duration : float
+            seconds between sending the request and writing
+            the last chunk to the destination
+    """
+
+    def __init__(self) -> None:
+        self.bytesDownloaded = 0
+        self.timeToFirstByte: Optional[float] = None
+        self.duration = 0.0
+
+        self._start = time.perf_counter()
+
+    @property
+    def bytesPerSecond(self) -> float:
+        """
+            Average download speed in bytes per second
+        """
+
+        if self.duration <= 0:
+            return 0.0
+
+        return self.bytesDownloaded / self.duration
+
+    def chunkReceived(self, size: int) -> None:
+        if self.timeToFirstByte is None:
+            self.timeToFirstByte = time.perf_counter() - self._start
+
+        self.bytesDownloaded += size
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._start
+
+    def __str__(self) -> str:
+        timeToFirstByte = "n/a" if self.timeToFirstByte is None else f"{self.timeToFirstByte:.3f}s"
+        return (
+            f"{self.bytesDownloaded} bytes in {self.duration:.3f}s "
+            f"({self.bytesPerSecond / 1024 ** 2:.2f} MiB/s, TTFB: {timeToFirstByte})"
+        )
@@ -15,11 +15,12 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Optional, Tuple, Union, BinaryIO
+from typing import Optional, Tuple, Union, BinaryIO, cast
 from typing_extensions import Self
 from pathlib import Path
 from contextlib import ExitStack
 
+from .utils import FileBytesType
 from ..utils import guessMimeType
 
 
@@ -48,8 +49,8 @@ class FileData:
             Mime type of the file which will be uploaded
         filePath : Optional[str]
             Path to the file which will be uploaded
-        fileBytes : Optional[bytes]
-            Bytes of the file which will be uploaded
+        fileBytes : Optional[FileBytesType]
+            Bytes of the file which will be uploaded, can be any bytes-like object
     """
 
     def __init__(
@@ -58,7 +59,7 @@ class FileData:
         fileName: str,
         mimeType: str,
         filePath: Optional[Path] = None,
-        fileBytes: Optional[bytes] = None
+        fileBytes: Optional[FileBytesType] = None
     ) -> None:
 
         if filePath is None and fileBytes is None:
@@ -124,7 +125,7 @@ class FileData:
     def createFromBytes(
         cls,
         parameterName: str,
-        fileBytes: bytes,
+        fileBytes: FileBytesType,
         fileName: str,
         mimeType: Optional[str] = None
     ) -> Self:
@@ -137,8 +138,8 @@ class FileData:
             ----------
             parameterName : str
                 Name of the form-data parameter
-            fileBytes : bytes
-                Bytes of the file which will be uploaded
+            fileBytes : FileBytesType
+                Bytes of the file which will be uploaded, can be any bytes-like object
             fileName : str
                 Name of the file which will be uploaded, if None it will
                 be extracted from the "filePath" parameter
@@ -157,9 +158,14 @@ class FileData:
         return cls(parameterName, fileName, mimeType, fileBytes = fileBytes)
 
     def __getFileData(self, exitStack: ExitStack) -> Union[bytes, BinaryIO]:
-        if self.fileBytes is not None:
+        if isinstance(self.fileBytes, bytes):
             return self.fileBytes
 
+        if self.fileBytes is not None:
+            # requests accepts any bytes-like object, multipart
+            # body is built by copying it into the request body
+            return cast(bytes, self.fileBytes)
+
         if self.filePath is not None:
             return exitStack.enter_context(self.filePath.open("rb"))
 
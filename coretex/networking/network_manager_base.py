@@ -21,9 +21,11 @@ from abc import ABC, abstractmethod
 from contextlib import ExitStack
 from http import HTTPStatus
 from importlib.metadata import version as getLibraryVersion
+from threading import RLock
 
 import os
 import json
+import hashlib
 import logging
 import platform
 import random
@@ -34,11 +36,17 @@ import requests.adapters
 
 from .utils import RequestBodyType, RequestFormType, logFilesData, logRequestFailure
 from .request_type import RequestType
-from .network_response import NetworkResponse, NetworkRequestError
+from .network_response import NetworkResponse, NetworkRequestError, DOWNLOAD_CHUNK_SIZE
+from .download_statistics import DownloadStatistics
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
+from .rate_limiter import AdaptiveRateLimiter, rateLimiter
+from .request_statistics import RequestStatistics
 from .file_data import FileData
 
 
 REQUEST_TIMEOUT = 5
+DOWNLOAD_TIMEOUT = (5, 60)
 MAX_RETRY_COUNT = 5
 LOGIN_ENDPOINT = "user/login"
 REFRESH_ENDPOINT = "user/refresh"
@@ -46,12 +54,41 @@ API_TOKEN_HEADER = "api-token"
 API_TOKEN_KEY = "token"
 REFRESH_TOKEN_KEY = "refresh_token"
 
+# Segmented downloads of all threads share this many connections,
+# e.g. 8 samples which are downloaded at the same time with 4 segments each
+MAX_SEGMENT_CONNECTIONS = 32
+
 RETRY_STATUS_CODES = [
     HTTPStatus.TOO_MANY_REQUESTS,
     HTTPStatus.INTERNAL_SERVER_ERROR,
     HTTPStatus.SERVICE_UNAVAILABLE
 ]
 
+
+def _requestKey(
+    endpoint: str,
+    headers: Dict[str, str],
+    query: Optional[Dict[str, Any]],
+    body: Optional[RequestBodyType],
+    auth: Optional[Tuple[str, str]]
+) -> str:
+
+    # Identifies GET requests which can share a response, used for both request
+    # coalescing and the response cache. Credentials are a part of the key so
+    # responses are never shared between users, but only their hash is stored
+    # since the response cache can persist keys to the disk
+    headers = dict(headers)
+    apiToken = headers.pop(API_TOKEN_HEADER, None)
+    credentials = hashlib.sha256(json.dumps([apiToken, auth]).encode("UTF-8")).hexdigest()
+
+    return json.dumps([endpoint, headers, query, body, credentials], sort_keys = True, default = str)
+
+# Status codes which mean that the client is sending too many requests
+THROTTLE_STATUS_CODES = [
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.SERVICE_UNAVAILABLE
+]
+
 TimeoutType = Optional[Union[int, Tuple[int, int]]]
 
 
@@ -65,6 +102,37 @@ def getDelayBeforeRetry(retryCount: int) -> int:
     return random.randint(start, end)
 
 
+def getRetryAfter(response: NetworkResponse, retryCount: int) -> int:
+    # Respect the delay requested by the server if it is provided in seconds
+    retryAfter = response.headers.get("Retry-After")
+    if retryAfter is not None and retryAfter.strip().isdigit():
+        return int(retryAfter)
+
+    return getDelayBeforeRetry(retryCount)
+
+
+def _bodySize(body: Any) -> int:
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        return len(body)
+
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+
+    # Streamed bodies (files, generators) are not measured
+    return 0
+
+
+def _responseSize(response: requests.Response, stream: bool) -> int:
+    if not stream:
+        return len(response.content)
+
+    contentLength = response.headers.get("Content-Length")
+    if contentLength is None or not contentLength.isdigit():
+        return 0
+
+    return int(contentLength)
+
+
 class RequestFailedError(Exception):
 
     def __init__(self, endpoint: str, type_: RequestType) -> None:
@@ -80,11 +148,18 @@ class NetworkManagerBase(ABC):
         if cpuCount is None:
             cpuCount = 1
 
-        # 10 is default, keep that value for machines which have <= 10 cores
-        adapter = requests.adapters.HTTPAdapter(pool_maxsize = max(10, cpuCount))
+        # 10 is default, keep that value for machines which have <= 10 cores,
+        # connections used by segmented downloads are kept in addition to that
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize = max(10, cpuCount) + MAX_SEGMENT_CONNECTIONS)
         self._session.mount("http://", adapter)
         self._session.mount("https://", adapter)
 
+        self._responseCache: Optional[ResponseCache] = None
+        self._singleFlight: SingleFlight[NetworkResponse] = SingleFlight()
+        self._refreshLock = RLock()
+        self._rateLimiter = rateLimiter
+        self._statistics = RequestStatistics()
+
     @property
     def serverUrl(self) -> str:
         return os.environ["CTX_API_URL"] + "api/v1/"
@@ -126,6 +201,42 @@ class NetworkManagerBase(ABC):
 
         raise NotImplementedError
 
+    @property
+    def responseCache(self) -> Optional[ResponseCache]:
+        return self._responseCache
+
+    def setResponseCache(self, cache: Optional[ResponseCache]) -> None:
+        """
+            Enables caching of GET responses using the provided cache,
+            caching is disabled if None is provided
+
+            Parameters
+            ----------
+            cache : Optional[ResponseCache]
+                cache in which the responses will be stored
+
+            Example
+            -------
+            >>> from coretex.networking import networkManager, ResponseCache
+            \b
+            >>> networkManager.setResponseCache(ResponseCache(defaultTtl = 120))
+        """
+
+        self._responseCache = cache
+
+    @property
+    def rateLimiter(self) -> AdaptiveRateLimiter:
+        return self._rateLimiter
+
+    @property
+    def statistics(self) -> RequestStatistics:
+        """
+            Per endpoint statistics (count, latency, bytes, retries
+            and status codes) of requests sent by this network manager
+        """
+
+        return self._statistics
+
     def _headers(self, contentType: str = "application/json") -> Dict[str, str]:
         headers = {
             "Content-Type": contentType,
@@ -163,13 +274,26 @@ class NetworkManagerBase(ABC):
             # If we get unauthorized maybe API token is expired
             # If refresh endpoint failed with unauthorized do not retry
             if response.isUnauthorized() and response.endpoint != REFRESH_ENDPOINT:
-                refreshTokenResponse = self.refreshToken()
-                return not refreshTokenResponse.hasFailed()
+                return self._refreshExpiredToken(response)
 
             return response.statusCode in RETRY_STATUS_CODES
 
         return True
 
+    def _refreshExpiredToken(self, response: NetworkResponse) -> bool:
+        # Token which was used for the request which failed with unauthorized
+        request = response._raw.request
+        expiredToken = request.headers.get(API_TOKEN_HEADER) if request is not None else None
+
+        # Refresh is serialized so parallel requests which failed with the same
+        # expired token trigger only one refresh, other threads wait for it to
+        # finish and then retry using the new token
+        with self._refreshLock:
+            if self._apiToken is not None and self._apiToken != expiredToken:
+                return True
+
+            return not self.refreshToken().hasFailed()
+
     def request(
         self,
         endpoint: str,
@@ -221,64 +345,145 @@ class NetworkManagerBase(ABC):
         if headers is None:
             headers = self._headers()
 
-        url = self.serverUrl + endpoint
+        if requestType != RequestType.get:
+            response = self._sendRequest(endpoint, requestType, headers, query, body, files, auth, timeout, stream, retryCount)
+
+            # Modifying requests (including form data uploads) invalidate
+            # cached responses of the same entity type
+            if self._responseCache is not None and requestType != RequestType.options:
+                self._responseCache.invalidate(endpoint)
+
+            return response
+
+        if stream or retryCount > 0 or files is not None:
+            return self._sendRequest(endpoint, requestType, headers, query, body, files, auth, timeout, stream, retryCount)
+
+        # Identical GET requests which are sent at the same time share a single request
+        key = _requestKey(endpoint, headers, query, body, auth)
+        return self._singleFlight.run(key, lambda: self._get(key, endpoint, headers, query, body, auth, timeout))
+
+    def _get(
+        self,
+        key: str,
+        endpoint: str,
+        headers: Dict[str, str],
+        query: Optional[Dict[str, Any]],
+        body: Optional[RequestBodyType],
+        auth: Optional[Tuple[str, str]],
+        timeout: Optional[TimeoutType]
+    ) -> NetworkResponse:
+
+        cache = self._responseCache
+        if cache is None:
+            return self._sendRequest(endpoint, RequestType.get, headers, query, body, None, auth, timeout, False, 0)
+
+        cached = cache.get(endpoint, key)
+        if cached is not None:
+            if not cache.isExpired(cached):
+                return cached.toResponse()
 
-        # Log request debug data
-        logging.getLogger("coretexpylib").debug(f">> [Coretex] Sending request to \"{url}\"")
-        logging.getLogger("coretexpylib").debug(f"\tType: {requestType}")
-        logging.getLogger("coretexpylib").debug(f"\tHeaders: {headers}")
-        logging.getLogger("coretexpylib").debug(f"\tQuery: {query}")
-        logging.getLogger("coretexpylib").debug(f"\tBody: {body}")
-        logging.getLogger("coretexpylib").debug(f"\tFiles: {logFilesData(files)}")
-        logging.getLogger("coretexpylib").debug(f"\tAuth: {auth}")
-        logging.getLogger("coretexpylib").debug(f"\tStream: {stream}")
-        logging.getLogger("coretexpylib").debug(f"\tRetry count: {retryCount}")
+            if cached.etag is not None:
+                # Headers passed by the caller are not modified
+                headers = dict(headers)
+                headers["If-None-Match"] = cached.etag
+
+        response = self._sendRequest(endpoint, RequestType.get, headers, query, body, None, auth, timeout, False, 0)
+        if cached is not None and response.statusCode == HTTPStatus.NOT_MODIFIED:
+            cache.revalidated(endpoint, key, cached)
+            return cached.toResponse()
+
+        cache.store(endpoint, key, response)
+        return response
+
+    def _sendRequest(
+        self,
+        endpoint: str,
+        requestType: RequestType,
+        headers: Dict[str, str],
+        query: Optional[Dict[str, Any]],
+        body: Optional[RequestBodyType],
+        files: Optional[RequestFormType],
+        auth: Optional[Tuple[str, str]],
+        timeout: Optional[TimeoutType],
+        stream: bool,
+        retryCount: int
+    ) -> NetworkResponse:
+
+        url = self.serverUrl + endpoint
+        logger = logging.getLogger("coretexpylib")
 
         # If Content-Type is application/json make sure that body is converted to json
         data: Optional[Any] = body
         if headers.get("Content-Type") == "application/json" and data is not None:
             data = json.dumps(body)
 
-        try:
-            rawResponse = self._session.request(
-                requestType.value,
-                url,
-                params = query,
-                data = data,
-                auth = auth,
-                timeout = timeout,
-                files = files,
-                headers = headers
-            )
-
-            response = NetworkResponse(rawResponse, endpoint)
-            if response.hasFailed():
-                logRequestFailure(endpoint, response)
-
-            if self.shouldRetry(retryCount, response):
-                if self._apiToken is not None:
-                    headers[API_TOKEN_HEADER] = self._apiToken
-
-                # If we hit rate limiter sleep before retrying the request
-                if response.statusCode == HTTPStatus.TOO_MANY_REQUESTS:
-                    delay = getDelayBeforeRetry(retryCount)
-                    logging.getLogger("coretexpylib").debug(f">> [Coretex] Waiting for {delay} seconds before retrying failed \"{endpoint}\" request")
-
-                    time.sleep(delay)
-
-                return self.request(endpoint, requestType, headers, query, body, files, auth, timeout, stream, retryCount + 1)
+        while True:
+            # Log request debug data, skipped if debug logging is disabled
+            # to avoid formatting request data for every request
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f">> [Coretex] Sending request to \"{url}\"")
+                logger.debug(f"\tType: {requestType}")
+                logger.debug(f"\tHeaders: {headers}")
+                logger.debug(f"\tQuery: {query}")
+                logger.debug(f"\tBody: {body}")
+                logger.debug(f"\tFiles: {logFilesData(files)}")
+                logger.debug(f"\tAuth: {auth}")
+                logger.debug(f"\tStream: {stream}")
+                logger.debug(f"\tRetry count: {retryCount}")
+
+            try:
+                with self._rateLimiter.acquire():
+                    start = time.perf_counter()
+                    rawResponse = self._session.request(
+                        requestType.value,
+                        url,
+                        params = query,
+                        data = data,
+                        auth = auth,
+                        timeout = timeout,
+                        files = files,
+                        headers = headers,
+                        stream = stream
+                    )
+
+                self._statistics.record(
+                    endpoint,
+                    requestType,
+                    time.perf_counter() - start,
+                    rawResponse.status_code,
+                    _bodySize(rawResponse.request.body),
+                    _responseSize(rawResponse, stream),
+                    retryCount > 0
+                )
 
-            return response
-        except BaseException as exception:
-            logging.getLogger("coretexpylib").debug(f">> [Coretex] Request failed. Reason \"{exception}\"", exc_info = exception)
+                response = NetworkResponse(rawResponse, endpoint)
+                if response.hasFailed():
+                    logRequestFailure(endpoint, response)
 
-            if self.shouldRetry(retryCount, None):
-                if self._apiToken is not None:
-                    headers[API_TOKEN_HEADER] = self._apiToken
+                # If we hit rate limiter all threads back off before sending new requests
+                if response.statusCode in THROTTLE_STATUS_CODES:
+                    delay = getRetryAfter(response, retryCount)
+                    logger.debug(f">> [Coretex] Waiting for {delay} seconds before retrying failed \"{endpoint}\" request")
 
-                return self.request(endpoint, requestType, headers, query, body, files, auth, timeout, stream, retryCount + 1)
+                    self._rateLimiter.onThrottled(delay)
+                else:
+                    self._rateLimiter.onSuccess()
 
-            raise RequestFailedError(endpoint, requestType)
+                if not self.shouldRetry(retryCount, response):
+                    return response
+            except BaseException as exception:
+                logger.debug(f">> [Coretex] Request failed. Reason \"{exception}\"", exc_info = exception)
+
+                if isinstance(exception, requests.RequestException):
+                    self._statistics.record(endpoint, requestType, time.perf_counter() - start, None, 0, 0, retryCount > 0)
+
+                if not self.shouldRetry(retryCount, None):
+                    raise RequestFailedError(endpoint, requestType)
+
+            if self._apiToken is not None:
+                headers[API_TOKEN_HEADER] = self._apiToken
+
+            retryCount += 1
 
     def post(
         self,
@@ -507,15 +712,54 @@ class NetworkManagerBase(ABC):
         self._refreshToken = token
         return self.refreshToken()
 
+    def _downloadToFile(
+        self,
+        endpoint: str,
+        destination: Path,
+        params: Optional[Dict[str, Any]],
+        chunkSize: int,
+        ignoreExisting: bool
+    ) -> NetworkResponse:
+
+        statistics = DownloadStatistics()
+
+        response = self.request(endpoint, RequestType.get, query = params, stream = True, timeout = DOWNLOAD_TIMEOUT)
+        if response.hasFailed():
+            return response
+
+        try:
+            if not ignoreExisting and destination.exists() and "Content-Length" in response.headers:
+                contentLength = int(response.headers["Content-Length"])
+                if contentLength == destination.stat().st_size:
+                    return response
+
+            # Chunks are written directly to the file (without additional
+            # buffering) so memory usage does not depend on the file size
+            with destination.open("wb", buffering = 0) as file:
+                for chunk in response.stream(chunkSize):
+                    statistics.chunkReceived(len(chunk))
+                    file.write(chunk)
+        finally:
+            response._raw.close()
+
+        statistics.finish()
+        response.downloadStatistics = statistics
+
+        logging.getLogger("coretexpylib").debug(f">> [Coretex] Downloaded \"{endpoint}\" to \"{destination}\": {statistics}")
+
+        return response
+
     def download(
         self,
         endpoint: str,
         destination: Union[Path, str],
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        chunkSize: int = DOWNLOAD_CHUNK_SIZE
     ) -> NetworkResponse:
 
         """
-            Downloads file to the given destination
+            Downloads file to the given destination. File is always
+            downloaded, even if the destination already exists
 
             Parameters
             ----------
@@ -523,16 +767,22 @@ class NetworkManagerBase(ABC):
                 endpoint to which the request is sent
             destination : Union[Path, str]
                 path to save file
+            params : Optional[Dict[str, Any]]
+                query parameters of the request
+            chunkSize : int
+                size of the buffer (in bytes) which is used for
+                writing the response body to the destination
 
             Returns
             -------
-            NetworkResponse -> object containing the request response
+            NetworkResponse -> object containing the request response,
+            "downloadStatistics" field contains download speed and time to first byte
 
             Example
             -------
             >>> from coretex import networkManager
             \b
-            >>> response = networkManager.genericDownload(
+            >>> response = networkManager.download(
                     endpoint = "dummyObject/download",
                     destination = "path/to/destination/folder"
                 )
@@ -543,24 +793,20 @@ class NetworkManagerBase(ABC):
         if isinstance(destination, str):
             destination = Path(destination)
 
-        response = self.get(endpoint, params)
-        if response.hasFailed():
-            return response
-
-        with destination.open("wb") as downloadedFile:
-            downloadedFile.write(response.getContent())
-
-        return response
+        return self._downloadToFile(endpoint, destination, params, chunkSize, ignoreExisting = True)
 
     def streamDownload(
         self,
         endpoint: str,
         destination: Union[Path, str],
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        chunkSize: int = DOWNLOAD_CHUNK_SIZE
     ) -> NetworkResponse:
 
         """
-            Downloads file to the given destination
+            Downloads file to the given destination. Download is skipped
+            if the destination already exists and its size matches the
+            "Content-Length" header of the response
 
             Parameters
             ----------
@@ -568,13 +814,16 @@ class NetworkManagerBase(ABC):
                 endpoint to which the request is sent
             destination : Union[Path, str]
                 path to save file
-            retryCount : int
-                number of function calls if request has failed, used
-                for internal retry mechanism
+            params : Optional[Dict[str, Any]]
+                query parameters of the request
+            chunkSize : int
+                size of the buffer (in bytes) which is used for
+                writing the response body to the destination
 
             Returns
             -------
-            NetworkResponse -> object containing the request response
+            NetworkResponse -> object containing the request response,
+            "downloadStatistics" field contains download speed and time to first byte
 
             Example
             -------
@@ -591,22 +840,7 @@ class NetworkManagerBase(ABC):
         if isinstance(destination, str):
             destination = Path(destination)
 
-        response = self.request(endpoint, RequestType.get, query = params, stream = True, timeout = (5, 60))
-        if response.hasFailed():
-            return response
-
-        if destination.exists() and "Content-Length" in response.headers:
-            contentLength = int(response.headers["Content-Length"])
-            if contentLength == destination.stat().st_size:
-                return response
-
-            destination.unlink()
-
-        with destination.open("wb") as file:
-            for chunk in response.stream():
-                file.write(chunk)
-
-        return response
+        return self._downloadToFile(endpoint, destination, params, chunkSize, ignoreExisting = False)
 
     def refreshToken(self) -> NetworkResponse:
         """
@@ -639,3 +873,6 @@ class NetworkManagerBase(ABC):
 
         self._apiToken = None
         self._refreshToken = None
+
+        if self._responseCache is not None:
+            self._responseCache.clear()
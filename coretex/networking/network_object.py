@@ -15,8 +15,9 @@
 #     You should have received a copy of the GNU Affero General Public License
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, Iterator
 from typing_extensions import Self
+from concurrent.futures import ThreadPoolExecutor, Future
 
 import inflection
 
@@ -26,6 +27,7 @@ from ..codable import Codable
 
 
 DEFAULT_PAGE_SIZE = 100
+FIRST_PAGE = 1
 
 
 class NetworkObject(Codable):
@@ -219,16 +221,91 @@ class NetworkObject(Codable):
         if "page_size" not in kwargs:
             kwargs["page_size"] = DEFAULT_PAGE_SIZE
 
-        response = networkManager.get(cls._endpoint(), kwargs)
+        return [cls.decode(obj) for obj in cls._fetchPage(kwargs)]
+
+    @classmethod
+    def _fetchPage(cls, parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        response = networkManager.get(cls._endpoint(), parameters)
         if response.hasFailed():
-            raise NetworkRequestError(response, f"Failed to fetch \"{cls.__name__}\" with parameters \"{kwargs}\"")
+            raise NetworkRequestError(response, f"Failed to fetch \"{cls.__name__}\" with parameters \"{parameters}\"")
+
+        return response.getJson(list)
+
+    @classmethod
+    def iterAll(cls, pageSize: int = DEFAULT_PAGE_SIZE, limit: Optional[int] = None, **kwargs: Any) -> Iterator[Self]:
+        """
+            Lazily fetches all entities from Coretex backend which match
+            the given predicate, page by page. While a page is being processed
+            the next page is fetched in the background
+
+            Parameters
+            ----------
+            pageSize : int
+                number of entities fetched with a single request
+            limit : Optional[int]
+                maximum number of entities which will be returned,
+                if None all entities are returned
+            **kwargs : Optional[Dict[str, Any]]
+                query parameters (predicate) which will be appended to URL
+
+            Returns
+            -------
+            Iterator[Self] -> fetched entities
 
-        objects: List[Self] = []
+            Raises
+            ------
+            ValueError -> If "pageSize" is not greater than 0
+            NetworkRequestError -> If the request for fetching failed
+
+            Example
+            -------
+            >>> from coretex import Model
+            \b
+            >>> for model in Model.iterAll(project_id = 1023, limit = 500):
+                    print(model.name)
+        """
 
-        for obj in response.getJson(list):
-            objects.append(cls.decode(obj))
+        # Arguments are validated when iterAll is called, not
+        # when the first entity is requested from the iterator
+        if pageSize <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"pageSize\" value \"{pageSize}\". Value must be greater than 0")
 
-        return objects
+        return cls._iterPages(pageSize, limit, kwargs)
+
+    @classmethod
+    def _iterPages(cls, pageSize: int, limit: Optional[int], kwargs: Dict[str, Any]) -> Iterator[Self]:
+        def fetchPage(page: int) -> List[Dict[str, Any]]:
+            return cls._fetchPage({**kwargs, "page": page, "page_size": pageSize})
+
+        count = 0
+        page = FIRST_PAGE
+
+        pool = ThreadPoolExecutor(max_workers = 1)
+        pending: Future = pool.submit(fetchPage, page)
+
+        try:
+            while True:
+                objects = pending.result()
+
+                # Page which is not full is the last page
+                isLastPage = len(objects) < pageSize or (limit is not None and count + len(objects) >= limit)
+                if not isLastPage:
+                    page += 1
+                    pending = pool.submit(fetchPage, page)
+
+                for obj in objects:
+                    if limit is not None and count >= limit:
+                        return
+
+                    count += 1
+                    yield cls.decode(obj)
+
+                if isLastPage:
+                    return
+        finally:
+            # Do not wait for the prefetched page if iteration was stopped early
+            pending.cancel()
+            pool.shutdown(wait = False)
 
     @classmethod
     def fetchOne(cls, **kwargs: Any) -> Self:
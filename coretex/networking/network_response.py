@@ -21,9 +21,13 @@ from http import HTTPStatus
 from requests import Response
 from requests.structures import CaseInsensitiveDict
 
+from .download_statistics import DownloadStatistics
+
 
 JsonType = TypeVar("JsonType", bound = Union[list, dict])
 
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MiB
+
 
 class NetworkResponse:
 
@@ -36,11 +40,15 @@ class NetworkResponse:
             python.requests HTTP reponse
         endpoint : str
             endpoint to which the request was sent
+        downloadStatistics : Optional[DownloadStatistics]
+            transfer statistics, available only if the response
+            body was downloaded to a file
     """
 
     def __init__(self, response: Response, endpoint: str):
         self._raw = response
         self.endpoint = endpoint
+        self.downloadStatistics: Optional[DownloadStatistics] = None
 
     @property
     def statusCode(self) -> int:
@@ -117,7 +125,7 @@ class NetworkResponse:
 
         return self._raw.content
 
-    def stream(self, chunkSize: Optional[int] = 1, decodeUnicode: bool = False) -> Iterator[Any]:
+    def stream(self, chunkSize: Optional[int] = DOWNLOAD_CHUNK_SIZE, decodeUnicode: bool = False) -> Iterator[Any]:
         """
             Downloads HTTP response in chunks and returns them as they are being downloaded
 
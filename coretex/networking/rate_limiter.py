@@ -0,0 +1,173 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Iterator, Optional
+from contextlib import contextmanager
+from threading import Condition
+
+import time
+import logging
+
+
+DEFAULT_MAX_RATE = 200.0  # requests per second
+DEFAULT_MAX_CONCURRENCY = 64
+MIN_RATE = 1.0  # requests per second
+
+# AIMD (additive increase, multiplicative decrease) parameters
+RATE_INCREASE = 1.0  # requests per second, added after every successful request
+DECREASE_FACTOR = 0.5
+
+
+class AdaptiveRateLimiter:
+
+    """
+        Token bucket rate limiter which is shared by all threads
+        sending requests to Coretex backend. It limits both the number of
+        requests per second and the number of concurrent requests.
+
+        When the backend responds with "429 Too Many Requests" or
+        "503 Service Unavailable" rate and concurrency are halved for
+        everyone and all requests wait until the backoff delay has passed.
+        After that both limits slowly grow back with every successful request.
+
+        Properties
+        ----------
+        maxRate : float
+            maximum number of requests per second
+        maxConcurrency : int
+            maximum number of requests which are sent at the same time
+        rate : float
+            current number of allowed requests per second
+        concurrency : int
+            current number of allowed concurrent requests
+    """
+
+    def __init__(self, maxRate: float = DEFAULT_MAX_RATE, maxConcurrency: int = DEFAULT_MAX_CONCURRENCY) -> None:
+        if maxRate < MIN_RATE:
+            raise ValueError(f">> [Coretex] Invalid \"maxRate\" value \"{maxRate}\". Value must be at least {MIN_RATE}")
+
+        if maxConcurrency <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"maxConcurrency\" value \"{maxConcurrency}\". Value must be greater than 0")
+
+        self.maxRate = maxRate
+        self.maxConcurrency = maxConcurrency
+        self.rate = maxRate
+        self.concurrency = maxConcurrency
+
+        self._condition = Condition()
+        self._tokens = maxRate
+        self._lastRefill = time.monotonic()
+        self._activeCount = 0
+        self._successCount = 0
+        self._pausedUntil = 0.0
+
+    def _refill(self, now: float) -> None:
+        # Bucket holds at most one second worth of requests
+        capacity = max(1.0, self.rate)
+
+        self._tokens = min(capacity, self._tokens + (now - self._lastRefill) * self.rate)
+        self._lastRefill = now
+
+    def _waitTime(self, now: float) -> Optional[float]:
+        if now < self._pausedUntil:
+            return self._pausedUntil - now
+
+        if self._activeCount >= self.concurrency:
+            # Wait until one of the active requests finishes
+            return None
+
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+
+        return 0
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        """
+            Blocks until sending a request is allowed. Request
+            is counted as active until the context is exited.
+        """
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                waitTime = self._waitTime(now)
+                if waitTime == 0:
+                    break
+
+                self._condition.wait(waitTime)
+
+            self._tokens -= 1
+            self._activeCount += 1
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._activeCount -= 1
+                self._condition.notify_all()
+
+    def onSuccess(self) -> None:
+        """
+            Additively increases rate and concurrency
+        """
+
+        with self._condition:
+            self.rate = min(self.maxRate, self.rate + RATE_INCREASE)
+
+            # Concurrency is increased by one once a full "window" of requests succeeded
+            self._successCount += 1
+            if self._successCount >= self.concurrency:
+                self._successCount = 0
+                self.concurrency = min(self.maxConcurrency, self.concurrency + 1)
+
+            self._condition.notify_all()
+
+    def onThrottled(self, delay: float) -> None:
+        """
+            Multiplicatively decreases rate and concurrency and
+            pauses all requests for the provided number of seconds
+
+            Parameters
+            ----------
+            delay : float
+                number of seconds for which all requests will wait
+        """
+
+        with self._condition:
+            now = time.monotonic()
+
+            # Requests which were sent before the backoff started can also
+            # be throttled, limits are decreased only once per backoff
+            if now >= self._pausedUntil:
+                self.rate = max(MIN_RATE, self.rate * DECREASE_FACTOR)
+                self.concurrency = max(1, int(self.concurrency * DECREASE_FACTOR))
+                self._successCount = 0
+
+                logging.getLogger("coretexpylib").debug(
+                    f">> [Coretex] Request was throttled, limiting to {self.rate:.1f} requests/s "
+                    f"and {self.concurrency} concurrent requests, waiting for {delay} seconds"
+                )
+
+            self._pausedUntil = max(self._pausedUntil, now + delay)
+            self._condition.notify_all()
+
+
+# Shared by all network managers in the process
+rateLimiter = AdaptiveRateLimiter()
@@ -0,0 +1,260 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, Any, Dict, List, Tuple, Union
+from pathlib import Path
+from threading import Lock
+
+import json
+import random
+
+from .request_type import RequestType
+
+
+# Number of latency samples kept per endpoint for percentile calculation
+LATENCY_SAMPLE_COUNT = 1024
+
+
+def normalizeEndpoint(endpoint: str) -> str:
+    """
+        Replaces entity ids in the endpoint with "{id}" so all
+        requests for the same type of entity are grouped together
+
+        Example
+        -------
+        >>> normalizeEndpoint("dataset/12/download")
+        "dataset/{id}/download"
+    """
+
+    path = endpoint.split("?")[0]
+    return "/".join("{id}" if segment.isdigit() else segment for segment in path.split("/"))
+
+
+class EndpointStatistics:
+
+    """
+        Aggregated statistics of all requests sent to a single endpoint
+        using a single request type. Every attempt (including retries)
+        is counted as a separate request.
+
+        Properties
+        ----------
+        endpoint : str
+            endpoint with entity ids replaced by "{id}"
+        requestType : RequestType
+            type of the requests
+        count : int
+            number of requests sent
+        retryCount : int
+            number of requests which were retries of a previous request
+        errorCount : int
+            number of requests which failed without a response (e.g. connection error)
+        statusCodes : Dict[int, int]
+            number of responses per status code
+        bytesSent : int
+            total size of request bodies
+        bytesReceived : int
+            total size of response bodies, for streamed responses
+            "Content-Length" header is used
+        totalDuration : float
+            total number of seconds spent waiting for responses,
+            for streamed responses only time until headers are received is measured
+    """
+
+    def __init__(self, endpoint: str, requestType: RequestType) -> None:
+        self.endpoint = endpoint
+        self.requestType = requestType
+        self.count = 0
+        self.retryCount = 0
+        self.errorCount = 0
+        self.statusCodes: Dict[int, int] = {}
+        self.bytesSent = 0
+        self.bytesReceived = 0
+        self.totalDuration = 0.0
+
+        # Reservoir sample of latencies, keeps memory usage constant
+        # regardless of the number of requests
+        self._latencies: List[float] = []
+
+    def record(
+        self,
+        duration: float,
+        statusCode: Optional[int],
+        bytesSent: int,
+        bytesReceived: int,
+        isRetry: bool
+    ) -> None:
+
+        self.count += 1
+        self.totalDuration += duration
+        self.bytesSent += bytesSent
+        self.bytesReceived += bytesReceived
+
+        if isRetry:
+            self.retryCount += 1
+
+        if statusCode is None:
+            self.errorCount += 1
+        else:
+            self.statusCodes[statusCode] = self.statusCodes.get(statusCode, 0) + 1
+
+        if len(self._latencies) < LATENCY_SAMPLE_COUNT:
+            self._latencies.append(duration)
+        else:
+            index = random.randrange(self.count)
+            if index < LATENCY_SAMPLE_COUNT:
+                self._latencies[index] = duration
+
+    def percentile(self, value: float) -> float:
+        """
+            Parameters
+            ----------
+            value : float
+                percentile in range [0, 100]
+
+            Returns
+            -------
+            float -> latency (in seconds) below which the provided
+            percentage of requests finished, 0 if no requests were sent
+        """
+
+        if len(self._latencies) == 0:
+            return 0.0
+
+        latencies = sorted(self._latencies)
+        index = round(value / 100 * (len(latencies) - 1))
+
+        return latencies[min(max(index, 0), len(latencies) - 1)]
+
+    def encode(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "method": self.requestType.value,
+            "count": self.count,
+            "retryCount": self.retryCount,
+            "errorCount": self.errorCount,
+            "statusCodes": { str(statusCode): count for statusCode, count in sorted(self.statusCodes.items()) },
+            "bytesSent": self.bytesSent,
+            "bytesReceived": self.bytesReceived,
+            "totalDuration": self.totalDuration,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": max(self._latencies, default = 0.0)
+        }
+
+
+class RequestStatistics:
+
+    """
+        Collects per endpoint statistics of all requests sent
+        by a network manager
+
+        Example
+        -------
+        >>> from coretex.networking import networkManager
+        \b
+        >>> for statistics in networkManager.statistics.slowest(5):
+                print(statistics.endpoint, statistics.totalDuration, statistics.percentile(95))
+        >>> networkManager.statistics.dump("network_statistics.json")
+    """
+
+    def __init__(self) -> None:
+        self._endpoints: Dict[Tuple[str, RequestType], EndpointStatistics] = {}
+        self._lock = Lock()
+
+    @property
+    def endpoints(self) -> List[EndpointStatistics]:
+        with self._lock:
+            return list(self._endpoints.values())
+
+    def get(self, endpoint: str, requestType: RequestType) -> Optional[EndpointStatistics]:
+        with self._lock:
+            return self._endpoints.get((normalizeEndpoint(endpoint), requestType))
+
+    def record(
+        self,
+        endpoint: str,
+        requestType: RequestType,
+        duration: float,
+        statusCode: Optional[int],
+        bytesSent: int,
+        bytesReceived: int,
+        isRetry: bool
+    ) -> None:
+
+        key = (normalizeEndpoint(endpoint), requestType)
+
+        with self._lock:
+            statistics = self._endpoints.get(key)
+            if statistics is None:
+                statistics = EndpointStatistics(key[0], requestType)
+                self._endpoints[key] = statistics
+
+            statistics.record(duration, statusCode, bytesSent, bytesReceived, isRetry)
+
+    def slowest(self, count: int = 10) -> List[EndpointStatistics]:
+        """
+            Returns
+            -------
+            List[EndpointStatistics] -> endpoints which took the most
+            total time, sorted in descending order
+        """
+
+        return sorted(self.endpoints, key = lambda statistics: statistics.totalDuration, reverse = True)[:count]
+
+    def summary(self) -> Dict[str, float]:
+        """
+            Returns
+            -------
+            Dict[str, float] -> totals across all endpoints
+        """
+
+        endpoints = self.endpoints
+
+        return {
+            "requests": sum(statistics.count for statistics in endpoints),
+            "retries": sum(statistics.retryCount for statistics in endpoints),
+            "errors": sum(statistics.errorCount for statistics in endpoints),
+            "bytesSent": sum(statistics.bytesSent for statistics in endpoints),
+            "bytesReceived": sum(statistics.bytesReceived for statistics in endpoints),
+            "totalDuration": sum(statistics.totalDuration for statistics in endpoints)
+        }
+
+    def encode(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = [statistics.encode() for statistics in self._endpoints.values()]
+
+        return {
+            "summary": self.summary(),
+            "endpoints": sorted(endpoints, key = lambda value: value["totalDuration"], reverse = True)
+        }
+
+    def dump(self, path: Union[Path, str]) -> None:
+        """
+            Writes statistics to the provided path as JSON
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+
+        with path.open("w") as file:
+            json.dump(self.encode(), file, indent = 4)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
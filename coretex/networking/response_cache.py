@@ -0,0 +1,302 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, Dict, Union, Any
+from pathlib import Path
+from collections import OrderedDict
+from threading import Lock
+
+import re
+import time
+import json
+import hashlib
+import logging
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from .network_response import NetworkResponse
+
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 60  # seconds
+
+# Responses of these endpoints contain credentials and are not
+# cached unless a different ttl is explicitly provided for them
+DEFAULT_TTLS: Dict[str, float] = {
+    "secret": 0
+}
+
+
+def _entityType(endpoint: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_-]", "_", endpoint.split("/")[0])
+
+
+class CachedResponse:
+
+    """
+        Not intended for outside use
+
+        Contents of a successful GET response stored by the ResponseCache
+    """
+
+    def __init__(self, endpoint: str, statusCode: int, headers: Dict[str, str], content: bytes, storedAt: float) -> None:
+        self.endpoint = endpoint
+        self.statusCode = statusCode
+        self.headers = headers
+        self.content = content
+        self.storedAt = storedAt
+
+    @property
+    def etag(self) -> Optional[str]:
+        return CaseInsensitiveDict(self.headers).get("ETag")
+
+    def toResponse(self) -> NetworkResponse:
+        rawResponse = Response()
+        rawResponse.status_code = self.statusCode
+        rawResponse.headers = CaseInsensitiveDict(self.headers)
+        rawResponse._content = self.content
+        rawResponse.encoding = "utf-8"
+
+        return NetworkResponse(rawResponse, self.endpoint)
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "statusCode": self.statusCode,
+            "headers": self.headers,
+            "storedAt": self.storedAt
+        }
+
+    @classmethod
+    def fromMetadata(cls, metadata: Dict[str, Any], content: bytes) -> "CachedResponse":
+        return cls(
+            str(metadata["endpoint"]),
+            int(metadata["statusCode"]),
+            { str(key): str(value) for key, value in dict(metadata["headers"]).items() },
+            content,
+            float(metadata["storedAt"])
+        )
+
+
+class ResponseCache:
+
+    """
+        Opt-in cache for responses of successful GET requests.
+        Responses are stored in memory (least recently used responses
+        are evicted once "maxEntries" is reached) and optionally on disk,
+        where status code and headers are stored as JSON next to the raw body.
+
+        Expired responses which have an "ETag" are revalidated with the
+        server using "If-None-Match" header, which means that the response
+        body is not downloaded again if it did not change.
+
+        Any non-GET request (e.g. update or delete of an entity)
+        invalidates cached responses of the same entity type.
+
+        Properties
+        ----------
+        maxEntries : int
+            maximum number of responses stored in memory
+        defaultTtl : float
+            number of seconds for which a response is valid
+        ttls : Dict[str, float]
+            per endpoint number of seconds for which a response is valid,
+            keys are endpoint prefixes, the longest matching prefix is used.
+            If the value is 0 responses of that endpoint are not cached.
+            Responses of "secret" endpoints are not cached unless
+            a ttl for them is provided
+        directory : Optional[Path]
+            directory where responses are stored on disk, if None
+            responses are stored only in memory
+
+        Example
+        -------
+        >>> from coretex.networking import networkManager, ResponseCache
+        \b
+        >>> networkManager.setResponseCache(ResponseCache(ttls = { "tag": 300, "project": 0 }))
+    """
+
+    def __init__(
+        self,
+        maxEntries: int = DEFAULT_MAX_ENTRIES,
+        defaultTtl: float = DEFAULT_TTL,
+        ttls: Optional[Dict[str, float]] = None,
+        directory: Optional[Union[Path, str]] = None
+    ) -> None:
+
+        if ttls is None:
+            ttls = {}
+
+        if isinstance(directory, str):
+            directory = Path(directory)
+
+        if directory is not None:
+            directory.mkdir(parents = True, exist_ok = True)
+
+        self.maxEntries = maxEntries
+        self.defaultTtl = defaultTtl
+        self.ttls = { **DEFAULT_TTLS, **ttls }
+        self.directory = directory
+
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = Lock()
+
+    def _diskPath(self, endpoint: str, key: str) -> Optional[Path]:
+        if self.directory is None:
+            return None
+
+        # Entity type prefix is used to find responses which need to be invalidated
+        return self.directory / f"{_entityType(endpoint)}-{hashlib.sha256(key.encode('UTF-8')).hexdigest()}"
+
+    def _writeMetadata(self, diskPath: Path, entry: CachedResponse) -> None:
+        with diskPath.with_suffix(".json").open("w") as file:
+            json.dump(entry.metadata(), file)
+
+    def _writeToDisk(self, diskPath: Path, entry: CachedResponse) -> None:
+        # Body is written first, response is loaded only if its metadata exists
+        diskPath.with_suffix(".body").write_bytes(entry.content)
+        self._writeMetadata(diskPath, entry)
+
+    def _readFromDisk(self, diskPath: Path) -> CachedResponse:
+        with diskPath.with_suffix(".json").open("r") as file:
+            metadata = json.load(file)
+
+        return CachedResponse.fromMetadata(metadata, diskPath.with_suffix(".body").read_bytes())
+
+    def ttl(self, endpoint: str) -> float:
+        matches = [prefix for prefix in self.ttls if endpoint.startswith(prefix)]
+        if len(matches) == 0:
+            return self.defaultTtl
+
+        return self.ttls[max(matches, key = len)]
+
+    def isExpired(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.storedAt >= self.ttl(entry.endpoint)
+
+    def get(self, endpoint: str, key: str) -> Optional[CachedResponse]:
+        """
+            Parameters
+            ----------
+            endpoint : str
+                endpoint to which the request is sent
+            key : str
+                identifies the request, built by the network manager from
+                the endpoint, query, body, headers and credentials of the request
+
+            Returns
+            -------
+            Optional[CachedResponse] -> cached response (which might be expired)
+            or None if response is not cached
+        """
+
+        if self.ttl(endpoint) <= 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        diskPath = self._diskPath(endpoint, key)
+        if diskPath is None or not diskPath.with_suffix(".json").exists():
+            return None
+
+        try:
+            entry = self._readFromDisk(diskPath)
+        except (OSError, ValueError, KeyError, TypeError) as exception:
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Failed to load cached response for \"{endpoint}\"", exc_info = exception)
+            return None
+
+        self._storeInMemory(key, entry)
+        return entry
+
+    def _storeInMemory(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last = False)
+
+    def store(self, endpoint: str, key: str, response: NetworkResponse) -> None:
+        if self.ttl(endpoint) <= 0 or response.hasFailed():
+            return
+
+        entry = CachedResponse(
+            endpoint,
+            response.statusCode,
+            dict(response.headers),
+            response.getContent(),
+            time.time()
+        )
+
+        self._storeInMemory(key, entry)
+
+        diskPath = self._diskPath(endpoint, key)
+        if diskPath is not None:
+            self._writeToDisk(diskPath, entry)
+
+    def revalidated(self, endpoint: str, key: str, entry: CachedResponse) -> None:
+        """
+            Marks the cached response as valid after the server
+            responded with "304 Not Modified"
+        """
+
+        entry.storedAt = time.time()
+
+        diskPath = self._diskPath(endpoint, key)
+        if diskPath is not None:
+            self._writeMetadata(diskPath, entry)
+
+    def invalidate(self, endpoint: str) -> None:
+        """
+            Removes all cached responses for entities of the same
+            type as the provided endpoint (e.g. "dataset/12" invalidates
+            "dataset", "dataset/12" and "dataset/13/...")
+
+            Parameters
+            ----------
+            endpoint : str
+                endpoint to which a modifying request was sent
+        """
+
+        entityType = endpoint.split("/")[0]
+
+        def matches(entry: CachedResponse) -> bool:
+            return entry.endpoint == entityType or entry.endpoint.startswith(f"{entityType}/")
+
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if matches(entry)]:
+                del self._entries[key]
+
+        if self.directory is not None:
+            for path in self.directory.glob(f"{_entityType(endpoint)}-*"):
+                path.unlink(missing_ok = True)
+
+    def clear(self) -> None:
+        """
+            Removes all cached responses
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+        if self.directory is not None:
+            for path in self.directory.iterdir():
+                path.unlink(missing_ok = True)
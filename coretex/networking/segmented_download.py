@@ -0,0 +1,476 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, Any, Dict, List, Tuple, Union
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Lock, BoundedSemaphore
+
+import os
+import re
+import json
+import time
+import logging
+
+from .network_manager import networkManager
+from .network_manager_base import MAX_SEGMENT_CONNECTIONS
+from .network_response import NetworkResponse, NetworkRequestError, DOWNLOAD_CHUNK_SIZE
+from .download_statistics import DownloadStatistics
+from .request_type import RequestType
+
+
+DEFAULT_SEGMENT_COUNT = 4
+MIN_SEGMENT_SIZE = 16 * 1024 * 1024  # 16 MiB
+SEGMENT_DOWNLOAD_TIMEOUT = (5, 60)
+
+# Journal is saved once this much data or time has passed since it was last saved
+JOURNAL_SAVE_SIZE = 8 * 1024 * 1024  # 8 MiB
+JOURNAL_SAVE_INTERVAL = 1.0  # seconds
+
+_CONTENT_RANGE_PATTERN = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+# Shared by all downloads in the process, so segments of files which are downloaded
+# at the same time do not open more connections than the connection pool keeps
+_connectionSlots = BoundedSemaphore(MAX_SEGMENT_CONNECTIONS)
+
+
+class _FileChangedError(RuntimeError):
+    pass
+
+
+def _parseContentRange(response: NetworkResponse) -> Optional[Tuple[int, int, int]]:
+    contentRange = response.headers.get("Content-Range")
+    if contentRange is None:
+        return None
+
+    match = _CONTENT_RANGE_PATTERN.fullmatch(contentRange.strip())
+    if match is None:
+        return None
+
+    start, end, size = match.groups()
+    return int(start), int(end), int(size)
+
+
+class _Segment:
+
+    def __init__(self, start: int, end: int, downloaded: int = 0) -> None:
+        self.start = start
+        self.end = end  # inclusive
+        self.downloaded = downloaded
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start + 1
+
+    @property
+    def isComplete(self) -> bool:
+        return self.downloaded >= self.size
+
+    @property
+    def position(self) -> int:
+        return self.start + self.downloaded
+
+
+class SegmentedDownloadSession:
+
+    """
+        A class which downloads a file by splitting it into
+        byte ranges which are downloaded concurrently using HTTP
+        "Range" requests. Progress is stored in a journal file next to
+        the destination, so an interrupted download continues from where
+        it stopped when the session is run again. Data is downloaded into
+        a temporary ".part" file which is renamed to the destination once
+        all segments are downloaded.
+
+        If the server does not support "Range" requests, or the file
+        is too small to be split, it is downloaded using a single stream.
+
+        Properties
+        ----------
+        endpoint : str
+            endpoint from which the file is downloaded
+        destination : Path
+            path to which the file will be downloaded
+        params : Optional[Dict[str, Any]]
+            query parameters of the request
+        segmentCount : int
+            maximum number of segments which are downloaded concurrently
+        chunkSize : int
+            size of the buffer (in bytes) used for writing segments to the file
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        destination: Union[Path, str],
+        params: Optional[Dict[str, Any]] = None,
+        segmentCount: int = DEFAULT_SEGMENT_COUNT,
+        chunkSize: int = DOWNLOAD_CHUNK_SIZE
+    ) -> None:
+
+        if segmentCount <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"segmentCount\" value \"{segmentCount}\". Value must be greater than 0")
+
+        if isinstance(destination, str):
+            destination = Path(destination)
+
+        self.endpoint = endpoint
+        self.destination = destination
+        self.params = params
+        self.segmentCount = segmentCount
+        self.chunkSize = chunkSize
+
+        self.statistics = DownloadStatistics()
+
+        self._lock = Lock()
+        self._journalLock = Lock()
+        self._unsavedSize = 0
+        self._lastJournalSave = time.monotonic()
+        self._size = 0
+        self._etag: Optional[str] = None
+        self._segments: List[_Segment] = []
+
+    @property
+    def partPath(self) -> Path:
+        return self.destination.with_name(f"{self.destination.name}.part")
+
+    @property
+    def journalPath(self) -> Path:
+        return self.destination.with_name(f"{self.destination.name}.journal")
+
+    def _headers(self, start: int, end: Optional[int] = None) -> Dict[str, str]:
+        headers = networkManager._headers()
+        headers["Range"] = f"bytes={start}-" if end is None else f"bytes={start}-{end}"
+
+        return headers
+
+    def _saveJournal(self) -> None:
+        with self._journalLock:
+            with self._lock:
+                journal = {
+                    "endpoint": self.endpoint,
+                    "params": self.params,
+                    "size": self._size,
+                    "etag": self._etag,
+                    "segments": [[segment.start, segment.end, segment.downloaded] for segment in self._segments]
+                }
+
+                self._unsavedSize = 0
+                self._lastJournalSave = time.monotonic()
+
+            tempPath = self.journalPath.with_name(f"{self.journalPath.name}.tmp")
+            with tempPath.open("w") as file:
+                json.dump(journal, file)
+
+            os.replace(tempPath, self.journalPath)
+
+    def _shouldSaveJournal(self) -> bool:
+        # Expected to be called while holding the lock
+        if self._journalLock.locked():
+            # Other segment is already saving the journal
+            return False
+
+        return self._unsavedSize >= JOURNAL_SAVE_SIZE or time.monotonic() - self._lastJournalSave >= JOURNAL_SAVE_INTERVAL
+
+    def _loadJournal(self) -> bool:
+        if not self.journalPath.exists() or not self.partPath.exists():
+            return False
+
+        try:
+            with self.journalPath.open("r") as file:
+                journal = json.load(file)
+
+            if journal["endpoint"] != self.endpoint or journal["params"] != self.params:
+                return False
+
+            size = int(journal["size"])
+            if self.partPath.stat().st_size != size:
+                return False
+
+            self._size = size
+            self._etag = journal["etag"]
+            self._segments = [_Segment(start, end, downloaded) for start, end, downloaded in journal["segments"]]
+
+            return True
+        except (ValueError, KeyError, TypeError) as exception:
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Ignoring invalid download journal \"{self.journalPath}\"", exc_info = exception)
+            return False
+
+    def _cleanup(self) -> None:
+        self.partPath.unlink(missing_ok = True)
+        self.journalPath.unlink(missing_ok = True)
+
+    def _createSegments(self) -> None:
+        segmentCount = max(1, min(self.segmentCount, self._size // MIN_SEGMENT_SIZE))
+        segmentSize = -(-self._size // segmentCount)  # ceil division
+
+        self._segments = [
+            _Segment(start, min(start + segmentSize, self._size) - 1)
+            for start in range(0, self._size, segmentSize)
+        ]
+
+    def _validateSegmentResponse(self, response: NetworkResponse, segment: _Segment) -> None:
+        if response.hasFailed():
+            raise NetworkRequestError(response, f"Failed to download byte range \"{segment.position}-{segment.end}\" of \"{self.endpoint}\"")
+
+        contentRange = _parseContentRange(response)
+        if response.statusCode != HTTPStatus.PARTIAL_CONTENT or contentRange is None:
+            raise RuntimeError(f">> [Coretex] Server did not respond with the requested byte range for \"{self.endpoint}\"")
+
+        start, _, size = contentRange
+        if start != segment.position:
+            raise RuntimeError(f">> [Coretex] Server did not respond with the requested byte range for \"{self.endpoint}\"")
+
+        etag = response.headers.get("ETag")
+        if size != self._size or (etag is not None and self._etag is not None and etag != self._etag):
+            raise _FileChangedError(f">> [Coretex] File \"{self.endpoint}\" changed on the server during download")
+
+    def _writeSegment(self, response: NetworkResponse, segment: _Segment) -> None:
+        try:
+            with self.partPath.open("r+b", buffering = 0) as file:
+                file.seek(segment.position)
+
+                for chunk in response.stream(self.chunkSize):
+                    remaining = segment.size - segment.downloaded
+                    if len(chunk) > remaining:
+                        chunk = chunk[:remaining]
+
+                    file.write(chunk)
+
+                    with self._lock:
+                        segment.downloaded += len(chunk)
+                        self._unsavedSize += len(chunk)
+                        self.statistics.chunkReceived(len(chunk))
+
+                        shouldSaveJournal = self._shouldSaveJournal()
+
+                    # Journal is not saved for every chunk so segments
+                    # do not wait for each other while writing it
+                    if shouldSaveJournal:
+                        self._saveJournal()
+
+                    if segment.isComplete:
+                        break
+        finally:
+            response._raw.close()
+
+        if not segment.isComplete:
+            raise RuntimeError(f">> [Coretex] Connection closed before byte range \"{segment.start}-{segment.end}\" of \"{self.endpoint}\" was downloaded")
+
+    def _downloadSegment(self, segment: _Segment, response: Optional[NetworkResponse] = None) -> None:
+        # First segment uses the connection slot which was acquired by "_start"
+        if response is None:
+            _connectionSlots.acquire()
+
+        try:
+            if segment.isComplete:
+                return
+
+            if response is None:
+                response = networkManager.request(
+                    self.endpoint,
+                    RequestType.get,
+                    headers = self._headers(segment.position, segment.end),
+                    query = self.params,
+                    timeout = SEGMENT_DOWNLOAD_TIMEOUT,
+                    stream = True
+                )
+
+                self._validateSegmentResponse(response, segment)
+
+            self._writeSegment(response, segment)
+        finally:
+            _connectionSlots.release()
+
+        logging.getLogger("coretexpylib").debug(f">> [Coretex] Downloaded byte range \"{segment.start}-{segment.end}\" of \"{self.endpoint}\"")
+
+    def _downloadSingleStream(self, response: NetworkResponse) -> None:
+        # Content-Length is the size of the encoded data if response is compressed
+        contentLength = response.headers.get("Content-Length")
+        if response.headers.get("Content-Encoding", "identity") != "identity":
+            contentLength = None
+
+        received = 0
+
+        try:
+            with self.partPath.open("wb", buffering = 0) as file:
+                for chunk in response.stream(self.chunkSize):
+                    self.statistics.chunkReceived(len(chunk))
+                    file.write(chunk)
+
+                    received += len(chunk)
+        finally:
+            response._raw.close()
+
+        if contentLength is not None and contentLength.isdigit() and received != int(contentLength):
+            raise RuntimeError(f">> [Coretex] Connection closed after {received} of {contentLength} bytes of \"{self.endpoint}\" were downloaded")
+
+    def _start(self) -> Optional[NetworkResponse]:
+        # Connection slot is kept for the first segment if the file is downloaded in segments
+        _connectionSlots.acquire()
+
+        try:
+            response = self._openDownload()
+        except BaseException:
+            _connectionSlots.release()
+            raise
+
+        if response is None:
+            _connectionSlots.release()
+
+        return response
+
+    def _openDownload(self) -> Optional[NetworkResponse]:
+        # Request the whole file as a range to find out if the server
+        # supports range requests and what is the total size of the file
+        response = networkManager.request(
+            self.endpoint,
+            RequestType.get,
+            headers = self._headers(0),
+            query = self.params,
+            timeout = SEGMENT_DOWNLOAD_TIMEOUT,
+            stream = True
+        )
+
+        if response.statusCode == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            # Empty files cannot be requested as a range
+            response = networkManager.request(
+                self.endpoint,
+                RequestType.get,
+                query = self.params,
+                timeout = SEGMENT_DOWNLOAD_TIMEOUT,
+                stream = True
+            )
+
+        if response.hasFailed():
+            raise NetworkRequestError(response, f"Failed to download \"{self.endpoint}\"")
+
+        contentRange = _parseContentRange(response)
+        if response.statusCode != HTTPStatus.PARTIAL_CONTENT or contentRange is None or contentRange[2] < 2 * MIN_SEGMENT_SIZE:
+            self._downloadSingleStream(response)
+            return None
+
+        self._size = contentRange[2]
+        self._etag = response.headers.get("ETag")
+        self._createSegments()
+
+        with self.partPath.open("wb") as file:
+            file.truncate(self._size)
+
+        self._saveJournal()
+
+        # Already opened connection is used for the first segment
+        return response
+
+    def run(self) -> DownloadStatistics:
+        """
+            Downloads the file to the destination
+
+            Returns
+            -------
+            DownloadStatistics -> download speed and time to first byte
+
+            Raises
+            ------
+            NetworkRequestError, RuntimeError -> if some kind of error happened during
+            the download, progress is preserved and the download continues
+            from where it stopped on the next run
+
+            Example
+            -------
+            >>> from coretex.networking import SegmentedDownloadSession
+            \b
+            >>> downloadSession = SegmentedDownloadSession("model/download", "model.zip", { "id": 1023 })
+            >>> statistics = downloadSession.run()
+            >>> print(statistics)
+        """
+
+        logging.getLogger("coretexpylib").debug(f">> [Coretex] Starting segmented download of \"{self.endpoint}\" to \"{self.destination}\"")
+
+        firstResponse: Optional[NetworkResponse] = None
+
+        if self._loadJournal():
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Resuming download of \"{self.endpoint}\" from journal \"{self.journalPath}\"")
+        else:
+            self._cleanup()
+
+            firstResponse = self._start()
+            if firstResponse is None:
+                # File was downloaded using a single stream
+                os.replace(self.partPath, self.destination)
+
+                self.statistics.finish()
+                return self.statistics
+
+        try:
+            with ThreadPoolExecutor(max_workers = len(self._segments)) as pool:
+                futures = [pool.submit(self._downloadSegment, self._segments[0], firstResponse)]
+                futures.extend(pool.submit(self._downloadSegment, segment) for segment in self._segments[1:])
+        finally:
+            # Progress since the last periodic save is preserved
+            self._saveJournal()
+
+        for future in futures:
+            exception = future.exception()
+            if exception is None:
+                continue
+
+            if isinstance(exception, _FileChangedError):
+                # Progress is no longer valid, next run will start from the beginning
+                self._cleanup()
+
+            raise exception
+
+        os.replace(self.partPath, self.destination)
+        self.journalPath.unlink(missing_ok = True)
+
+        self.statistics.finish()
+        logging.getLogger("coretexpylib").debug(f">> [Coretex] Downloaded \"{self.endpoint}\" to \"{self.destination}\": {self.statistics}")
+
+        return self.statistics
+
+
+def segmentedDownload(
+    endpoint: str,
+    destination: Union[Path, str],
+    params: Optional[Dict[str, Any]] = None,
+    segmentCount: int = DEFAULT_SEGMENT_COUNT
+) -> DownloadStatistics:
+
+    """
+        Downloads a file using concurrent HTTP "Range" requests.
+        Interrupted downloads are resumed on the next call.
+        Should be used when downloading large files.
+
+        Parameters
+        ----------
+        endpoint : str
+            endpoint from which the file is downloaded
+        destination : Union[Path, str]
+            path to which the file will be downloaded
+        params : Optional[Dict[str, Any]]
+            query parameters of the request
+        segmentCount : int
+            maximum number of byte ranges downloaded concurrently
+
+        Returns
+        -------
+        DownloadStatistics -> download speed and time to first byte
+    """
+
+    return SegmentedDownloadSession(endpoint, destination, params, segmentCount).run()
@@ -0,0 +1,62 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import TypeVar, Generic, Callable, Dict, Optional
+from concurrent.futures import Future
+from threading import Lock
+
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+
+    """
+        Not intended for outside use
+
+        Makes sure that only one call for the same key is executing
+        at the same time. Callers which arrive while the call is executing
+        wait for it to finish and receive the same result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: Dict[str, "Future[T]"] = {}
+
+    def run(self, key: str, function: Callable[[], T]) -> T:
+        with self._lock:
+            future: Optional["Future[T]"] = self._calls.get(key)
+
+            isLeader = future is None
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+
+        if not isLeader:
+            return future.result()
+
+        try:
+            result = function()
+            future.set_result(result)
+
+            return result
+        except BaseException as exception:
+            future.set_exception(exception)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,258 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, List, Tuple, Dict, Any, Callable, Iterator
+from typing_extensions import Self
+from pathlib import Path
+from threading import Lock
+from contextlib import contextmanager
+
+import os
+import json
+import hashlib
+import logging
+
+
+# Size of the blocks which are hashed to create file fingerprint
+FINGERPRINT_BLOCK_SIZE = 1024 * 1024  # 1 MiB
+
+
+def _fingerprintHash(path: Path, size: int) -> str:
+    # Hashing the whole file would take minutes for files which are
+    # tens of GBs in size, so only the first, middle and last block are hashed
+    hash = hashlib.sha256()
+    hash.update(str(size).encode())
+
+    with path.open("rb") as file:
+        for offset in (0, size // 2, max(0, size - FINGERPRINT_BLOCK_SIZE)):
+            file.seek(offset)
+            hash.update(file.read(FINGERPRINT_BLOCK_SIZE))
+
+    return hash.hexdigest()
+
+
+def _journalPath(directory: Path, path: Path) -> Path:
+    key = hashlib.sha256(str(path.resolve()).encode("UTF-8")).hexdigest()
+    return directory / f"{key}.json"
+
+
+def _hashKey(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys = True).encode("UTF-8")).hexdigest()[:32]
+
+
+@contextmanager
+def retainedUploadFile(
+    directory: Path,
+    identity: str,
+    fingerprint: Dict[str, Any],
+    suffix: str,
+    build: Callable[[Path], None]
+) -> Iterator[Path]:
+
+    """
+        Not intended for outside use
+
+        Provides the file which is built for an upload (archive or encrypted
+        copy of the source). File is kept until the upload finishes, so the
+        next attempt to upload the same unchanged source reuses it and the
+        upload is resumed using its journal. File is deleted once the context
+        is exited without an error.
+
+        Parameters
+        ----------
+        directory : Path
+            directory in which the file is stored
+        identity : str
+            identifies what is uploaded (e.g. model id), file built
+            for a different fingerprint of the same identity is deleted
+        fingerprint : Dict[str, Any]
+            state of the source from which the file is built
+        suffix : str
+            suffix of the file
+        build : Callable[[Path], None]
+            creates the file at the provided path
+
+        Returns
+        -------
+        Iterator[Path] -> path to the file
+    """
+
+    prefix = _hashKey(identity)
+    path = directory / f"{prefix}-{_hashKey(fingerprint)}{suffix}"
+
+    # Files built from the previous state of the source can not be resumed
+    for stalePath in directory.glob(f"{prefix}-*{suffix}"):
+        if stalePath != path:
+            stalePath.unlink(missing_ok = True)
+            _journalPath(directory, stalePath).unlink(missing_ok = True)
+
+    if not path.exists():
+        tempPath = path.with_name(f"{path.name}.tmp")
+
+        try:
+            build(tempPath)
+            os.replace(tempPath, path)
+        finally:
+            tempPath.unlink(missing_ok = True)
+    else:
+        logging.getLogger("coretexpylib").debug(f">> [Coretex] Reusing \"{path}\" built by the previous upload attempt")
+
+    yield path
+
+    path.unlink(missing_ok = True)
+
+
+class UploadJournal:
+
+    """
+        Not intended for outside use
+
+        Persists the state of a chunked upload so it can be resumed
+        if the upload fails. Journal is bound to the file fingerprint
+        (size, modification time and hash), so it is discarded if the file changes.
+
+        Properties
+        ----------
+        directory : Optional[Path]
+            directory in which the journal is stored, if None
+            journal is only kept in memory
+        uploadId : str
+            id of the upload session on Coretex.ai
+        chunkSize : int
+            size of the chunks into which the file was split
+        uploadedRanges : List[Tuple[int, int]]
+            byte ranges (start inclusive, end exclusive) which were
+            acknowledged by the server
+        acknowledgedCount : int
+            number of byte ranges acknowledged since the journal was loaded
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path],
+        filePath: Path,
+        uploadId: str,
+        chunkSize: int,
+        fingerprint: Dict[str, Any],
+        uploadedRanges: Optional[List[Tuple[int, int]]] = None
+    ) -> None:
+
+        if uploadedRanges is None:
+            uploadedRanges = []
+
+        self.directory = directory
+        self.filePath = filePath
+        self.uploadId = uploadId
+        self.chunkSize = chunkSize
+        self.fingerprint = fingerprint
+        self.uploadedRanges = uploadedRanges
+        self.acknowledgedCount = 0
+
+        self._lock = Lock()
+
+    @staticmethod
+    def fingerprintFile(filePath: Path) -> Dict[str, Any]:
+        stat = filePath.stat()
+
+        return {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": _fingerprintHash(filePath, stat.st_size)
+        }
+
+    @staticmethod
+    def fingerprintDirectory(directoryPath: Path) -> Dict[str, Any]:
+        # Directory changes if any of its files was added, removed or modified
+        files: List[Tuple[str, int, int]] = []
+
+        for path in sorted(directoryPath.rglob("*")):
+            if path.is_file():
+                stat = path.stat()
+                files.append((path.relative_to(directoryPath).as_posix(), stat.st_size, stat.st_mtime_ns))
+
+        return {
+            "files": len(files),
+            "hash": _hashKey(files)
+        }
+
+    @classmethod
+    def load(cls, directory: Path, filePath: Path, chunkSize: int, fingerprint: Dict[str, Any]) -> Optional[Self]:
+        """
+            Loads the journal of the previous upload of the file
+
+            Returns
+            -------
+            Optional[Self] -> journal if it exists and matches the current
+            state of the file, None otherwise
+        """
+
+        path = _journalPath(directory, filePath)
+        if not path.exists():
+            return None
+
+        try:
+            with path.open("r") as file:
+                data = json.load(file)
+
+            if data["fingerprint"] != fingerprint or data["chunkSize"] != chunkSize:
+                logging.getLogger("coretexpylib").debug(f">> [Coretex] File \"{filePath}\" changed since last upload, discarding upload journal")
+                path.unlink(missing_ok = True)
+                return None
+
+            uploadedRanges = [(int(start), int(end)) for start, end in data["uploadedRanges"]]
+            return cls(directory, filePath, data["uploadId"], chunkSize, fingerprint, uploadedRanges)
+        except (ValueError, KeyError, TypeError) as exception:
+            logging.getLogger("coretexpylib").debug(f">> [Coretex] Discarding invalid upload journal \"{path}\"", exc_info = exception)
+            path.unlink(missing_ok = True)
+            return None
+
+    def isUploaded(self, start: int, end: int) -> bool:
+        with self._lock:
+            return (start, end) in self.uploadedRanges
+
+    def acknowledge(self, start: int, end: int) -> None:
+        with self._lock:
+            self.uploadedRanges.append((start, end))
+            self.acknowledgedCount += 1
+
+            self.save()
+
+    def save(self) -> None:
+        if self.directory is None:
+            return
+
+        path = _journalPath(self.directory, self.filePath)
+
+        data = {
+            "path": str(self.filePath),
+            "uploadId": self.uploadId,
+            "chunkSize": self.chunkSize,
+            "fingerprint": self.fingerprint,
+            "uploadedRanges": self.uploadedRanges
+        }
+
+        tempPath = path.with_suffix(".tmp")
+        with tempPath.open("w") as file:
+            json.dump(data, file)
+
+        os.replace(tempPath, path)
+
+    def remove(self) -> None:
+        if self.directory is None:
+            return
+
+        _journalPath(self.directory, self.filePath).unlink(missing_ok = True)
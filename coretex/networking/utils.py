@@ -26,6 +26,9 @@ from .network_response import NetworkResponse
 RequestBodyType = Dict[str, Any]
 RequestFormType = List[Tuple[str, Tuple[str, Union[bytes, BinaryIO], str]]]
 
+# Bytes-like objects which can be uploaded using "FileData"
+FileBytesType = Union[bytes, bytearray, memoryview]
+
 
 def logFilesData(files: Optional[RequestFormType]) -> List[Dict[str, Any]]:
     if files is None:
@@ -34,7 +37,7 @@ def logFilesData(files: Optional[RequestFormType]) -> List[Dict[str, Any]]:
     debugFilesData: List[Dict[str, Any]] = []
 
     for paramName, (fileName, fileData, mimeType) in files:
-        if isinstance(fileData, bytes):
+        if isinstance(fileData, (bytes, bytearray, memoryview)):
             fileSize = len(fileData)
         else:
             fileSize = fileData.seek(0, io.SEEK_END)
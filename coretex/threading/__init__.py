@@ -16,3 +16,4 @@
 #     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from .threaded_data_processor import MultithreadedDataProcessor
+from .pipeline import Pipeline, PipelineStage, StageStatistics
@@ -0,0 +1,329 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Callable, Generic, Iterable, List, Optional, TypeVar
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import Event, Lock
+from queue import Queue
+
+import time
+import logging
+
+
+T = TypeVar("T")
+
+_STOP = object()
+
+
+class StageStatistics:
+
+    """
+        Throughput counters of a single pipeline stage
+
+        Properties
+        ----------
+        name : str
+            name of the stage
+        workerCount : int
+            number of workers which process items of the stage
+        itemCount : int
+            number of processed items
+        byteCount : int
+            number of processed bytes
+        busyTime : float
+            total time (in seconds) workers spent processing items
+        blockedTime : float
+            total time (in seconds) workers spent waiting for
+            the next stage to accept processed items
+    """
+
+    def __init__(self, name: str, workerCount: int) -> None:
+        self.name = name
+        self.workerCount = workerCount
+        self.itemCount = 0
+        self.byteCount = 0
+        self.busyTime = 0.0
+        self.blockedTime = 0.0
+
+        self._lock = Lock()
+        self._startTime: Optional[float] = None
+        self._endTime: Optional[float] = None
+
+    @property
+    def elapsedTime(self) -> float:
+        if self._startTime is None:
+            return 0.0
+
+        endTime = self._endTime if self._endTime is not None else time.perf_counter()
+        return endTime - self._startTime
+
+    @property
+    def itemsPerSecond(self) -> float:
+        elapsedTime = self.elapsedTime
+        return self.itemCount / elapsedTime if elapsedTime > 0 else 0.0
+
+    @property
+    def bytesPerSecond(self) -> float:
+        elapsedTime = self.elapsedTime
+        return self.byteCount / elapsedTime if elapsedTime > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """
+            Returns
+            -------
+            float -> fraction of the available worker time which was spent processing items
+        """
+
+        available = self.elapsedTime * self.workerCount
+        return self.busyTime / available if available > 0 else 0.0
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._startTime is None:
+                self._startTime = time.perf_counter()
+
+    def _finish(self) -> None:
+        with self._lock:
+            self._endTime = time.perf_counter()
+
+    def _record(self, duration: float, size: int) -> None:
+        with self._lock:
+            self.itemCount += 1
+            self.byteCount += size
+            self.busyTime += duration
+
+    def _recordBlocked(self, duration: float) -> None:
+        with self._lock:
+            self.blockedTime += duration
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.itemCount} items, {self.itemsPerSecond:.2f} items/s, "
+            f"{self.bytesPerSecond / 1024 / 1024:.2f} MiB/s, {self.workerCount} workers, "
+            f"{self.utilization * 100:.0f}% utilized, {self.blockedTime:.2f}s blocked"
+        )
+
+
+class PipelineStage(Generic[T]):
+
+    """
+        Single stage of the pipeline
+
+        Properties
+        ----------
+        name : str
+            name of the stage
+        function : Callable[[T], None]
+            function which processes a single item
+        workerCount : int
+            number of threads which process items of this stage
+        queueSize : Optional[int]
+            maximum number of items waiting for this stage, if None
+            it will be twice the number of workers
+        sizeOf : Optional[Callable[[T], int]]
+            function which returns the number of bytes the stage
+            processed for the item, used for throughput counters
+    """
+
+    def __init__(
+        self,
+        name: str,
+        function: Callable[[T], None],
+        workerCount: int,
+        queueSize: Optional[int] = None,
+        sizeOf: Optional[Callable[[T], int]] = None
+    ) -> None:
+
+        if workerCount <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"workerCount\" value \"{workerCount}\" for stage \"{name}\". Value must be greater than 0")
+
+        if queueSize is None:
+            queueSize = workerCount * 2
+
+        if queueSize <= 0:
+            raise ValueError(f">> [Coretex] Invalid \"queueSize\" value \"{queueSize}\" for stage \"{name}\". Value must be greater than 0")
+
+        self.name = name
+        self.function = function
+        self.workerCount = workerCount
+        self.queueSize = queueSize
+        self.sizeOf = sizeOf
+        self.statistics = StageStatistics(name, workerCount)
+
+
+class Pipeline(Generic[T]):
+
+    """
+        Processes items through a sequence of stages. Every stage has its
+        own pool of workers and stages are connected with bounded queues,
+        so different stages (e.g. network, CPU and disk bound) work on
+        different items at the same time, while a slow stage stops the
+        stages before it from buffering too many items.
+
+        Every stage receives the item processed by the previous stage.
+        If any stage fails the pipeline stops accepting new items and
+        the exception is raised once all workers have stopped.
+
+        Parameters
+        ----------
+        stages : List[PipelineStage]
+            stages in order of processing
+        message : Optional[str]
+            message which is displayed when the processing starts
+
+        Example
+        -------
+        >>> from coretex.threading import Pipeline, PipelineStage
+        \b
+        >>> pipeline = Pipeline([
+                PipelineStage("download", lambda sample: sample.download(decrypt = False), workerCount = 8),
+                PipelineStage("decrypt", lambda sample: sample.decrypt(), workerCount = 4),
+                PipelineStage("unzip", lambda sample: sample.unzip(), workerCount = 2)
+            ])
+        >>> for statistics in pipeline.process(dataset.samples):
+                print(statistics)
+    """
+
+    def __init__(self, stages: List[PipelineStage[T]], message: Optional[str] = None) -> None:
+        if len(stages) == 0:
+            raise ValueError(">> [Coretex] Pipeline must contain at least one stage")
+
+        self.stages = stages
+        self.message = message
+
+        self._cancelled = Event()
+        self._exception: Optional[BaseException] = None
+        self._lock = Lock()
+
+    def _fail(self, exception: BaseException) -> None:
+        with self._lock:
+            if self._exception is None:
+                self._exception = exception
+
+        self._cancelled.set()
+
+    def _feed(self, data: Iterable[T], queue: Queue, workerCount: int) -> None:
+        try:
+            for item in data:
+                if self._cancelled.is_set():
+                    break
+
+                queue.put(item)
+        except BaseException as exception:
+            self._fail(exception)
+        finally:
+            for _ in range(workerCount):
+                queue.put(_STOP)
+
+    def _work(self, index: int, queues: List[Queue], remaining: List[int]) -> None:
+        stage = self.stages[index]
+        inputQueue = queues[index]
+        outputQueue = queues[index + 1] if index + 1 < len(queues) else None
+
+        while True:
+            item = inputQueue.get()
+            if item is _STOP:
+                break
+
+            # Items are drained after a failure so the previous
+            # stages are not blocked by a full queue
+            if self._cancelled.is_set():
+                continue
+
+            stage.statistics._start()
+
+            start = time.perf_counter()
+            try:
+                stage.function(item)
+                size = stage.sizeOf(item) if stage.sizeOf is not None else 0
+            except BaseException as exception:
+                self._fail(exception)
+                continue
+
+            stage.statistics._record(time.perf_counter() - start, size)
+
+            if outputQueue is not None:
+                start = time.perf_counter()
+                outputQueue.put(item)
+                stage.statistics._recordBlocked(time.perf_counter() - start)
+
+        with self._lock:
+            remaining[index] -= 1
+            isLastWorker = remaining[index] == 0
+
+        if isLastWorker:
+            stage.statistics._finish()
+
+            if outputQueue is not None:
+                for _ in range(self.stages[index + 1].workerCount):
+                    outputQueue.put(_STOP)
+
+    def process(self, data: Iterable[T]) -> List[StageStatistics]:
+        """
+            Processes all items through the pipeline
+
+            Parameters
+            ----------
+            data : Iterable[T]
+                items which will be processed
+
+            Returns
+            -------
+            List[StageStatistics] -> throughput counters of every stage
+
+            Raises
+            ------
+            Any unhandled exception which happened during the processing
+        """
+
+        logger = logging.getLogger("coretexpylib")
+
+        if self.message is not None:
+            logger.info(f">> [Coretex] {self.message}")
+            for stage in self.stages:
+                logger.info(f"\tUsing {stage.workerCount} workers for \"{stage.name}\"")
+
+        self._cancelled.clear()
+        self._exception = None
+
+        for stage in self.stages:
+            stage.statistics = StageStatistics(stage.name, stage.workerCount)
+
+        queues: List[Queue] = [Queue(maxsize = stage.queueSize) for stage in self.stages]
+        remaining = [stage.workerCount for stage in self.stages]
+        futures: List[Future] = []
+
+        with ThreadPoolExecutor(max_workers = sum(remaining) + 1) as pool:
+            futures.append(pool.submit(self._feed, data, queues[0], self.stages[0].workerCount))
+
+            for index, stage in enumerate(self.stages):
+                for _ in range(stage.workerCount):
+                    futures.append(pool.submit(self._work, index, queues, remaining))
+
+        for future in futures:
+            exception = future.exception()
+            if exception is not None:
+                raise exception
+
+        if self._exception is not None:
+            raise self._exception
+
+        for stage in self.stages:
+            logger.debug(f">> [Coretex] {stage.statistics}")
+
+        return [stage.statistics for stage in self.stages]
@@ -105,7 +105,7 @@ def isArchive(path: Path) -> bool:
         bool -> True if it is an archive, False otherwise
     """
 
-    return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+    return path.is_file() and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
 
 
 def gzipDecompress(source: Path, destination: Path) -> None:
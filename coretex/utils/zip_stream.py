@@ -0,0 +1,361 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Any, Optional, Tuple, BinaryIO
+from pathlib import Path, PurePosixPath
+from zipfile import BadZipFile
+
+import os
+import bz2
+import zlib
+import struct
+
+
+LOCAL_FILE_HEADER_SIGNATURE = 0x04034b50
+CENTRAL_DIRECTORY_SIGNATURE = 0x02014b50
+END_OF_CENTRAL_DIRECTORY_SIGNATURE = 0x06054b50
+DATA_DESCRIPTOR_SIGNATURE = 0x08074b50
+
+LOCAL_FILE_HEADER = struct.Struct("<IHHHHHIIIHH")
+ZIP64_EXTRA_ID = 0x0001
+ZIP64_LIMIT = 0xFFFFFFFF
+
+FLAG_ENCRYPTED = 0x01
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+
+METHOD_STORED = 0
+METHOD_DEFLATED = 8
+METHOD_BZIP2 = 12
+
+# Upper bound for the output of a single decompress call, keeps the
+# memory bounded even if a small input expands into a large output
+DECOMPRESS_CHUNK_SIZE = 1024 * 1024
+
+_STATE_HEADER = 0
+_STATE_DATA = 1
+_STATE_DESCRIPTOR = 2
+_STATE_DONE = 3
+
+
+class UnsupportedZipEntry(Exception):
+
+    """
+        Raised if an entry of the archive cannot be extracted
+        without reading the central directory of the archive
+    """
+
+    pass
+
+
+def _memberPath(destination: Path, name: str) -> Path:
+    # Same sanitization as ZipFile.extract: absolute paths and
+    # parent directory references are not allowed to leave the destination
+    parts = [part for part in PurePosixPath(name.replace("\\", "/")).parts if part not in ("", "/", ".", "..")]
+    return destination.joinpath(*parts)
+
+
+class _Entry:
+
+    def __init__(self, name: str, flags: int, method: int, crc: int, compressedSize: int, isZip64: bool) -> None:
+        self.name = name
+        self.flags = flags
+        self.method = method
+        self.crc = crc
+        self.compressedSize = compressedSize
+        self.isZip64 = isZip64
+
+        self.consumed = 0
+        self.actualCrc = 0
+        self.decompressor: Any = None
+        self.file: Optional[BinaryIO] = None
+
+    @property
+    def hasDataDescriptor(self) -> bool:
+        return self.flags & FLAG_DATA_DESCRIPTOR != 0
+
+
+class ZipStreamExtractor:
+
+    """
+        Not intended for outside use
+
+        Extracts a zip archive while its bytes are being received, so the
+        archive does not have to be stored (and read again) before extraction.
+        Entries are read using their local file headers, which are followed
+        by entry data, central directory at the end of the archive is ignored.
+
+        Supports stored, deflated and bzip2 compressed entries. Stored entries
+        whose size is only known from the data descriptor cannot be read
+        from a stream and raise UnsupportedZipEntry.
+
+        Parameters
+        ----------
+        destination : Path
+            directory to which the archive is extracted
+
+        Example
+        -------
+        >>> extractor = ZipStreamExtractor(Path("extracted"))
+        >>> for chunk in response.stream():
+                extractor.feed(chunk)
+        >>> extractor.close()
+    """
+
+    def __init__(self, destination: Path) -> None:
+        self.destination = destination
+
+        self._buffer = bytearray()
+        self._state = _STATE_HEADER
+        self._entry: Optional[_Entry] = None
+
+        destination.mkdir(parents = True, exist_ok = True)
+
+    def feed(self, data: bytes) -> None:
+        """
+            Extracts the next part of the archive
+
+            Parameters
+            ----------
+            data : bytes
+                bytes of the archive which follow previously fed bytes
+
+            Raises
+            ------
+            BadZipFile -> if the archive is invalid
+            UnsupportedZipEntry -> if the entry cannot be extracted from a stream
+        """
+
+        if self._state == _STATE_DONE:
+            return
+
+        self._buffer.extend(data)
+
+        while self._step():
+            pass
+
+    def abort(self) -> None:
+        """
+            Stops the extraction, already extracted files are not removed
+        """
+
+        if self._entry is not None and self._entry.file is not None:
+            self._entry.file.close()
+
+        self._entry = None
+        self._state = _STATE_DONE
+
+    def close(self) -> None:
+        """
+            Finishes the extraction
+
+            Raises
+            ------
+            BadZipFile -> if the archive ended before all entries were extracted
+        """
+
+        if self._entry is not None and self._entry.file is not None:
+            self._entry.file.close()
+
+        if self._state != _STATE_DONE:
+            raise BadZipFile("Archive ended unexpectedly")
+
+    def _step(self) -> bool:
+        # Returns True if progress was made and more data can be processed
+        if self._state == _STATE_HEADER:
+            return self._readHeader()
+
+        if self._state == _STATE_DATA:
+            return self._readData()
+
+        if self._state == _STATE_DESCRIPTOR:
+            return self._readDescriptor()
+
+        return False
+
+    def _readHeader(self) -> bool:
+        if len(self._buffer) < 4:
+            return False
+
+        signature = struct.unpack_from("<I", self._buffer)[0]
+        if signature in (CENTRAL_DIRECTORY_SIGNATURE, END_OF_CENTRAL_DIRECTORY_SIGNATURE):
+            self._state = _STATE_DONE
+            self._buffer.clear()
+            return False
+
+        if signature != LOCAL_FILE_HEADER_SIGNATURE:
+            raise BadZipFile("Invalid local file header signature")
+
+        if len(self._buffer) < LOCAL_FILE_HEADER.size:
+            return False
+
+        _, _, flags, method, _, _, crc, compressedSize, _, nameLength, extraLength = LOCAL_FILE_HEADER.unpack_from(self._buffer)
+
+        headerSize = LOCAL_FILE_HEADER.size + nameLength + extraLength
+        if len(self._buffer) < headerSize:
+            return False
+
+        rawName = bytes(self._buffer[LOCAL_FILE_HEADER.size:LOCAL_FILE_HEADER.size + nameLength])
+        name = rawName.decode("utf-8" if flags & FLAG_UTF8 else "cp437")
+
+        extra = bytes(self._buffer[LOCAL_FILE_HEADER.size + nameLength:headerSize])
+        compressedSize, isZip64 = self._parseZip64(extra, compressedSize)
+
+        del self._buffer[:headerSize]
+
+        if flags & FLAG_ENCRYPTED:
+            raise UnsupportedZipEntry(f"Entry \"{name}\" is encrypted")
+
+        entry = _Entry(name, flags, method, crc, compressedSize, isZip64)
+
+        if method == METHOD_STORED:
+            if entry.hasDataDescriptor:
+                raise UnsupportedZipEntry(f"Size of stored entry \"{name}\" is unknown")
+        elif method == METHOD_DEFLATED:
+            entry.decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        elif method == METHOD_BZIP2:
+            entry.decompressor = bz2.BZ2Decompressor()
+        else:
+            raise UnsupportedZipEntry(f"Compression method {method} of entry \"{name}\" is not supported")
+
+        path = _memberPath(self.destination, name)
+        if name.endswith("/"):
+            path.mkdir(parents = True, exist_ok = True)
+        else:
+            path.parent.mkdir(parents = True, exist_ok = True)
+            entry.file = path.open("wb")
+
+        self._entry = entry
+        self._state = _STATE_DATA
+
+        return True
+
+    def _parseZip64(self, extra: bytes, compressedSize: int) -> Tuple[int, bool]:
+        position = 0
+
+        while position + 4 <= len(extra):
+            fieldId, fieldSize = struct.unpack_from("<HH", extra, position)
+            position += 4
+
+            if fieldId == ZIP64_EXTRA_ID:
+                # Uncompressed size is first, compressed size second, both are
+                # present only if the value in the header is set to the limit
+                fieldData = extra[position:position + fieldSize]
+                if compressedSize == ZIP64_LIMIT and len(fieldData) >= 16:
+                    compressedSize = struct.unpack_from("<Q", fieldData, 8)[0]
+
+                return compressedSize, True
+
+            position += fieldSize
+
+        return compressedSize, False
+
+    def _write(self, entry: _Entry, data: bytes) -> None:
+        entry.actualCrc = zlib.crc32(data, entry.actualCrc)
+
+        if entry.file is not None:
+            entry.file.write(data)
+
+    def _decompress(self, entry: _Entry, data: bytes) -> None:
+        decompressor = entry.decompressor
+
+        while not decompressor.eof:
+            output = decompressor.decompress(data, DECOMPRESS_CHUNK_SIZE)
+            self._write(entry, output)
+
+            if entry.method == METHOD_DEFLATED:
+                # zlib keeps the input it did not process in unconsumed_tail, if the
+                # output is shorter than the limit everything pending was returned
+                data = decompressor.unconsumed_tail
+                if len(data) == 0 and len(output) < DECOMPRESS_CHUNK_SIZE:
+                    return
+            else:
+                # bz2 buffers the unprocessed input internally
+                if decompressor.needs_input:
+                    return
+
+                data = b""
+
+    def _readData(self) -> bool:
+        entry = self._entry
+        if entry is None or len(self._buffer) == 0:
+            return False
+
+        if entry.method == METHOD_STORED:
+            count = min(len(self._buffer), entry.compressedSize - entry.consumed)
+            self._write(entry, bytes(self._buffer[:count]))
+            del self._buffer[:count]
+
+            entry.consumed += count
+            isFinished = entry.consumed == entry.compressedSize
+        else:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+
+            self._decompress(entry, data)
+
+            # Compressed streams are self terminating, bytes
+            # which follow the end of the stream belong to the next entry
+            isFinished = entry.decompressor.eof
+            if isFinished:
+                self._buffer.extend(entry.decompressor.unused_data)
+
+        if not isFinished:
+            return False
+
+        if entry.file is not None:
+            entry.file.close()
+
+        if entry.hasDataDescriptor:
+            self._state = _STATE_DESCRIPTOR
+        else:
+            self._finishEntry(entry.crc)
+
+        return True
+
+    def _readDescriptor(self) -> bool:
+        entry = self._entry
+        if entry is None:
+            return False
+
+        size = 20 if entry.isZip64 else 12
+
+        # Data descriptor signature is optional
+        if len(self._buffer) < 4:
+            return False
+
+        offset = 4 if struct.unpack_from("<I", self._buffer)[0] == DATA_DESCRIPTOR_SIGNATURE else 0
+        if len(self._buffer) < offset + size:
+            return False
+
+        crc = struct.unpack_from("<I", self._buffer, offset)[0]
+        del self._buffer[:offset + size]
+
+        self._finishEntry(crc)
+        return True
+
+    def _finishEntry(self, crc: int) -> None:
+        entry = self._entry
+        if entry is None:
+            return
+
+        if entry.actualCrc != crc:
+            raise BadZipFile(f"Bad CRC-32 for file \"{entry.name}\"")
+
+        self._entry = None
+        self._state = _STATE_HEADER
+
@@ -0,0 +1,196 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+    Offline benchmark of the networking layer against the in-process fake API.
+    Measures download and upload throughput, per request overhead and retry
+    behaviour. Results can be compared with a stored baseline to detect
+    performance regressions in CI.
+
+    Usage (from the repository root):
+        python -m tests.benchmark.network_benchmark --output results.json
+        python -m tests.benchmark.network_benchmark --baseline results.json --tolerance 0.25
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+from coretex.networking import networkManager, segmentedDownload, ChunkUploadSession
+
+from ..src.fake_api_server import FakeApiServer
+
+
+MiB = 1024 * 1024
+
+# Metrics where a higher value is better, for all other metrics lower is better
+HIGHER_IS_BETTER = ["downloadMiBps", "segmentedDownloadMiBps", "uploadMiBps", "retrySuccessRate", "concurrentRequestsPerSecond"]
+
+
+def _timed(function: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    function()
+
+    return time.perf_counter() - start
+
+
+def benchmarkDownload(server: FakeApiServer, directory: Path, size: int) -> Dict[str, float]:
+    server.addFile("model/download", 1, os.urandom(size))
+
+    downloadTime = _timed(lambda: networkManager.download("model/download", directory / "single.bin", { "id": 1 }))
+    segmentedTime = _timed(lambda: segmentedDownload("model/download", directory / "segmented.bin", { "id": 1 }))
+
+    return {
+        "downloadMiBps": size / MiB / downloadTime,
+        "segmentedDownloadMiBps": size / MiB / segmentedTime
+    }
+
+
+def benchmarkUpload(directory: Path, size: int) -> Dict[str, float]:
+    path = directory / "upload.bin"
+    path.write_bytes(os.urandom(size))
+
+    uploadTime = _timed(lambda: ChunkUploadSession(16 * MiB, path).run())
+
+    return {
+        "uploadMiBps": size / MiB / uploadTime
+    }
+
+
+def benchmarkRequestOverhead(server: FakeApiServer, requestCount: int) -> Dict[str, float]:
+    entity = server.addEntity("dummy", name = "overhead")
+    endpoint = f"dummy/{entity['id']}"
+
+    durations: List[float] = []
+    for i in range(requestCount):
+        # Query makes every request unique so they are not coalesced
+        durations.append(_timed(lambda: networkManager.get(endpoint, { "i": i })))
+
+    durations.sort()
+
+    with ThreadPoolExecutor(max_workers = 8) as pool:
+        concurrentTime = _timed(lambda: list(pool.map(lambda i: networkManager.get(endpoint, { "c": i }), range(requestCount))))
+
+    return {
+        "requestMeanMs": statistics.mean(durations) * 1000,
+        "requestP95Ms": durations[int(len(durations) * 0.95)] * 1000,
+        "concurrentRequestsPerSecond": requestCount / concurrentTime
+    }
+
+
+def benchmarkRetries(server: FakeApiServer, requestCount: int) -> Dict[str, float]:
+    entity = server.addEntity("dummy", name = "retry")
+    endpoint = f"dummy/{entity['id']}"
+
+    server.errorRate = 0.2
+    networkManager.statistics.reset()
+
+    try:
+        start = time.perf_counter()
+        responses = [networkManager.get(endpoint, { "i": i }) for i in range(requestCount)]
+        duration = time.perf_counter() - start
+    finally:
+        server.errorRate = 0
+
+    summary = networkManager.statistics.summary()
+
+    return {
+        "retrySuccessRate": sum(not response.hasFailed() for response in responses) / requestCount,
+        "retriesPerRequest": summary["retries"] / requestCount,
+        "retryRequestMeanMs": duration / requestCount * 1000
+    }
+
+
+def run(size: int, requestCount: int, latency: float, bandwidth: Optional[float]) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as directory, FakeApiServer(latency = latency, bandwidth = bandwidth) as server:
+        response = networkManager.authenticate("benchmark@coretex.ai", "password", storeCredentials = False)
+        if response.hasFailed():
+            raise RuntimeError(">> [Coretex] Failed to authenticate with fake API server")
+
+        results.update(benchmarkDownload(server, Path(directory), size))
+        results.update(benchmarkUpload(Path(directory), size))
+        results.update(benchmarkRequestOverhead(server, requestCount))
+        results.update(benchmarkRetries(server, requestCount))
+
+        networkManager.reset()
+
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    regressions: List[str] = []
+
+    for key, baselineValue in baseline.items():
+        value = results.get(key)
+        if value is None or baselineValue == 0:
+            continue
+
+        if key in HIGHER_IS_BETTER:
+            change = (baselineValue - value) / baselineValue
+        else:
+            change = (value - baselineValue) / baselineValue
+
+        if change > tolerance:
+            regressions.append(f"{key}: {value:.2f} (baseline {baselineValue:.2f}, {change * 100:.0f}% worse)")
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Benchmark networking layer against the fake Coretex API")
+    parser.add_argument("--size", type = int, default = 64, help = "Size (MiB) of downloaded and uploaded files")
+    parser.add_argument("--requests", type = int, default = 200, help = "Number of requests used for overhead and retry benchmarks")
+    parser.add_argument("--latency", type = float, default = 0.0, help = "Injected latency (seconds) per request")
+    parser.add_argument("--bandwidth", type = float, default = None, help = "Injected bandwidth cap (MiB/s) per connection")
+    parser.add_argument("--output", type = Path, default = None, help = "Path to which results are written as JSON")
+    parser.add_argument("--baseline", type = Path, default = None, help = "Results of a previous run to compare against")
+    parser.add_argument("--tolerance", type = float, default = 0.25, help = "Allowed relative regression compared to baseline")
+
+    args = parser.parse_args()
+
+    bandwidth = None if args.bandwidth is None else args.bandwidth * MiB
+    results = run(args.size * MiB, args.requests, args.latency, bandwidth)
+
+    print(json.dumps(results, indent = 4))
+
+    if args.output is not None:
+        with args.output.open("w") as file:
+            json.dump(results, file, indent = 4)
+
+    if args.baseline is not None:
+        with args.baseline.open("r") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+
+        for regression in regressions:
+            print(f"Regression: {regression}")
+
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import List
+from uuid import uuid4
+from math import cos, sin, radians
+
+import unittest
+import json
+
+import numpy as np
+
+from coretex import CoretexSegmentationInstance, CoretexImageAnnotation, ImageDatasetClass, ImageDatasetClasses, BBox
+
+
+class TestSegmentationInstance(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.instance = CoretexSegmentationInstance.create(
+            uuid4(),
+            BBox(10, 10, 20, 20),
+            [[10, 10, 30, 10, 30, 30, 10, 30]]
+        )
+
+    def test_codableRoundTrip(self) -> None:
+        encoded = json.loads(json.dumps(self.instance.encode()))
+
+        decoded = CoretexSegmentationInstance.decode(encoded)
+        self.assertFalse(decoded.isArrayBacked)
+
+        decoded.useArrays()
+        self.assertTrue(decoded.isArrayBacked)
+        self.assertEqual(decoded.polygons[0].shape, (4, 2))
+        self.assertEqual(decoded.encode(), encoded)
+
+        encoded["annotations"] = [[0.5, 1.25, 10, 1.25, 10, 8.75]]
+        decoded = CoretexSegmentationInstance.decode(encoded)
+        decoded.useArrays()
+
+        self.assertEqual(decoded.encode()["annotations"], encoded["annotations"])
+        self.assertEqual(CoretexSegmentationInstance.decode(decoded.encode()).encode(), encoded)
+
+    def test_oddSegmentation(self) -> None:
+        self.instance.segmentations = [[10, 10, 30]]
+
+        with self.assertRaises(ValueError):
+            self.instance.polygons
+
+    def test_tooFewValues(self) -> None:
+        self.instance.segmentations = [[10, 10]]
+
+        with self.assertRaisesRegex(ValueError, r"\(2\)\. Minimum: 4"):
+            self.instance.extractSegmentationMask(40, 40)
+
+        self.instance.useArrays()
+
+        with self.assertRaisesRegex(ValueError, r"\(2\)\. Minimum: 4"):
+            self.instance.extractSegmentationMask(40, 40)
+
+    def test_geometry(self) -> None:
+        self.assertEqual(self.instance.centroid(), (20, 20))
+
+        self.instance.translate(5, -5)
+        self.assertEqual(self.instance.centroid(), (25, 15))
+        self.assertEqual(self.instance.segmentations, [[15, 5, 35, 5, 35, 25, 15, 25]])
+
+        self.instance.centerSegmentations((20, 20))
+        self.instance.scale(2, origin = (20, 20))
+        self.assertEqual(self.instance.segmentations, [[0, 0, 40, 0, 40, 40, 0, 40]])
+
+        self.instance.rotateSegmentations(90)
+        self.assertEqual(self.instance.centroid(), (20, 20))
+        self.assertEqual(sorted(map(tuple, np.rint(self.instance.polygons[0]).tolist())), [(0, 0), (0, 40), (40, 0), (40, 40)])
+
+        bbox = self.instance.computeBBox()
+        self.assertEqual((bbox.minX, bbox.minY, bbox.width, bbox.height), (0, 0, 40, 40))
+
+    def test_readOnlyStorage(self) -> None:
+        self.instance.polygons
+        self.instance.centroid()
+        self.instance.computeBBox()
+        self.instance.extractSegmentationMask(40, 40)
+
+        # Reading geometry does not convert the instance, so list edits are kept
+        self.assertFalse(self.instance.isArrayBacked)
+
+        self.instance.segmentations[0].extend([20, 40])
+        self.assertEqual(len(self.instance.polygons[0]), 5)
+
+    def test_rotateTruncation(self) -> None:
+        self.instance.segmentations = [[10, 10, 33, 17, 25, 31]]
+        centerX, centerY = self.instance.centroid()
+
+        theta = radians(-30)
+        expected: List[int] = []
+        for x, y in zip(self.instance.segmentations[0][0::2], self.instance.segmentations[0][1::2]):
+            x -= centerX
+            y -= centerY
+
+            expected.append(int(x * cos(theta) - y * sin(theta)) + centerX)
+            expected.append(int(x * sin(theta) + y * cos(theta)) + centerY)
+
+        self.instance.rotateSegmentations(30)
+
+        self.assertFalse(self.instance.isArrayBacked)
+        self.assertEqual(self.instance.segmentations, [expected])
+
+    def test_extractSegmentationMask(self) -> None:
+        listMask = self.instance.extractSegmentationMask(40, 40)
+
+        self.instance.useArrays()
+        arrayMask = self.instance.extractSegmentationMask(40, 40)
+
+        self.assertTrue(np.array_equal(listMask, arrayMask))
+        self.assertEqual(int(arrayMask.sum()), 21 * 21)
+
+        imageClass = ImageDatasetClass("object", "#ffffff")
+        imageClass.classIds = [self.instance.classId]
+        classes = ImageDatasetClasses([imageClass])
+
+        annotation = CoretexImageAnnotation.create("image", 40, 40, [self.instance])
+        self.assertTrue(np.array_equal(annotation.extractSegmentationMask(classes), arrayMask))
+
+
+if __name__ == "__main__":
+    unittest.main()
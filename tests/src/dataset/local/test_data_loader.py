@@ -0,0 +1,130 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Tuple
+from pathlib import Path
+from zipfile import ZipFile
+
+import time
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from coretex import LocalCustomDataset, LocalCustomSample, DataLoader
+
+
+SAMPLE_COUNT = 10
+LOAD_DELAY = 0.05
+
+
+def _transform(sample: LocalCustomSample) -> Tuple[np.ndarray, int]:
+    index = int(sample.name.split("-")[1])
+    return np.full((2, 3), index, dtype = np.int32), index
+
+
+def _slowTransform(sample: LocalCustomSample) -> Tuple[np.ndarray, int]:
+    time.sleep(LOAD_DELAY)
+    return _transform(sample)
+
+
+class TestDataLoader(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempDir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tempDir)
+
+        for i in range(SAMPLE_COUNT):
+            with ZipFile(self.tempDir / f"sample-{i}.zip", "w") as zipFile:
+                zipFile.writestr("data.txt", str(i))
+
+        self.dataset = LocalCustomDataset(self.tempDir)
+
+    def _indices(self, loader: DataLoader) -> list:
+        return [int(index) for _, indices in loader for index in indices]
+
+    def test_batches(self) -> None:
+        loader = DataLoader(self.dataset, _transform, batchSize = 4)
+        batches = list(loader)
+
+        self.assertEqual(len(loader), 3)
+        self.assertEqual([len(indices) for _, indices in batches], [4, 4, 2])
+
+        arrays, indices = batches[0]
+        self.assertEqual(arrays.shape, (4, 2, 3))
+        self.assertTrue(np.array_equal(arrays[:, 0, 0], indices))
+
+        expected = sorted(int(sample.name.split("-")[1]) for sample in self.dataset.samples)
+        self.assertEqual(sorted(self._indices(loader)), expected)
+
+        loader = DataLoader(self.dataset, _transform, batchSize = 4, dropLast = True)
+        self.assertEqual(len(list(loader)), 2)
+        self.assertEqual(len(loader), 2)
+
+    def test_seededShuffle(self) -> None:
+        first = DataLoader(self.dataset, _transform, batchSize = 3, shuffle = True, seed = 7)
+        second = DataLoader(self.dataset, _transform, batchSize = 3, shuffle = True, seed = 7)
+
+        firstEpochs = [self._indices(first) for _ in range(2)]
+        secondEpochs = [self._indices(second) for _ in range(2)]
+
+        self.assertEqual(firstEpochs, secondEpochs)
+        self.assertNotEqual(firstEpochs[0], firstEpochs[1], "Every epoch should have a different order")
+
+    def test_prefetch(self) -> None:
+        loader = DataLoader(self.dataset, _slowTransform, batchSize = 1, workers = 5)
+
+        start = time.perf_counter()
+        for _ in loader:
+            # Consumer is slower than the loader so batches are ready in advance
+            time.sleep(LOAD_DELAY)
+
+        duration = time.perf_counter() - start
+
+        self.assertLess(duration, 2 * SAMPLE_COUNT * LOAD_DELAY)
+
+        statistics = loader.statistics
+        if statistics is None:
+            raise ValueError
+
+        self.assertEqual(statistics.batchCount, SAMPLE_COUNT)
+        self.assertEqual(len(statistics.queueDepths), SAMPLE_COUNT)
+        self.assertGreater(statistics.averageQueueDepth, 0)
+        self.assertLess(statistics.stallCount, SAMPLE_COUNT)
+
+    def test_stopIteration(self) -> None:
+        loader = DataLoader(self.dataset, _slowTransform, batchSize = 1, workers = 2)
+
+        for _ in loader:
+            break
+
+        statistics = loader.statistics
+        if statistics is None:
+            raise ValueError
+
+        self.assertEqual(statistics.batchCount, 1)
+
+    def test_processes(self) -> None:
+        loader = DataLoader(self.dataset, _transform, batchSize = 5, workers = 2, useProcesses = True)
+        self.assertEqual(len(self._indices(loader)), SAMPLE_COUNT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from pathlib import Path
+from zipfile import ZipFile
+from io import BytesIO
+from unittest import mock
+
+import json
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+import numpy as np
+
+from coretex import LocalImageDataset, SegmentationMaskCache, MaskType, MaskStorage, \
+    ImageDatasetClass, ImageDatasetClasses, CoretexImageAnnotation, CoretexSegmentationInstance, BBox
+
+
+SAMPLE_COUNT = 5
+
+
+def _writeSample(path: Path, width: int, height: int, classes: ImageDatasetClasses) -> None:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height)).save(buffer, "png")
+
+    instances = [
+        CoretexSegmentationInstance.create(
+            clazz.classIds[0],
+            BBox(index * 4, index * 4, 8, 8),
+            [[index * 4, index * 4, index * 4 + 8, index * 4, index * 4 + 8, index * 4 + 8, index * 4, index * 4 + 8]]
+        )
+        for index, clazz in enumerate(classes)
+    ]
+
+    annotation = CoretexImageAnnotation.create(path.stem, width, height, instances)
+
+    with ZipFile(path, "w") as zipFile:
+        zipFile.writestr("image.png", buffer.getvalue())
+        zipFile.writestr("annotations.json", json.dumps(annotation.encode()))
+
+
+class TestMaskCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempDir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tempDir)
+
+        classes = ImageDatasetClasses([ImageDatasetClass("car"), ImageDatasetClass("bicycle")])
+
+        with (self.tempDir / "classes.json").open("w") as file:
+            json.dump([clazz.encode() for clazz in classes], file)
+
+        for i in range(SAMPLE_COUNT):
+            _writeSample(self.tempDir / f"sample-{i}.zip", 30 + i * 5, 20 + i * 3, classes)
+
+        self.dataset = LocalImageDataset(self.tempDir)
+
+    def expectedMask(self, index: int) -> np.ndarray:
+        annotation = self.dataset.samples[index].load(lazy = True).annotation
+
+        # here only for mypy
+        if annotation is None:
+            raise ValueError
+
+        return annotation.extractSegmentationMask(self.dataset.classes)
+
+    def test_extractSegmentationMasks(self) -> None:
+        masks = self.dataset.extractSegmentationMasks(workers = 2)
+
+        self.assertEqual(len(masks), SAMPLE_COUNT)
+        for index, mask in enumerate(masks):
+            self.assertEqual(mask.dtype, np.uint8)
+            self.assertTrue(np.array_equal(mask, self.expectedMask(index)))
+
+        masks = self.dataset.extractSegmentationMasks(MaskType.instance, workers = 2, useProcesses = False)
+        self.assertEqual(masks[0].dtype, np.uint16)
+        self.assertEqual(set(np.unique(masks[0])), {0, 1, 2})
+
+    def test_downscale(self) -> None:
+        masks = self.dataset.extractSegmentationMasks(downscale = 2, useProcesses = False)
+
+        for sample, mask in zip(self.dataset.samples, masks):
+            annotation = sample.load(lazy = True).annotation
+
+            # here only for mypy
+            if annotation is None:
+                raise ValueError
+
+            self.assertEqual(mask.shape, ((annotation.height + 1) // 2, (annotation.width + 1) // 2))
+
+        self.assertEqual(masks[0][1, 1], self.expectedMask(0)[2, 2])
+
+    def test_buildMaskCache(self) -> None:
+        for storage in MaskStorage:
+            cache = self.dataset.buildMaskCache(storage = storage, workers = 2)
+            self.assertEqual(len(cache), SAMPLE_COUNT)
+
+            for index, sample in enumerate(self.dataset.samples):
+                self.assertTrue(np.array_equal(cache.mask(sample), self.expectedMask(index)))
+
+            # Cache is up to date, so it must not be built again
+            with mock.patch.object(SegmentationMaskCache, "build", side_effect = AssertionError("Cache was rebuilt")):
+                self.dataset.buildMaskCache(storage = storage)
+
+    def test_cacheInvalidation(self) -> None:
+        cache = self.dataset.buildMaskCache(useProcesses = False)
+        self.assertIsInstance(cache.mask(0).base, np.memmap)
+
+        self.dataset.classes.append(ImageDatasetClass("airplane"))
+        self.assertFalse(cache.isValidFor(self.dataset.samples, self.dataset.classes))
+
+        cache = self.dataset.buildMaskCache(useProcesses = False)
+        self.assertTrue(cache.isValidFor(self.dataset.samples, self.dataset.classes))
+
+
+if __name__ == "__main__":
+    unittest.main()
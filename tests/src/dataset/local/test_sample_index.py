@@ -0,0 +1,119 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Generator, Dict, Any
+from pathlib import Path
+
+import unittest
+
+from coretex import LocalCustomSample, LocalCustomDataset
+
+
+SAMPLE_COUNT = 1000
+
+
+def _generator(path: Path) -> Generator[LocalCustomSample, None, None]:
+    for i in range(SAMPLE_COUNT):
+        yield LocalCustomSample(path / f"sample-{i}.zip")
+
+
+def _metadata(sample: LocalCustomSample) -> Dict[str, Any]:
+    number = int(sample.name.split("-")[1])
+
+    metadata: Dict[str, Any] = {
+        "split": "train" if number % 5 != 0 else "validation",
+        "width": number
+    }
+
+    if number % 2 == 0:
+        metadata["even"] = True
+
+    return metadata
+
+
+class TestSampleIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        path = Path("sample-index")
+        self.dataset = LocalCustomDataset.custom(path, _generator(path))
+
+    def test_getSample(self) -> None:
+        self.assertIs(self.dataset.getSample("sample-500"), self.dataset.samples[500])
+
+        # Name prefix returns the first sample in dataset order
+        self.assertIs(self.dataset.getSample("sample-99"), self.dataset.samples[99])
+        self.assertIs(self.dataset.getSample("sample-"), self.dataset.samples[0])
+        self.assertIsNone(self.dataset.getSample("missing"))
+
+    def test_indexFollowsAdd(self) -> None:
+        self.assertIsNone(self.dataset.getSample("added"))
+
+        sample = self.dataset.add(Path("sample-index") / "added.zip")
+
+        self.assertIs(self.dataset.getSample("added"), sample)
+
+        # Replaced list is indexed again
+        self.dataset.samples = self.dataset.samples[:10]
+        self.assertIsNone(self.dataset.getSample("added"))
+        self.assertIs(self.dataset.getSample("sample-9"), self.dataset.samples[9])
+
+    def test_indexFollowsInPlaceChanges(self) -> None:
+        self.assertIs(self.dataset.getSample("sample-5"), self.dataset.samples[5])
+
+        # Sample replaced in place is not returned for its old name
+        replacement = LocalCustomSample(Path("sample-index") / "replacement.zip")
+        self.dataset.samples[5] = replacement
+
+        self.assertIsNot(self.dataset.getSample("sample-5"), replacement)
+        self.assertIs(self.dataset.getSample("replacement"), replacement)
+
+        # Lookup which finds nothing trusts the index until it is rebuilt
+        other = LocalCustomSample(Path("sample-index") / "other.zip")
+        self.dataset.samples[6] = other
+
+        self.assertIsNone(self.dataset.getSample("other"))
+
+        self.dataset.reindex()
+        self.assertIs(self.dataset.getSample("other"), other)
+
+        # List changed without changing its length
+        removed = self.dataset.samples[7]
+        self.dataset.samples.remove(removed)
+        self.dataset.samples.append(LocalCustomSample(Path("sample-index") / "appended.zip"))
+
+        # Removed sample is not returned, "sample-70" is the first sample whose name starts with it
+        self.assertEqual(self.dataset.getSample(removed.name).name, "sample-70")  # type: ignore[union-attr]
+        self.assertIs(self.dataset.getSample("appended"), self.dataset.samples[-1])
+        self.assertIs(self.dataset.getSample("sample-8"), self.dataset.samples[7])
+
+    def test_queryMetadata(self) -> None:
+        metadata = self.dataset.indexMetadata(_metadata, indexedFields = ["split"])
+
+        validation = metadata.query(split = "validation")
+        self.assertEqual([sample.name for sample in validation], [f"sample-{i}" for i in range(0, SAMPLE_COUNT, 5)])
+
+        wide = metadata.query(split = "train", width = lambda width: width > 990, even = True)
+        self.assertEqual([sample.name for sample in wide], ["sample-992", "sample-994", "sample-996", "sample-998"])
+
+        self.assertEqual(len(metadata.query(even = None)), SAMPLE_COUNT // 2)
+        self.assertEqual(metadata.query(split = "test"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
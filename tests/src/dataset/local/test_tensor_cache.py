@@ -0,0 +1,94 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from pathlib import Path
+from zipfile import ZipFile
+from io import BytesIO
+from unittest import mock
+
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+import numpy as np
+
+from coretex import LocalImageDataset, ImageTensorCache
+
+
+SAMPLE_COUNT = 6
+WIDTH = 32
+HEIGHT = 24
+
+
+def _writeSample(path: Path, width: int, height: int, seed: int) -> None:
+    pixels = np.random.default_rng(seed).integers(0, 255, (height, width, 3), dtype = np.uint8)
+
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, "png")
+
+    with ZipFile(path, "w") as zipFile:
+        zipFile.writestr("image.png", buffer.getvalue())
+
+
+class TestTensorCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempDir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tempDir)
+
+        for i in range(SAMPLE_COUNT):
+            _writeSample(self.tempDir / f"sample-{i}.zip", 40 + i * 7, 30 + i * 3, i)
+
+        self.dataset = LocalImageDataset(self.tempDir)
+
+    def test_buildTensorCache(self) -> None:
+        cache = self.dataset.buildTensorCache(WIDTH, HEIGHT, workers = 3)
+
+        self.assertEqual(cache.images.shape, (SAMPLE_COUNT, HEIGHT, WIDTH, 3))
+        self.assertIsInstance(cache.images, np.memmap)
+
+        for sample in self.dataset.samples:
+            expected = sample.load(targetSize = (WIDTH, HEIGHT))
+
+            self.assertTrue(np.array_equal(cache.image(sample), expected.image))
+            self.assertEqual(cache.padding(sample), expected.padding)
+
+    def test_cacheReuse(self) -> None:
+        self.dataset.buildTensorCache(WIDTH, HEIGHT)
+
+        # Cache is up to date, so it must not be built again
+        with mock.patch.object(ImageTensorCache, "build", side_effect = AssertionError("Cache was rebuilt")):
+            cache = self.dataset.buildTensorCache(WIDTH, HEIGHT)
+
+        self.assertEqual(len(cache), SAMPLE_COUNT)
+
+        # Modified sample invalidates the cache
+        sample = self.dataset.samples[0]
+        _writeSample(sample.zipPath, 64, 64, 100)
+
+        cache = self.dataset.buildTensorCache(WIDTH, HEIGHT)
+        expected = sample.load(targetSize = (WIDTH, HEIGHT))
+
+        self.assertTrue(np.array_equal(cache.image(sample), expected.image))
+
+
+if __name__ == "__main__":
+    unittest.main()
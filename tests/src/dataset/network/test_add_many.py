@@ -0,0 +1,78 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import List, Tuple
+from zipfile import ZipFile
+
+import time
+import unittest
+
+from coretex import CustomDataset
+
+from ...networking.base_fake_server_test import BaseFakeServerTest
+
+
+SAMPLE_COUNT = 24
+LATENCY = 0.05
+
+
+class TestAddMany(BaseFakeServerTest.Base):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.paths = []
+        for i in range(SAMPLE_COUNT):
+            path = self.tempDir / f"sample-{i}.zip"
+            with ZipFile(path, "w") as zipFile:
+                zipFile.writestr("data.txt", f"sample {i}")
+
+            self.paths.append(path)
+
+        datasetData = self.server.addDataset("add-many-dataset")
+        self.dataset = CustomDataset.fetchById(datasetData["id"])
+
+    def test_addMany(self) -> None:
+        progress: List[Tuple[int, int]] = []
+        self.server.latency = LATENCY
+
+        start = time.perf_counter()
+        results = self.dataset.addMany(self.paths, workers = 8, onProgress = lambda done, total: progress.append((done, total)))
+        duration = time.perf_counter() - start
+
+        self.assertTrue(all(result.succeeded for result in results))
+        self.assertEqual([result.name for result in results], [path.stem for path in self.paths])
+        self.assertEqual([sample.name for sample in self.dataset.samples], [path.stem for path in self.paths])
+        self.assertEqual(progress[-1], (SAMPLE_COUNT, SAMPLE_COUNT))
+
+        # Every import sends multiple requests, sequential
+        # import would take at least one latency per sample
+        self.assertLess(duration, SAMPLE_COUNT * LATENCY)
+
+    def test_failedImports(self) -> None:
+        paths = list(self.paths[:4])
+        paths.insert(2, self.tempDir / "missing.zip")
+
+        results = self.dataset.addMany(paths, workers = 2)
+
+        self.assertEqual([result.succeeded for result in results], [True, True, False, True, True])
+        self.assertIsInstance(results[2].error, Exception)
+        self.assertEqual(len(self.dataset.samples), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
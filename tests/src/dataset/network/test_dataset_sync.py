@@ -0,0 +1,179 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import List
+from io import BytesIO
+from zipfile import ZipFile
+
+import shutil
+import unittest
+
+from coretex import CustomDataset
+
+from ...networking.base_fake_server_test import BaseFakeServerTest
+
+
+def _createArchive(content: str) -> bytes:
+    buffer = BytesIO()
+
+    with ZipFile(buffer, "w") as zipFile:
+        zipFile.writestr("data.txt", content)
+
+    return buffer.getvalue()
+
+
+class TestDatasetSync(BaseFakeServerTest.Base):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.datasets: List[CustomDataset] = []
+
+    def tearDown(self) -> None:
+        for dataset in self.datasets:
+            for sample in dataset.samples:
+                sample.zipPath.unlink(missing_ok = True)
+                shutil.rmtree(sample.path, ignore_errors = True)
+
+            shutil.rmtree(dataset.path, ignore_errors = True)
+
+        super().tearDown()
+
+    def fetchDataset(self, datasetId: int) -> CustomDataset:
+        dataset = CustomDataset.fetchById(datasetId)
+        self.datasets.append(dataset)
+
+        return dataset
+
+    def test_incrementalDownload(self) -> None:
+        datasetData = self.server.addDataset("sync-dataset")
+        samplesData = [self.server.addSample(datasetData, _createArchive(f"sample {i}")) for i in range(5)]
+
+        exportCount = self.server.requestCount("GET", "session/export")
+
+        dataset = self.fetchDataset(datasetData["id"])
+        dataset.download()
+
+        self.assertEqual(self.server.requestCount("GET", "session/export"), exportCount + 5)
+        for sample in dataset.samples:
+            self.assertTrue((dataset.path / sample.zipPath.name).exists())
+
+        # Nothing changed, no sample is downloaded again
+        dataset = self.fetchDataset(datasetData["id"])
+        dataset.download()
+        self.assertEqual(self.server.requestCount("GET", "session/export"), exportCount + 5)
+
+        # Only modified and added samples are downloaded, removed sample is unlinked
+        self.server.updateSample(samplesData[0], _createArchive("modified"))
+        self.server.removeSample(datasetData, samplesData[1])
+        self.server.addSample(datasetData, _createArchive("added"))
+
+        dataset = self.fetchDataset(datasetData["id"])
+        dataset.download()
+
+        self.assertEqual(self.server.requestCount("GET", "session/export"), exportCount + 7)
+        self.assertFalse((dataset.path / f"{samplesData[1]['id']}.zip").exists())
+
+        with ZipFile(dataset.path / f"{samplesData[0]['id']}.zip") as zipFile:
+            self.assertEqual(zipFile.read("data.txt"), b"modified")
+
+    def test_truncatedSample(self) -> None:
+        datasetData = self.server.addDataset("truncated-dataset")
+        for i in range(3):
+            self.server.addSample(datasetData, _createArchive(f"sample {i}"))
+
+        exportCount = self.server.requestCount("GET", "session/export")
+
+        dataset = self.fetchDataset(datasetData["id"])
+        dataset.download()
+
+        sample = dataset.samples[0]
+        with sample.zipPath.open("r+b") as file:
+            file.truncate(10)
+
+        # Truncated sample is downloaded again
+        dataset = self.fetchDataset(datasetData["id"])
+        dataset.download()
+
+        self.assertEqual(self.server.requestCount("GET", "session/export"), exportCount + 4)
+        with ZipFile(dataset.path / sample.zipPath.name) as zipFile:
+            self.assertEqual(zipFile.read("data.txt"), b"sample 0")
+
+    def test_downloadUnzip(self) -> None:
+        datasetData = self.server.addDataset("unzip-dataset")
+        for i in range(6):
+            self.server.addSample(datasetData, _createArchive(f"sample {i}"))
+
+        exportCount = self.server.requestCount("GET", "session/export")
+
+        dataset = self.fetchDataset(datasetData["id"])
+        dataset.download(unzip = True, downloadWorkers = 3, decryptWorkers = 2, unzipWorkers = 2)
+
+        for i, sample in enumerate(sorted(dataset.samples, key = lambda sample: sample.id)):
+            self.assertEqual(sample.joinPath("data.txt").read_text(), f"sample {i}")
+
+        # Extracted samples are up to date, only the removed sample folder is extracted again
+        shutil.rmtree(dataset.samples[0].path)
+
+        dataset = self.fetchDataset(datasetData["id"])
+        dataset.download(unzip = True)
+
+        self.assertEqual(self.server.requestCount("GET", "session/export"), exportCount + 6)
+        self.assertTrue(dataset.samples[0].joinPath("data.txt").exists())
+
+    def test_streamingDownload(self) -> None:
+        datasetData = self.server.addDataset("streaming-dataset")
+        for i in range(4):
+            self.server.addSample(datasetData, _createArchive(f"sample {i}"))
+
+        exportCount = self.server.requestCount("GET", "session/export")
+
+        dataset = self.fetchDataset(datasetData["id"])
+        dataset.download(unzip = True, streaming = True)
+
+        for i, sample in enumerate(sorted(dataset.samples, key = lambda sample: sample.id)):
+            self.assertEqual(sample.joinPath("data.txt").read_text(), f"sample {i}")
+            self.assertTrue((dataset.path / sample.zipPath.name).exists())
+
+        dataset = self.fetchDataset(datasetData["id"])
+        dataset.download(unzip = True, streaming = True)
+
+        self.assertEqual(self.server.requestCount("GET", "session/export"), exportCount + 4)
+
+    def test_relinkSharedSample(self) -> None:
+        firstData = self.server.addDataset("first-dataset")
+        secondData = self.server.addDataset("second-dataset")
+
+        sampleData = self.server.addSample(firstData, _createArchive("original"))
+        secondData["sessions"].append(sampleData)
+
+        first = self.fetchDataset(firstData["id"])
+        second = self.fetchDataset(secondData["id"])
+
+        first.download()
+        second.download()
+
+        # Downloading modified sample for one dataset updates links of all datasets
+        self.server.updateSample(sampleData, _createArchive("modified"))
+        self.fetchDataset(firstData["id"]).download()
+
+        with ZipFile(second.path / f"{sampleData['id']}.zip") as zipFile:
+            self.assertEqual(zipFile.read("data.txt"), b"modified")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from io import BytesIO, RawIOBase, BufferedWriter
+from zipfile import ZipFile
+from unittest import mock
+from base64 import b64encode
+
+import os
+import zipfile
+import unittest
+
+from coretex import CustomDataset
+from coretex.cryptography import aes
+from coretex._folder_manager import folder_manager
+from coretex.entities.dataset.network_dataset import _archiveMembers, _storedArchiveSize, _writeStoredArchive
+
+from ...networking.base_fake_server_test import BaseFakeServerTest
+
+
+FILES = {
+    "data.txt": b"sample data" * 1000,
+    "nested/values.bin": os.urandom(3 * 1024 * 1024)
+}
+
+
+class _UnseekableBuffer(RawIOBase):
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.data = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self.data.extend(data)
+        return len(data)
+
+
+class TestEncryptedImport(BaseFakeServerTest.Base):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.key = os.urandom(32)
+
+        environment = mock.patch.dict(os.environ, { "CTX_PROJECT_KEY_1": b64encode(self.key).decode() })
+        environment.start()
+        self.addCleanup(environment.stop)
+
+        # Encrypted import must not store the archive or encrypted data to the disk
+        tempFile = mock.patch.object(folder_manager, "tempFile", side_effect = AssertionError("Temporary file was created"))
+        tempFile.start()
+        self.addCleanup(tempFile.stop)
+
+        datasetData = self.server.addDataset("encrypted-import-dataset", encrypted = True)
+        self.dataset = CustomDataset.fetchById(datasetData["id"])
+
+    def _uploadedContent(self) -> bytes:
+        encrypted = bytes(list(self.server.uploads.values())[-1])
+
+        decryptor = aes.StreamDecryptor(self.key, encrypted[:aes.IV_SIZE])
+        return b"".join(decryptor.feed(encrypted[aes.IV_SIZE:])) + decryptor.flush()
+
+    def test_importDirectory(self) -> None:
+        samplePath = self.tempDir / "sample"
+        for name, content in FILES.items():
+            path = samplePath / name
+            path.parent.mkdir(parents = True, exist_ok = True)
+            path.write_bytes(content)
+
+        sample = self.dataset.add(samplePath)
+
+        self.assertEqual(sample.name, "sample")
+        self.assertTrue(sample.isEncrypted)
+
+        with ZipFile(BytesIO(self._uploadedContent())) as zipFile:
+            self.assertEqual({ name: zipFile.read(name) for name in zipFile.namelist() }, FILES)
+
+    def test_storedArchiveSize(self) -> None:
+        samplePath = self.tempDir / "sample"
+        for name, content in { **FILES, "empty.txt": b"", "nested/ünïcode.txt": b"value" }.items():
+            path = samplePath / name
+            path.parent.mkdir(parents = True, exist_ok = True)
+            path.write_bytes(content)
+
+        # Small limits check the size of zip64 records without creating huge files
+        for limit in (zipfile.ZIP64_LIMIT, 1024 * 1024, 100):
+            with mock.patch.object(zipfile, "ZIP64_LIMIT", limit), mock.patch.object(zipfile, "ZIP_FILECOUNT_LIMIT", min(limit // 50, 0xFFFF)):
+                members = _archiveMembers(samplePath)
+
+                buffer = _UnseekableBuffer()
+                with BufferedWriter(buffer) as writer:
+                    _writeStoredArchive(members, writer)
+
+                self.assertEqual(_storedArchiveSize([member for _, member in members]), len(buffer.data))
+
+        with ZipFile(BytesIO(buffer.data)) as zipFile:
+            self.assertEqual(zipFile.read("nested/values.bin"), FILES["nested/values.bin"])
+
+    def test_importArchive(self) -> None:
+        archivePath = self.tempDir / "sample.zip"
+        with ZipFile(archivePath, "w") as zipFile:
+            for name, content in FILES.items():
+                zipFile.writestr(name, content)
+
+        self.dataset.add(archivePath)
+
+        self.assertEqual(self._uploadedContent(), archivePath.read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
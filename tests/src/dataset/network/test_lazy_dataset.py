@@ -0,0 +1,102 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from io import BytesIO
+from zipfile import ZipFile
+
+import shutil
+import unittest
+
+from coretex import CustomDataset
+
+from ...networking.base_fake_server_test import BaseFakeServerTest
+
+
+SAMPLE_COUNT = 25
+PAGE_SIZE = 10
+
+
+def _createArchive(content: str) -> bytes:
+    buffer = BytesIO()
+
+    with ZipFile(buffer, "w") as zipFile:
+        zipFile.writestr("data.txt", content)
+
+    return buffer.getvalue()
+
+
+class TestLazyDataset(BaseFakeServerTest.Base):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.datasetData = cls.server.addDataset("lazy-dataset")
+        cls.samplesData = [cls.server.addSample(cls.datasetData, _createArchive(f"sample {i}")) for i in range(SAMPLE_COUNT)]
+
+    def listRequestCount(self) -> int:
+        return self.server.requestCount("GET", "session")
+
+    def test_openWithSingleRequest(self) -> None:
+        requestCount = self.server.requestCount()
+
+        dataset = CustomDataset.fetchById(self.datasetData["id"], lazy = True, samplePageSize = PAGE_SIZE)
+
+        self.assertEqual(dataset.count, SAMPLE_COUNT)
+        self.assertEqual(self.server.requestCount(), requestCount + 1)
+
+    def test_pagedAccess(self) -> None:
+        dataset = CustomDataset.fetchById(self.datasetData["id"], lazy = True, samplePageSize = PAGE_SIZE)
+        listCount = self.listRequestCount()
+
+        self.assertEqual(dataset.samples[13].id, self.samplesData[13]["id"])
+        self.assertEqual(dataset.samples[17].id, self.samplesData[17]["id"])
+        self.assertEqual(dataset.samples[-1].id, self.samplesData[-1]["id"])
+        self.assertEqual(self.listRequestCount(), listCount + 2)
+
+        self.assertEqual([sample.id for sample in dataset.samples], [sample["id"] for sample in self.samplesData])
+        self.assertEqual([sample.id for sample in dataset.samples[5:8]], [sample["id"] for sample in self.samplesData[5:8]])
+        self.assertEqual(self.listRequestCount(), listCount + 3)
+
+        with self.assertRaises(IndexError):
+            dataset.samples[SAMPLE_COUNT]
+
+    def test_fieldProjection(self) -> None:
+        dataset = CustomDataset.fetchById(self.datasetData["id"], lazy = True, sampleFields = ["name"])
+        sample = dataset.samples[3]
+
+        self.assertEqual(sample.name, self.samplesData[3]["name"])
+        self.assertFalse(hasattr(sample, "lastModified"))
+
+    def test_download(self) -> None:
+        dataset = CustomDataset.fetchById(self.datasetData["id"], lazy = True, samplePageSize = PAGE_SIZE)
+
+        try:
+            dataset.download(unzip = True)
+
+            for i, sample in enumerate(dataset.samples):
+                self.assertEqual(sample.joinPath("data.txt").read_text(), f"sample {i}")
+        finally:
+            for sample in dataset.samples:
+                sample.zipPath.unlink(missing_ok = True)
+                shutil.rmtree(sample.path, ignore_errors = True)
+
+            shutil.rmtree(dataset.path, ignore_errors = True)
+
+
+if __name__ == "__main__":
+    unittest.main()
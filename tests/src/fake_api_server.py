@@ -0,0 +1,651 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, Any, Dict, List, Tuple, Callable
+from typing_extensions import Self
+from types import TracebackType
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread, Lock
+from urllib.parse import urlsplit, parse_qs
+
+import os
+import re
+import json
+import time
+import uuid
+import random
+import hashlib
+
+
+API_PREFIX = "/api/v1/"
+WRITE_CHUNK_SIZE = 64 * 1024
+UNAUTHORIZED_ENDPOINTS = ["user/login", "user/refresh"]
+
+# Endpoints which return file contents, file is selected using the "id" query parameter
+DOWNLOAD_ENDPOINTS = ["session/export", "model/download", "artifact/download-file", "workspace/download"]
+
+
+class RecordedRequest:
+
+    def __init__(self, method: str, endpoint: str, query: Dict[str, str], headers: Dict[str, str], bodySize: int) -> None:
+        self.method = method
+        self.endpoint = endpoint
+        self.query = query
+        self.headers = headers
+        self.bodySize = bodySize
+
+
+def _parseMultipart(contentType: str, body: bytes) -> Tuple[Dict[str, str], Dict[str, bytes]]:
+    # email.parser is too slow for chunks which are tens of MBs in size,
+    # so the body is split on the boundary directly
+    boundary = contentType.split("boundary=")[1].strip("\"").encode()
+
+    fields: Dict[str, str] = {}
+    files: Dict[str, bytes] = {}
+
+    for part in body.split(b"--" + boundary)[1:]:
+        if part.startswith(b"--"):
+            break
+
+        # Part starts with CRLF after the boundary and ends with CRLF before the next one
+        headers, _, content = part[2:-2].partition(b"\r\n\r\n")
+
+        name = re.search(rb'name="([^"]*)"', headers)
+        if name is None:
+            continue
+
+        if b"filename=" in headers:
+            files[name.group(1).decode()] = content
+        else:
+            fields[name.group(1).decode()] = content.decode()
+
+    return fields, files
+
+
+def _formatDate(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f%z")
+
+
+def _parseRange(value: str, size: int) -> Optional[Tuple[int, int]]:
+    # Returns inclusive byte range or None if range is not satisfiable
+    start, end = value.replace("bytes=", "").split("-")
+    first = int(start)
+    last = size - 1 if end == "" else min(int(end), size - 1)
+
+    if first >= size or first > last:
+        return None
+
+    return first, last
+
+
+class FakeApiServer:
+
+    """
+        In-process stand-in for the Coretex API which implements the
+        endpoints used by the library. Entities are stored in memory,
+        any "<entity>" and "<entity>/<id>" endpoint supports create,
+        fetch (with pagination and filtering), update and delete.
+
+        Latency, bandwidth and error rates can be injected to
+        test and benchmark the library under degraded network conditions.
+
+        Properties
+        ----------
+        latency : float
+            seconds before every response is sent
+        bandwidth : Optional[float]
+            maximum number of bytes per second for request and response
+            bodies of a single connection, if None bandwidth is not limited
+        errorRate : float
+            fraction of requests which fail with "errorStatus"
+        errorStatus : int
+            status code of injected errors
+        throttleRate : float
+            fraction of requests which fail with "429 Too Many Requests"
+        retryAfter : int
+            value of "Retry-After" header sent with throttled responses
+        requireAuth : bool
+            if True requests without a valid api token fail with "401 Unauthorized"
+
+        Example
+        -------
+        >>> with FakeApiServer(latency = 0.05, errorRate = 0.1) as server:
+                server.addFile("model/download", 1, b"model")
+                networkManager.download("model/download", "model.zip", { "id": 1 })
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+        errorRate: float = 0.0,
+        errorStatus: int = HTTPStatus.INTERNAL_SERVER_ERROR,
+        throttleRate: float = 0.0,
+        retryAfter: int = 0,
+        requireAuth: bool = False,
+        seed: int = 0
+    ) -> None:
+
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.errorRate = errorRate
+        self.errorStatus = errorStatus
+        self.throttleRate = throttleRate
+        self.retryAfter = retryAfter
+        self.requireAuth = requireAuth
+
+        self.entities: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.downloads: Dict[Tuple[str, str], bytes] = {}
+        self.uploads: Dict[str, bytearray] = {}
+        self.logs: List[Dict[str, Any]] = []
+        self.metrics: List[Dict[str, Any]] = []
+        self.requests: List[RecordedRequest] = []
+
+        self.apiToken = "api-token-0"
+        self.refreshToken = "refresh-token"
+        self.refreshCount = 0
+
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._nextId = 1
+        self._failures: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._droppedConnections = 0
+        self._dropAfterBytes = 0
+        self._previousUrl: Optional[str] = None
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handlerClass())
+        self._server.daemon_threads = True
+        self._thread = Thread(target = self._server.serve_forever, daemon = True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> None:
+        self._thread.start()
+
+        # NetworkManager reads server url from environment for every request
+        self._previousUrl = os.environ.get("CTX_API_URL")
+        os.environ["CTX_API_URL"] = self.url
+
+    def stop(self) -> None:
+        if self._previousUrl is not None:
+            os.environ["CTX_API_URL"] = self._previousUrl
+
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exceptionType: Optional[type],
+        exceptionValue: Optional[BaseException],
+        exceptionTraceback: Optional[TracebackType]
+    ) -> None:
+
+        self.stop()
+
+    def addEntity(self, entityType: str, **fields: Any) -> Dict[str, Any]:
+        with self._lock:
+            entity = { "id": self._nextId, "is_deleted": False, **fields }
+            self._nextId += 1
+
+            self.entities.setdefault(entityType, {})[entity["id"]] = entity
+
+        return entity
+
+    def addFile(self, endpoint: str, id: int, content: bytes) -> None:
+        self.downloads[(endpoint, str(id))] = content
+
+    def addDataset(self, name: str, projectId: int = 1, projectTask: int = 8, encrypted: bool = False) -> Dict[str, Any]:
+        return self.addEntity(
+            "dataset",
+            name = name,
+            project_id = projectId,
+            project_task = projectTask,
+            is_locked = False,
+            is_encrypted = encrypted,
+            created_on = _formatDate(time.time()),
+            created_by_id = "1",
+            meta = None,
+            sessions = []
+        )
+
+    def addSample(self, dataset: Dict[str, Any], content: bytes, name: Optional[str] = None) -> Dict[str, Any]:
+        sample = self.addEntity(
+            "session",
+            name = name,
+            dataset_id = dataset["id"],
+            project_id = dataset["project_id"],
+            project_task = dataset["project_task"],
+            is_locked = False,
+            is_encrypted = dataset["is_encrypted"],
+            storage_last_modified = _formatDate(time.time())
+        )
+
+        if sample["name"] is None:
+            sample["name"] = f"sample-{sample['id']}"
+
+        # Dataset response contains the same objects, so updates of samples are visible in the dataset
+        dataset["sessions"].append(sample)
+        self.addFile("session/export", sample["id"], content)
+
+        return sample
+
+    def updateSample(self, sample: Dict[str, Any], content: bytes) -> None:
+        self.addFile("session/export", sample["id"], content)
+        sample["storage_last_modified"] = _formatDate(time.time() + 1)
+
+    def removeSample(self, dataset: Dict[str, Any], sample: Dict[str, Any]) -> None:
+        dataset["sessions"].remove(sample)
+
+    def expireToken(self) -> None:
+        # Requests with the current api token fail with unauthorized until token is refreshed
+        with self._lock:
+            self.apiToken = f"api-token-{self.refreshCount + 1}-expired"
+
+    def failRequests(self, method: str, endpoint: str, count: int, status: int = HTTPStatus.BAD_REQUEST) -> None:
+        # Next "count" requests sent to the endpoint fail with the provided status
+        with self._lock:
+            self._failures[(method, endpoint)] = (count, status)
+
+    def dropConnections(self, count: int, afterBytes: int) -> None:
+        # Next "count" file downloads are interrupted after "afterBytes" bytes are sent
+        with self._lock:
+            self._droppedConnections = count
+            self._dropAfterBytes = afterBytes
+
+    def requestCount(self, method: Optional[str] = None, endpoint: Optional[str] = None) -> int:
+        with self._lock:
+            return sum(
+                1 for request in self.requests
+                if (method is None or request.method == method) and (endpoint is None or request.endpoint == endpoint)
+            )
+
+    def _handlerClass(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = "HTTP/1.1"
+
+            # Headers and body are written separately, without this every
+            # response would be delayed by Nagle algorithm and delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                server._handle(self, "GET")
+
+            def do_POST(self) -> None:
+                server._handle(self, "POST")
+
+            def do_PUT(self) -> None:
+                server._handle(self, "PUT")
+
+            def do_DELETE(self) -> None:
+                server._handle(self, "DELETE")
+
+            def do_OPTIONS(self) -> None:
+                server._handle(self, "OPTIONS")
+
+        return Handler
+
+    # Request handling
+
+    def _throttle(self, size: int, start: float) -> None:
+        if self.bandwidth is None:
+            return
+
+        delay = size / self.bandwidth - (time.perf_counter() - start)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _readBody(self, handler: BaseHTTPRequestHandler) -> bytes:
+        length = int(handler.headers.get("Content-Length", 0))
+        body = bytearray()
+        start = time.perf_counter()
+
+        while len(body) < length:
+            chunk = handler.rfile.read(min(WRITE_CHUNK_SIZE, length - len(body)))
+            if len(chunk) == 0:
+                break
+
+            body.extend(chunk)
+            self._throttle(len(body), start)
+
+        return bytes(body)
+
+    def _send(
+        self,
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        body: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+        dropAfter: Optional[int] = None
+    ) -> None:
+
+        handler.send_response(status)
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+
+        if handler.command == "HEAD":
+            return
+
+        sent = 0
+        start = time.perf_counter()
+
+        while sent < len(body):
+            end = min(sent + WRITE_CHUNK_SIZE, len(body))
+            if dropAfter is not None:
+                end = min(end, dropAfter)
+
+            try:
+                handler.wfile.write(body[sent:end])
+            except (BrokenPipeError, ConnectionResetError):
+                # Client can close the connection once it received enough
+                # data (e.g. the first segment of an open-ended range request)
+                handler.close_connection = True
+                return
+
+            sent = end
+
+            if dropAfter is not None and sent >= dropAfter:
+                # Simulate connection which was closed in the middle of the response
+                handler.wfile.flush()
+                handler.close_connection = True
+                return
+
+            self._throttle(sent, start)
+
+    def _sendJson(self, handler: BaseHTTPRequestHandler, status: int, value: Any) -> None:
+        body = json.dumps(value).encode()
+        etag = f"\"{hashlib.sha1(body).hexdigest()}\""
+
+        if status == HTTPStatus.OK and handler.command == "GET" and handler.headers.get("If-None-Match") == etag:
+            self._send(handler, HTTPStatus.NOT_MODIFIED, headers = { "ETag": etag })
+            return
+
+        self._send(handler, status, body, {
+            "Content-Type": "application/json",
+            "ETag": etag
+        })
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        url = urlsplit(handler.path)
+        endpoint = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path.lstrip("/")
+        query = { key: values[-1] for key, values in parse_qs(url.query).items() }
+        body = self._readBody(handler)
+
+        with self._lock:
+            self.requests.append(RecordedRequest(method, endpoint, query, dict(handler.headers), len(body)))
+
+            errorStatus: Optional[int] = None
+            if self._random.random() < self.errorRate:
+                errorStatus = self.errorStatus
+
+            count, status = self._failures.get((method, endpoint), (0, 0))
+            if count > 0:
+                self._failures[(method, endpoint)] = (count - 1, status)
+                errorStatus = status
+
+            isThrottled = errorStatus is None and self._random.random() < self.throttleRate
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        if isThrottled or errorStatus == HTTPStatus.TOO_MANY_REQUESTS:
+            self._send(handler, HTTPStatus.TOO_MANY_REQUESTS, headers = { "Retry-After": str(self.retryAfter) })
+            return
+
+        if errorStatus is not None:
+            self._sendJson(handler, errorStatus, { "message": "Injected error" })
+            return
+
+        if method == "OPTIONS":
+            self._send(handler, HTTPStatus.OK)
+            return
+
+        if self.requireAuth and endpoint not in UNAUTHORIZED_ENDPOINTS and handler.headers.get("api-token") != self.apiToken:
+            self._sendJson(handler, HTTPStatus.UNAUTHORIZED, { "message": "Unauthorized" })
+            return
+
+        contentType = handler.headers.get("Content-Type", "")
+        fields: Dict[str, Any] = {}
+        files: Dict[str, bytes] = {}
+
+        if contentType.startswith("multipart/form-data"):
+            fields, files = _parseMultipart(contentType, body)
+        elif contentType.startswith("application/x-www-form-urlencoded"):
+            fields = { key: values[-1] for key, values in parse_qs(body.decode()).items() }
+        elif len(body) > 0:
+            fields = json.loads(body)
+
+        route = self._routes().get((method, endpoint))
+        if route is not None:
+            route(handler, query, fields, files)
+            return
+
+        if method == "GET" and endpoint in DOWNLOAD_ENDPOINTS:
+            self._download(handler, endpoint, query)
+            return
+
+        self._crud(handler, method, endpoint, query, fields)
+
+    def _routes(self) -> Dict[Tuple[str, str], Callable[[BaseHTTPRequestHandler, Dict[str, str], Dict[str, Any], Dict[str, bytes]], None]]:
+        return {
+            ("POST", "user/login"): self._login,
+            ("POST", "user/refresh"): self._refresh,
+            ("POST", "upload/start"): self._uploadStart,
+            ("POST", "upload/chunk"): self._uploadChunk,
+            ("POST", "session/import"): self._sessionImport,
+            ("POST", "model-queue/add-console-log"): self._addConsoleLog,
+            ("POST", "model-queue/metrics-meta"): self._addMetrics,
+            ("POST", "model-queue/metrics"): self._addMetrics
+        }
+
+    def _login(self, handler: BaseHTTPRequestHandler, query: Dict[str, str], fields: Dict[str, Any], files: Dict[str, bytes]) -> None:
+        self._sendJson(handler, HTTPStatus.OK, { "token": self.apiToken, "refresh_token": self.refreshToken })
+
+    def _refresh(self, handler: BaseHTTPRequestHandler, query: Dict[str, str], fields: Dict[str, Any], files: Dict[str, bytes]) -> None:
+        if handler.headers.get("api-token") != self.refreshToken:
+            self._sendJson(handler, HTTPStatus.UNAUTHORIZED, { "message": "Invalid refresh token" })
+            return
+
+        with self._lock:
+            self.refreshCount += 1
+            self.apiToken = f"api-token-{self.refreshCount}"
+
+        self._sendJson(handler, HTTPStatus.OK, { "token": self.apiToken })
+
+    def _uploadStart(self, handler: BaseHTTPRequestHandler, query: Dict[str, str], fields: Dict[str, Any], files: Dict[str, bytes]) -> None:
+        uploadId = str(uuid.uuid4())
+
+        with self._lock:
+            self.uploads[uploadId] = bytearray(int(fields["size"]))
+
+        self._sendJson(handler, HTTPStatus.OK, { "id": uploadId })
+
+    def _uploadChunk(self, handler: BaseHTTPRequestHandler, query: Dict[str, str], fields: Dict[str, Any], files: Dict[str, bytes]) -> None:
+        upload = self.uploads.get(fields["id"])
+        if upload is None:
+            self._sendJson(handler, HTTPStatus.NOT_FOUND, { "message": "Upload not found" })
+            return
+
+        start, end = int(fields["start"]), int(fields["end"])
+        content = files["file"]
+
+        if len(content) != end - start + 1:
+            self._sendJson(handler, HTTPStatus.BAD_REQUEST, { "message": "Chunk size does not match byte range" })
+            return
+
+        with self._lock:
+            upload[start:end + 1] = content
+
+        self._sendJson(handler, HTTPStatus.OK, {})
+
+    def _sessionImport(self, handler: BaseHTTPRequestHandler, query: Dict[str, str], fields: Dict[str, Any], files: Dict[str, bytes]) -> None:
+        if "file_id" in fields:
+            content = bytes(self.uploads[fields["file_id"]])
+        else:
+            content = files["file"]
+
+        dataset = self.entities.get("dataset", {}).get(int(fields["dataset_id"]))
+        if dataset is None:
+            self._sendJson(handler, HTTPStatus.NOT_FOUND, { "message": "dataset not found" })
+            return
+
+        sample = self.addEntity(
+            "session",
+            name = fields.get("name"),
+            dataset_id = dataset["id"],
+            project_id = dataset["project_id"],
+            project_task = dataset["project_task"],
+            is_locked = False,
+            is_encrypted = dataset["is_encrypted"],
+            storage_last_modified = _formatDate(time.time())
+        )
+
+        with self._lock:
+            dataset["sessions"].append(sample)
+
+        self.addFile("session/export", sample["id"], content)
+        self._sendJson(handler, HTTPStatus.OK, sample)
+
+    def _addConsoleLog(self, handler: BaseHTTPRequestHandler, query: Dict[str, str], fields: Dict[str, Any], files: Dict[str, bytes]) -> None:
+        with self._lock:
+            self.logs.extend(fields["logs"])
+
+        self._sendJson(handler, HTTPStatus.OK, {})
+
+    def _addMetrics(self, handler: BaseHTTPRequestHandler, query: Dict[str, str], fields: Dict[str, Any], files: Dict[str, bytes]) -> None:
+        with self._lock:
+            self.metrics.extend(fields["metrics"])
+
+        self._sendJson(handler, HTTPStatus.OK, {})
+
+    def _download(self, handler: BaseHTTPRequestHandler, endpoint: str, query: Dict[str, str]) -> None:
+        content = self.downloads.get((endpoint, query.get("id", "")))
+        if content is None:
+            self._sendJson(handler, HTTPStatus.NOT_FOUND, { "message": "File not found" })
+            return
+
+        with self._lock:
+            dropAfter: Optional[int] = None
+            if self._droppedConnections > 0:
+                self._droppedConnections -= 1
+                dropAfter = self._dropAfterBytes
+
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "ETag": f"\"{hashlib.sha1(content).hexdigest()}\"",
+            "Accept-Ranges": "bytes"
+        }
+
+        rangeHeader = handler.headers.get("Range")
+        if rangeHeader is None:
+            self._send(handler, HTTPStatus.OK, content, headers, dropAfter)
+            return
+
+        byteRange = _parseRange(rangeHeader, len(content))
+        if byteRange is None:
+            self._send(handler, HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, headers = { "Content-Range": f"bytes */{len(content)}" })
+            return
+
+        first, last = byteRange
+        headers["Content-Range"] = f"bytes {first}-{last}/{len(content)}"
+
+        self._send(handler, HTTPStatus.PARTIAL_CONTENT, content[first:last + 1], headers, dropAfter)
+
+    def _crud(self, handler: BaseHTTPRequestHandler, method: str, endpoint: str, query: Dict[str, str], fields: Dict[str, Any]) -> None:
+        segments = endpoint.split("/")
+        entityType = segments[0]
+        entities = self.entities.setdefault(entityType, {})
+
+        if len(segments) == 1:
+            if method == "POST":
+                self._sendJson(handler, HTTPStatus.OK, self.addEntity(entityType, **fields))
+                return
+
+            if method == "GET":
+                query = dict(query)
+                page = int(query.pop("page", 1))
+                pageSize = int(query.pop("page_size", 100))
+                fields = query.pop("fields", None)
+
+                with self._lock:
+                    candidates = list(entities.values())
+
+                    # Samples can belong to multiple datasets, so they are listed using the dataset
+                    if entityType == "session" and "dataset_id" in query:
+                        dataset = self.entities.get("dataset", {}).get(int(query.pop("dataset_id")))
+                        candidates = list(dataset["sessions"]) if dataset is not None else []
+
+                    matches = [
+                        entity for entity in candidates
+                        if all(str(entity.get(key)) == value for key, value in query.items() if key in entity)
+                    ]
+
+                matches = matches[(page - 1) * pageSize:page * pageSize]
+                if fields is not None:
+                    matches = [{ key: entity[key] for key in fields.split(",") if key in entity } for entity in matches]
+
+                self._sendJson(handler, HTTPStatus.OK, matches)
+                return
+
+        if len(segments) == 2 and segments[1].isdigit():
+            entity = entities.get(int(segments[1]))
+            if entity is None:
+                self._sendJson(handler, HTTPStatus.NOT_FOUND, { "message": f"{entityType} not found" })
+                return
+
+            if method == "GET":
+                if "sessions" in entity and query.get("include_sessions") != "1":
+                    sessionsCount = len(entity["sessions"])
+
+                    entity = { key: value for key, value in entity.items() if key != "sessions" }
+                    entity["sessions_count"] = sessionsCount
+
+                self._sendJson(handler, HTTPStatus.OK, entity)
+                return
+
+            if method == "PUT":
+                with self._lock:
+                    entity.update(fields)
+
+                self._sendJson(handler, HTTPStatus.OK, entity)
+                return
+
+            if method == "DELETE":
+                with self._lock:
+                    del entities[entity["id"]]
+
+                self._sendJson(handler, HTTPStatus.OK, {})
+                return
+
+        self._sendJson(handler, HTTPStatus.NOT_IMPLEMENTED, { "message": f"\"{method} {endpoint}\" is not implemented" })
@@ -0,0 +1,75 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from pathlib import Path
+from unittest import mock
+
+import unittest
+import tempfile
+
+from coretex.networking import networkManager
+from coretex.networking.rate_limiter import AdaptiveRateLimiter
+
+from ..fake_api_server import FakeApiServer
+
+
+class BaseFakeServerTest:
+
+    class Base(unittest.TestCase):
+
+        server: FakeApiServer
+
+        @classmethod
+        def setUpClass(cls) -> None:
+            super().setUpClass()
+
+            cls.server = FakeApiServer()
+            cls.server.start()
+
+        @classmethod
+        def tearDownClass(cls) -> None:
+            super().tearDownClass()
+
+            cls.server.stop()
+
+        def setUp(self) -> None:
+            super().setUp()
+
+            self.server.latency = 0
+            self.server.errorRate = 0
+            self.server.throttleRate = 0
+            self.server.requireAuth = False
+
+            # Every test starts with maximum rate and without an active backoff
+            rateLimiterPatcher = mock.patch.object(networkManager, "_rateLimiter", AdaptiveRateLimiter())
+            rateLimiterPatcher.start()
+            self.addCleanup(rateLimiterPatcher.stop)
+
+            networkManager.statistics.reset()
+
+            response = networkManager.authenticate("user@coretex.ai", "password", storeCredentials = False)
+            self.assertFalse(response.hasFailed(), "Failed to authenticate with fake server")
+
+            self._tempDir = tempfile.TemporaryDirectory()
+            self.tempDir = Path(self._tempDir.name)
+
+        def tearDown(self) -> None:
+            super().tearDown()
+
+            networkManager.setResponseCache(None)
+            networkManager.reset()
+            self._tempDir.cleanup()
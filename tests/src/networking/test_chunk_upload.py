@@ -0,0 +1,152 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Any, Dict
+from pathlib import Path
+
+import os
+import unittest
+
+from coretex.networking import ChunkUploadSession, StreamChunkUploadSession, NetworkRequestError
+from coretex.networking.upload_journal import retainedUploadFile
+
+from .base_fake_server_test import BaseFakeServerTest
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class TestChunkUpload(BaseFakeServerTest.Base):
+
+    def test_chunkUpload(self) -> None:
+        content = os.urandom(10 * CHUNK_SIZE + 5)
+
+        path = self.tempDir / "file.bin"
+        path.write_bytes(content)
+
+        session = ChunkUploadSession(CHUNK_SIZE, path, workerCount = 4)
+        uploadId = session.run()
+
+        self.assertEqual(bytes(self.server.uploads[uploadId]), content)
+        self.assertEqual(len(session.chunkDurations), 11)
+
+    def test_chunkUploadResume(self) -> None:
+        content = os.urandom(4 * CHUNK_SIZE)
+
+        path = self.tempDir / "file.bin"
+        path.write_bytes(content)
+
+        journalDirectory = self.tempDir / "uploads"
+        journalDirectory.mkdir()
+
+        # Single worker keeps the order of chunks deterministic, so only the first chunk fails
+        self.server.failRequests("POST", "upload/chunk", 1)
+        with self.assertRaises(NetworkRequestError):
+            ChunkUploadSession(CHUNK_SIZE, path, workerCount = 1, journalDirectory = journalDirectory).run()
+
+        self.assertEqual(len(list(journalDirectory.iterdir())), 1, "Upload journal was not stored")
+
+        startCount = self.server.requestCount("POST", "upload/start")
+        chunkCount = self.server.requestCount("POST", "upload/chunk")
+
+        uploadId = ChunkUploadSession(CHUNK_SIZE, path, workerCount = 1, journalDirectory = journalDirectory).run()
+
+        self.assertEqual(bytes(self.server.uploads[uploadId]), content)
+        self.assertEqual(self.server.requestCount("POST", "upload/start"), startCount, "Upload was not resumed")
+        self.assertEqual(self.server.requestCount("POST", "upload/chunk") - chunkCount, 1, "Uploaded chunks were sent again")
+        self.assertEqual(len(list(journalDirectory.iterdir())), 0, "Upload journal was not removed")
+
+    def test_retainedUploadFileResume(self) -> None:
+        content = os.urandom(4 * CHUNK_SIZE)
+
+        journalDirectory = self.tempDir / "uploads"
+        journalDirectory.mkdir()
+
+        buildCount = 0
+
+        def build(path: Path) -> None:
+            nonlocal buildCount
+            buildCount += 1
+
+            # Built file is different on every build, same as an encrypted copy
+            path.write_bytes(os.urandom(16) + content)
+
+        def upload(fingerprint: Dict[str, Any]) -> str:
+            with retainedUploadFile(journalDirectory, "model-1", fingerprint, ".zip", build) as path:
+                return ChunkUploadSession(CHUNK_SIZE, path, workerCount = 1, journalDirectory = journalDirectory).run()
+
+        self.server.failRequests("POST", "upload/chunk", 1)
+        with self.assertRaises(NetworkRequestError):
+            upload({ "version": 1 })
+
+        startCount = self.server.requestCount("POST", "upload/start")
+        upload({ "version": 1 })
+
+        self.assertEqual(buildCount, 1, "File was built again for unchanged source")
+        self.assertEqual(self.server.requestCount("POST", "upload/start"), startCount, "Upload was not resumed")
+        self.assertEqual(len(list(journalDirectory.iterdir())), 0, "Uploaded file was not removed")
+
+        # File built from the previous state of the source is removed
+        self.server.failRequests("POST", "upload/chunk", 1)
+        with self.assertRaises(NetworkRequestError):
+            upload({ "version": 1 })
+
+        upload({ "version": 2 })
+
+        self.assertEqual(buildCount, 3)
+        self.assertEqual(len(list(journalDirectory.iterdir())), 0, "Stale upload file was not removed")
+
+    def test_streamChunkUpload(self) -> None:
+        content = os.urandom(5 * CHUNK_SIZE + 7)
+
+        session = StreamChunkUploadSession(len(content), "stream.bin", CHUNK_SIZE, workerCount = 2)
+
+        # Writes which are not aligned with chunks
+        for start in range(0, len(content), 10000):
+            session.write(content[start:start + 10000])
+
+        uploadId = session.finish()
+
+        self.assertEqual(bytes(self.server.uploads[uploadId]), content)
+        self.assertEqual(len(session.chunkDurations), 6)
+
+    def test_streamChunkUploadSizeMismatch(self) -> None:
+        session = StreamChunkUploadSession(CHUNK_SIZE, "stream.bin", CHUNK_SIZE)
+        session.write(os.urandom(CHUNK_SIZE // 2))
+
+        with self.assertRaises(ValueError):
+            session.finish()
+
+        session = StreamChunkUploadSession(CHUNK_SIZE, "stream.bin", CHUNK_SIZE)
+
+        with self.assertRaises(ValueError):
+            session.write(os.urandom(CHUNK_SIZE + 1))
+            session.finish()
+
+    def test_streamChunkUploadFailure(self) -> None:
+        self.server.failRequests("POST", "upload/chunk", 1)
+
+        content = os.urandom(4 * CHUNK_SIZE)
+        session = StreamChunkUploadSession(len(content), "stream.bin", CHUNK_SIZE, workerCount = 1)
+
+        with self.assertRaises(NetworkRequestError):
+            session.write(content)
+            session.finish()
+
+
+if __name__ == "__main__":
+    unittest.main()
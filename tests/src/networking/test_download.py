@@ -0,0 +1,178 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Any
+from unittest import mock
+from threading import Lock, BoundedSemaphore
+from concurrent.futures import ThreadPoolExecutor
+
+import os
+import unittest
+
+from coretex.networking import networkManager, segmentedDownload, RequestFailedError
+from coretex.networking import segmented_download
+
+from .base_fake_server_test import BaseFakeServerTest
+
+
+SEGMENT_SIZE = 256 * 1024
+
+
+class TestDownload(BaseFakeServerTest.Base):
+
+    def test_download(self) -> None:
+        content = os.urandom(3 * 1024 * 1024 + 17)
+        self.server.addFile("model/download", 1, content)
+
+        destination = self.tempDir / "model.zip"
+        response = networkManager.download("model/download", destination, { "id": 1 })
+
+        self.assertFalse(response.hasFailed())
+        self.assertEqual(destination.read_bytes(), content)
+
+        statistics = response.downloadStatistics
+        self.assertIsNotNone(statistics)
+        self.assertEqual(statistics.bytesDownloaded, len(content))  # type: ignore[union-attr]
+
+    def test_streamDownloadSkipsExisting(self) -> None:
+        content = os.urandom(1024)
+        self.server.addFile("artifact/download-file", 2, content)
+
+        destination = self.tempDir / "artifact"
+        networkManager.streamDownload("artifact/download-file", destination, { "id": 2 })
+        self.assertEqual(destination.read_bytes(), content)
+
+        response = networkManager.streamDownload("artifact/download-file", destination, { "id": 2 })
+        self.assertIsNone(response.downloadStatistics, "Existing file was downloaded again")
+
+    @mock.patch.object(segmented_download, "MIN_SEGMENT_SIZE", SEGMENT_SIZE)
+    def test_segmentedDownload(self) -> None:
+        content = os.urandom(8 * SEGMENT_SIZE + 123)
+        self.server.addFile("session/export", 3, content)
+
+        destination = self.tempDir / "sample.zip"
+        requestCount = self.server.requestCount("GET", "session/export")
+
+        statistics = segmentedDownload("session/export", destination, { "id": 3 }, segmentCount = 4)
+
+        self.assertEqual(destination.read_bytes(), content)
+        self.assertEqual(statistics.bytesDownloaded, len(content))
+        self.assertEqual(self.server.requestCount("GET", "session/export") - requestCount, 4)
+
+    @mock.patch.object(segmented_download, "MIN_SEGMENT_SIZE", SEGMENT_SIZE)
+    def test_segmentedDownloadResume(self) -> None:
+        content = os.urandom(8 * SEGMENT_SIZE)
+        self.server.addFile("session/export", 4, content)
+
+        destination = self.tempDir / "sample.zip"
+
+        # First segment is interrupted, other segments are stored in the journal
+        self.server.dropConnections(1, SEGMENT_SIZE // 2)
+        with self.assertRaises(Exception):
+            segmentedDownload("session/export", destination, { "id": 4 }, segmentCount = 4)
+
+        self.assertFalse(destination.exists())
+
+        requestCount = self.server.requestCount("GET", "session/export")
+        segmentedDownload("session/export", destination, { "id": 4 }, segmentCount = 4)
+
+        self.assertEqual(destination.read_bytes(), content)
+        self.assertEqual(self.server.requestCount("GET", "session/export") - requestCount, 1, "Only interrupted segment should be downloaded again")
+
+    @mock.patch.object(segmented_download, "MIN_SEGMENT_SIZE", SEGMENT_SIZE)
+    @mock.patch.object(segmented_download, "JOURNAL_SAVE_INTERVAL", 3600)
+    def test_segmentedDownloadJournalSaves(self) -> None:
+        content = os.urandom(8 * SEGMENT_SIZE)
+        self.server.addFile("session/export", 5, content)
+
+        destination = self.tempDir / "sample.zip"
+        saveJournal = segmented_download.SegmentedDownloadSession._saveJournal
+
+        with mock.patch.object(segmented_download.SegmentedDownloadSession, "_saveJournal", autospec = True, side_effect = saveJournal) as saveMock:
+            segmentedDownload("session/export", destination, { "id": 5 }, segmentCount = 4)
+
+        self.assertEqual(destination.read_bytes(), content)
+
+        # Journal is saved once the download starts and once it ends, but not for every chunk
+        self.assertEqual(saveMock.call_count, 2)
+
+    @mock.patch.object(segmented_download, "MIN_SEGMENT_SIZE", SEGMENT_SIZE)
+    def test_singleStreamShortRead(self) -> None:
+        content = os.urandom(SEGMENT_SIZE)
+        self.server.addFile("session/export", 6, content)
+
+        destination = self.tempDir / "sample.zip"
+
+        self.server.dropConnections(1, SEGMENT_SIZE // 2)
+        with self.assertRaises(Exception):
+            segmentedDownload("session/export", destination, { "id": 6 })
+
+        self.assertFalse(destination.exists())
+
+    @mock.patch.object(segmented_download, "MIN_SEGMENT_SIZE", SEGMENT_SIZE)
+    @mock.patch.object(segmented_download, "_connectionSlots", BoundedSemaphore(3))
+    def test_sharedSegmentConnections(self) -> None:
+        contents = [os.urandom(8 * SEGMENT_SIZE) for _ in range(4)]
+        for fileId, content in enumerate(contents, start = 10):
+            self.server.addFile("session/export", fileId, content)
+
+        lock = Lock()
+        active = 0
+        maxActive = 0
+
+        writeSegment = segmented_download.SegmentedDownloadSession._writeSegment
+
+        def countingWriteSegment(session: segmented_download.SegmentedDownloadSession, *args: Any) -> None:
+            nonlocal active, maxActive
+
+            with lock:
+                active += 1
+                maxActive = max(maxActive, active)
+
+            try:
+                writeSegment(session, *args)
+            finally:
+                with lock:
+                    active -= 1
+
+        def download(fileId: int) -> bytes:
+            destination = self.tempDir / f"{fileId}.zip"
+            segmentedDownload("session/export", destination, { "id": fileId }, segmentCount = 4)
+
+            return destination.read_bytes()
+
+        # Segments of all downloads share the connection slots
+        with mock.patch.object(segmented_download.SegmentedDownloadSession, "_writeSegment", countingWriteSegment):
+            with ThreadPoolExecutor(max_workers = 4) as pool:
+                results = list(pool.map(download, range(10, 14)))
+
+        self.assertEqual(results, contents)
+        self.assertLessEqual(maxActive, 3)
+
+    def test_downloadMissingFile(self) -> None:
+        response = networkManager.download("model/download", self.tempDir / "missing.zip", { "id": 999 })
+        self.assertTrue(response.hasFailed())
+
+    def test_connectionRefused(self) -> None:
+        with mock.patch.dict(os.environ, { "CTX_API_URL": "http://127.0.0.1:1/" }):
+            with mock.patch("coretex.networking.network_manager_base.MAX_RETRY_COUNT", 0):
+                with self.assertRaises(RequestFailedError):
+                    networkManager.download("model/download", self.tempDir / "model.zip", { "id": 1 })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from http import HTTPStatus
+
+import unittest
+
+from coretex.networking import networkManager, RequestType, ResponseCache, FileData
+
+from .base_fake_server_test import BaseFakeServerTest
+
+
+class TestNetworkManager(BaseFakeServerTest.Base):
+
+    def test_retryOnServerError(self) -> None:
+        entity = self.server.addEntity("dummy", name = "retry")
+        endpoint = f"dummy/{entity['id']}"
+
+        self.server.failRequests("GET", endpoint, 2, HTTPStatus.INTERNAL_SERVER_ERROR)
+        response = networkManager.get(endpoint)
+
+        self.assertFalse(response.hasFailed())
+        self.assertEqual(self.server.requestCount("GET", endpoint), 3)
+
+        statistics = networkManager.statistics.get(endpoint, RequestType.get)
+        self.assertIsNotNone(statistics)
+        self.assertEqual(statistics.count, 3)  # type: ignore[union-attr]
+        self.assertEqual(statistics.retryCount, 2)  # type: ignore[union-attr]
+        self.assertEqual(statistics.statusCodes, { 500: 2, 200: 1 })  # type: ignore[union-attr]
+
+    def test_throttlingReducesRate(self) -> None:
+        entity = self.server.addEntity("dummy", name = "throttle")
+        endpoint = f"dummy/{entity['id']}"
+
+        self.server.failRequests("GET", endpoint, 1, HTTPStatus.TOO_MANY_REQUESTS)
+        response = networkManager.get(endpoint)
+
+        self.assertFalse(response.hasFailed())
+        self.assertLess(networkManager.rateLimiter.concurrency, networkManager.rateLimiter.maxConcurrency)
+
+    def test_tokenRefreshedOnce(self) -> None:
+        entity = self.server.addEntity("dummy", name = "refresh")
+        endpoint = f"dummy/{entity['id']}"
+
+        self.server.requireAuth = True
+        self.server.expireToken()
+        refreshCount = self.server.refreshCount
+
+        with ThreadPoolExecutor(max_workers = 8) as pool:
+            responses = list(pool.map(lambda i: networkManager.get(endpoint, { "thread": i }), range(8)))
+
+        self.assertTrue(all(not response.hasFailed() for response in responses))
+        self.assertEqual(self.server.refreshCount - refreshCount, 1, "Token was refreshed more than once")
+
+    def test_identicalRequestsCoalesced(self) -> None:
+        entity = self.server.addEntity("dummy", name = "coalesce")
+        endpoint = f"dummy/{entity['id']}"
+
+        self.server.latency = 0.3
+
+        with ThreadPoolExecutor(max_workers = 8) as pool:
+            responses = list(pool.map(lambda _: networkManager.get(endpoint), range(8)))
+
+        self.assertTrue(all(response.getJson(dict)["name"] == "coalesce" for response in responses))
+        self.assertEqual(self.server.requestCount("GET", endpoint), 1)
+
+    def test_responseCache(self) -> None:
+        entity = self.server.addEntity("dummy", name = "cache")
+        endpoint = f"dummy/{entity['id']}"
+
+        cache = ResponseCache(defaultTtl = 60)
+        networkManager.setResponseCache(cache)
+
+        networkManager.get(endpoint)
+        networkManager.get(endpoint)
+        self.assertEqual(self.server.requestCount("GET", endpoint), 1, "Cached response was not used")
+
+        # Expired response is revalidated using ETag
+        cache.defaultTtl = 0.0001
+        response = networkManager.get(endpoint)
+        self.assertEqual(response.getJson(dict)["name"], "cache")
+        self.assertEqual(self.server.requestCount("GET", endpoint), 2)
+        self.assertIn("If-None-Match", self.server.requests[-1].headers)
+
+        # Update invalidates cached responses
+        cache.defaultTtl = 60
+        networkManager.put(endpoint, { "name": "updated" })
+        self.assertEqual(networkManager.get(endpoint).getJson(dict)["name"], "updated")
+
+    def test_responseCacheCredentials(self) -> None:
+        self.server.requireAuth = False
+
+        entity = self.server.addEntity("dummy", name = "credentials")
+        endpoint = f"dummy/{entity['id']}"
+
+        cache = ResponseCache(defaultTtl = 60)
+        networkManager.setResponseCache(cache)
+
+        networkManager.get(endpoint)
+
+        # Responses are not shared between different users
+        headers = networkManager._headers()
+        headers["api-token"] = "other-user-token"
+
+        networkManager.request(endpoint, RequestType.get, headers = headers)
+        self.assertEqual(self.server.requestCount("GET", endpoint), 2)
+
+        networkManager.request(endpoint, RequestType.get, headers = headers)
+        self.assertEqual(self.server.requestCount("GET", endpoint), 2)
+
+        # Revalidation does not modify headers passed by the caller
+        cache.defaultTtl = 0.0001
+        networkManager.request(endpoint, RequestType.get, headers = headers)
+
+        self.assertIn("If-None-Match", self.server.requests[-1].headers)
+        self.assertNotIn("If-None-Match", headers)
+
+    def test_responseCacheDisk(self) -> None:
+        entity = self.server.addEntity("dummy", name = "disk")
+        endpoint = f"dummy/{entity['id']}"
+
+        directory = Path(self._tempDir.name) / "responses"
+        networkManager.setResponseCache(ResponseCache(defaultTtl = 60, directory = directory))
+        networkManager.get(endpoint)
+
+        # Responses are stored as JSON metadata next to the raw body
+        self.assertEqual({ path.suffix for path in directory.iterdir() }, { ".json", ".body" })
+
+        # New cache instance loads the response from the disk
+        networkManager.setResponseCache(ResponseCache(defaultTtl = 60, directory = directory))
+        response = networkManager.get(endpoint)
+
+        self.assertEqual(response.getJson(dict)["name"], "disk")
+        self.assertEqual(self.server.requestCount("GET", endpoint), 1)
+
+    def test_responseCacheSkipsSecrets(self) -> None:
+        entity = self.server.addEntity("secret", name = "credentials")
+        endpoint = f"secret/{entity['id']}"
+
+        networkManager.setResponseCache(ResponseCache(defaultTtl = 60))
+
+        networkManager.get(endpoint)
+        networkManager.get(endpoint)
+        self.assertEqual(self.server.requestCount("GET", endpoint), 2)
+
+    def test_responseCacheFormDataInvalidates(self) -> None:
+        networkManager.setResponseCache(ResponseCache(defaultTtl = 60))
+        self.assertEqual(len(networkManager.get("form").getJson(list)), 0)
+
+        networkManager.formData("form", { "name": "form" }, [FileData.createFromBytes("file", b"content", "file.txt")])
+        self.assertEqual(len(networkManager.get("form").getJson(list)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Dict
+
+import unittest
+
+from coretex.codable import KeyDescriptor
+from coretex.networking import NetworkObject
+from coretex.logging import LogSeverity
+from coretex.logging.log import Log
+from coretex._task.run_logger.run_logger import uploadTaskRunLogs
+
+from .base_fake_server_test import BaseFakeServerTest
+
+
+class DummyObject(NetworkObject):
+
+    name: str
+    projectId: int
+
+    @classmethod
+    def _keyDescriptors(cls) -> Dict[str, KeyDescriptor]:
+        descriptors = super()._keyDescriptors()
+        descriptors["projectId"] = KeyDescriptor("project_id")
+
+        return descriptors
+
+
+class TestNetworkObject(BaseFakeServerTest.Base):
+
+    def test_crud(self) -> None:
+        obj = DummyObject.create(name = "dummy", project_id = 1)
+        self.assertEqual(obj.name, "dummy")
+
+        fetched = DummyObject.fetchById(obj.id)
+        self.assertEqual(fetched.name, "dummy")
+        self.assertEqual(fetched.projectId, 1)
+
+        self.assertTrue(fetched.update(name = "renamed"))
+        self.assertTrue(fetched.refresh())
+        self.assertEqual(fetched.name, "renamed")
+
+        self.assertTrue(fetched.delete())
+        self.assertFalse(fetched.refresh())
+
+    def test_iterAll(self) -> None:
+        for i in range(25):
+            self.server.addEntity("dummy_object", name = f"paged-{i}", project_id = 2)
+
+        names = [obj.name for obj in DummyObject.iterAll(pageSize = 10, project_id = 2)]
+        self.assertEqual(names, [f"paged-{i}" for i in range(25)])
+
+        limited = list(DummyObject.iterAll(pageSize = 10, limit = 12, project_id = 2))
+        self.assertEqual(len(limited), 12)
+
+        # Invalid arguments are reported when iterAll is called
+        with self.assertRaises(ValueError):
+            DummyObject.iterAll(pageSize = 0)
+
+    def test_uploadLogs(self) -> None:
+        logs = [Log(LogSeverity.info, f"message {i}") for i in range(3)]
+
+        self.assertTrue(uploadTaskRunLogs(1, logs))
+        self.assertEqual([log["content"] for log in self.server.logs[-3:]], [log.message for log in logs])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,6 +17,10 @@
 
 from typing import List, Union
 
+import shutil
+
+import numpy as np
+
 from coretex import ImageSample, LocalImageSample, AnnotatedImageSampleData, CoretexImageAnnotation, CoretexSegmentationInstance
 
 from .base_sample_test import BaseSampleTest
@@ -49,6 +53,41 @@ class BaseImageSampleTest:
             self.assertEqual(height, data.annotation.height, "Image height and annotation height do not match")
             self.assertEqual(channels, 3, "Image channel count is not equal to 3")
 
+        def test_sampleLoadFromArchive(self) -> None:
+            self.sample.unzip(ignoreCache = True)
+            extractedData = self.sample.load()
+
+            shutil.rmtree(self.sample.path)
+
+            data = self.sample.load()
+            self.assertFalse(self.sample.path.exists(), "Sample was extracted while loading from archive")
+            self.assertTrue(np.array_equal(data.image, extractedData.image), "Image loaded from archive does not match extracted image")
+
+            # here only for mypy
+            if data.annotation is None or extractedData.annotation is None:
+                raise ValueError
+
+            self.assertEqual(data.annotation.encode(), extractedData.annotation.encode())
+
+        def test_sampleLoadTargetSize(self) -> None:
+            self.sample.unzip(ignoreCache = True)
+
+            data = self.sample.load(targetSize = (64, 48))
+            self.assertEqual(data.image.shape, (48, 64, 3), "Loaded image was not resized to target size")
+
+            data = self.sample.load(targetSize = (64, 48), mode = "L")
+            self.assertEqual(data.image.shape, (48, 64), "Loaded image was not converted to grayscale")
+
+        def test_sampleLoadLazy(self) -> None:
+            self.sample.unzip(ignoreCache = True)
+
+            data = self.sample.load(lazy = True)
+            self.assertFalse(data.isImageLoaded, "Image was decoded before it was accessed")
+            self.assertIsNotNone(data.annotation)
+
+            self.assertEqual(len(data.image.shape), 3)
+            self.assertTrue(data.isImageLoaded)
+
         def test_saveAnnotation(self) -> None:
             self.sample.unzip(ignoreCache = True)
 
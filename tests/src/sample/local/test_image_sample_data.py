@@ -0,0 +1,105 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from pathlib import Path
+
+import unittest
+import tempfile
+import shutil
+
+from PIL import Image, ExifTags
+
+import numpy as np
+
+from coretex import AnnotatedImageSampleData
+
+
+class TestImageSampleData(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.path)
+
+        # Left half is black and right half is white
+        pixels = np.zeros((40, 80, 3), dtype = np.uint8)
+        pixels[:, 40:] = 255
+
+        self.image = Image.fromarray(pixels)
+
+    def saveImage(self, orientation: int) -> None:
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = orientation
+
+        self.image.save(self.path / "image.jpeg", exif = exif, quality = 100)
+
+    def test_noOrientation(self) -> None:
+        self.saveImage(1)
+
+        data = AnnotatedImageSampleData(self.path)
+
+        self.assertEqual(data.image.shape, (40, 80, 3))
+        self.assertIsNone(data.annotation)
+
+    def test_orientationTranspose(self) -> None:
+        # Orientation 6 means that the image must be rotated by 90 degrees clockwise
+        self.saveImage(6)
+
+        data = AnnotatedImageSampleData(self.path)
+        self.assertEqual(data.image.shape, (80, 40, 3))
+
+        # After rotation black half is at the top
+        self.assertLess(data.image[:40].mean(), 10)
+        self.assertGreater(data.image[40:].mean(), 245)
+
+        data = AnnotatedImageSampleData(self.path, targetSize = (20, 40))
+        self.assertEqual(data.image.shape, (40, 20, 3))
+
+    def test_draftDecoding(self) -> None:
+        self.saveImage(1)
+
+        data = AnnotatedImageSampleData(self.path, targetSize = (20, 10))
+        self.assertEqual(data.image.shape, (10, 20, 3))
+        self.assertLess(data.image[:, :8].mean(), 10)
+        self.assertGreater(data.image[:, 12:].mean(), 245)
+
+    def test_targetSizePadding(self) -> None:
+        self.saveImage(1)
+
+        # Image keeps its aspect ratio and is centered vertically
+        data = AnnotatedImageSampleData(self.path, targetSize = (40, 40))
+        self.assertEqual(data.image.shape, (40, 40, 3))
+        self.assertEqual(data.image[:10].max(), 0)
+        self.assertEqual(data.image[30:].max(), 0)
+        self.assertGreater(data.image[12:28, 24:].mean(), 245)
+        self.assertEqual(data.padding, (10, 0))
+
+    def test_lazyLoad(self) -> None:
+        self.saveImage(1)
+
+        data = AnnotatedImageSampleData(self.path, lazy = True)
+        self.assertFalse(data.isImageLoaded)
+
+        (self.path / "image.jpeg").unlink()
+
+        with self.assertRaises(FileNotFoundError):
+            data.image
+
+
+if __name__ == "__main__":
+    unittest.main()
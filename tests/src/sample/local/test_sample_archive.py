@@ -0,0 +1,106 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from pathlib import Path
+from zipfile import ZipFile, ZIP_STORED, ZIP_DEFLATED
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+
+from coretex import LocalCustomSample, LocalSequenceSample
+
+
+FORWARD_READS = b"@read\nACGT\n+\nIIII\n" * 100
+REVERSE_READS = b"@read\nTGCA\n+\nIIII\n" * 100
+
+
+class TestSampleArchive(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempDir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tempDir)
+
+        self.stored = os.urandom(100 * 1024)
+        self.compressed = b"compressed data" * 1000
+
+        zipPath = self.tempDir / "sample.zip"
+        with ZipFile(zipPath, "w") as zipFile:
+            zipFile.writestr("stored.bin", self.stored, ZIP_STORED)
+            zipFile.writestr("compressed.txt", self.compressed, ZIP_DEFLATED)
+            zipFile.writestr("nested/stored.bin", b"nested", ZIP_STORED)
+
+        self.sample = LocalCustomSample(zipPath)
+
+    def test_listAndRead(self) -> None:
+        with self.sample.openArchive() as archive:
+            self.assertEqual(archive.namelist(), ["stored.bin", "compressed.txt", "nested/stored.bin"])
+            self.assertEqual(archive.glob("*.bin"), ["stored.bin"])
+            self.assertEqual(archive.glob("*/*.bin"), ["nested/stored.bin"])
+            self.assertEqual(archive.size("compressed.txt"), len(self.compressed))
+
+            self.assertEqual(archive.read("compressed.txt"), self.compressed)
+
+            stream = archive.open("compressed.txt")
+
+            with self.assertRaises(FileNotFoundError):
+                archive.read("missing.txt")
+
+        # Stream remains readable after the archive is closed
+        with stream:
+            self.assertEqual(stream.read(), self.compressed)
+
+        self.assertFalse(self.sample.path.exists(), "Sample was extracted")
+
+    def test_mmap(self) -> None:
+        with self.sample.openArchive() as archive:
+            self.assertTrue(archive.isStored("stored.bin"))
+            self.assertFalse(archive.isStored("compressed.txt"))
+
+            view = archive.mmap("stored.bin")
+            self.assertEqual(view.tobytes(), self.stored)
+            view.release()
+
+            view = archive.mmap("nested/stored.bin")
+            self.assertEqual(view.tobytes(), b"nested")
+            view.release()
+
+            with self.assertRaises(ValueError):
+                archive.mmap("compressed.txt")
+
+    def test_sequenceFromArchive(self) -> None:
+        zipPath = self.tempDir / "sequence.zip"
+        with ZipFile(zipPath, "w") as zipFile:
+            zipFile.writestr("reads_R1_001.fastq.gz", gzip.compress(FORWARD_READS))
+            zipFile.writestr("reads_R2_001.fastq", REVERSE_READS)
+
+        sample = LocalSequenceSample(zipPath)
+
+        with sample.openForwardSequence() as forward, sample.openReverseSequence() as reverse:
+            self.assertEqual(forward.read(), FORWARD_READS)
+            self.assertEqual(reverse.read(), REVERSE_READS)
+
+        self.assertTrue(sample.isPairedEnd())
+        self.assertFalse(sample.path.exists(), "Sample was extracted")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from pathlib import Path
+from zipfile import ZipFile
+from unittest import mock
+
+import gzip
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+from coretex import LocalCustomSample, LocalImageSample, LocalSequenceSample, FileRole
+
+
+class TestSampleContent(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.tempDir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tempDir)
+
+    def _createSample(self, name: str, files: dict) -> Path:
+        zipPath = self.tempDir / f"{name}.zip"
+        with ZipFile(zipPath, "w") as zipFile:
+            for fileName, content in files.items():
+                zipFile.writestr(fileName, content)
+
+        return zipPath
+
+    def test_customSampleContent(self) -> None:
+        sample = LocalCustomSample(self._createSample("custom", {
+            "demux.qza": b"demux",
+            "nested/table.tsv": b"a\tb"
+        }))
+
+        # Content of a sample which was not extracted is read from the archive
+        self.assertFalse(sample.content.isExtracted)
+        self.assertEqual(sample.content.topLevelNames(), ["demux.qza", "nested"])
+
+        sample.unzip()
+        self.assertTrue(sample._contentManifestPath.exists(), "Sample content was not stored")
+
+        # Stored content is used instead of scanning the sample directory
+        with mock.patch.object(Path, "glob", side_effect = AssertionError("Sample directory was scanned")), \
+             mock.patch("os.walk", side_effect = AssertionError("Sample directory was scanned")):
+
+            content = sample.content
+            data = sample.load()
+
+        self.assertTrue(content.isExtracted)
+        self.assertEqual(content.get("nested/table.tsv").size, 3)  # type: ignore[union-attr]
+        self.assertEqual(sorted(path.name for path in data.folderContent), ["demux.qza", "nested"])
+
+    def test_updatedArchive(self) -> None:
+        zipPath = self._createSample("custom", { "a.txt": b"a" })
+        sample = LocalCustomSample(zipPath)
+        sample.unzip()
+
+        (sample.path / "b.txt").write_bytes(b"b")
+
+        # Archive is updated after the sample content was stored
+        sample._updateArchive()
+
+        self.assertIn("b.txt", sample.content)
+
+    def test_imageSampleRoles(self) -> None:
+        imagePath = self.tempDir / "image.png"
+        Image.new("RGB", (4, 3)).save(imagePath)
+
+        sample = LocalImageSample(self._createSample("image", {
+            "thumbnail.png": imagePath.read_bytes(),
+            "image.png": imagePath.read_bytes(),
+            "annotations.json": b"{}"
+        }))
+        sample.unzip()
+
+        self.assertEqual([file.name for file in sample.content.withRole(FileRole.image)], ["image.png"])
+        self.assertEqual(sample.content.find(FileRole.annotation).name, "annotations.json")  # type: ignore[union-attr]
+        self.assertEqual(sample.imagePath, sample.path / "image.png")
+
+    def test_sequenceSampleRoles(self) -> None:
+        sample = LocalSequenceSample(self._createSample("sequence", {
+            "reads_R1_001.fastq.gz": gzip.compress(b"@forward\n"),
+            "reads_R2_001.fastq.gz": gzip.compress(b"@reverse\n")
+        }))
+        sample.unzip()
+
+        # Decompressed sequences are a part of the stored content
+        self.assertEqual(sample.content.find(FileRole.forwardReads).name, "reads_R1_001.fastq")  # type: ignore[union-attr]
+        self.assertEqual(sample.forwardPath, sample.path / "reads_R1_001.fastq")
+        self.assertEqual(sample.reversePath.read_bytes(), b"@reverse\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
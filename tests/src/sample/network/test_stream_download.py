@@ -0,0 +1,139 @@
+#     Copyright (C) 2023  Coretex LLC
+
+#     This file is part of Coretex.ai
+
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU Affero General Public License as
+#     published by the Free Software Foundation, either version 3 of the
+#     License, or (at your option) any later version.
+
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+
+#     You should have received a copy of the GNU Affero General Public License
+#     along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Dict, Any
+from io import BytesIO, RawIOBase
+from zipfile import ZipFile, ZIP_STORED, ZIP_DEFLATED
+from unittest import mock
+from base64 import b64encode
+
+import os
+import unittest
+
+from coretex import CustomSample
+from coretex.cryptography import aes
+
+from ...networking.base_fake_server_test import BaseFakeServerTest
+
+
+FILES = {
+    "data.txt": b"sample data" * 1000,
+    "nested/values.bin": os.urandom(200 * 1024)
+}
+
+
+class _UnseekableWriter(RawIOBase):
+
+    # ZipFile writes data descriptors if the output is not seekable
+    def __init__(self, buffer: BytesIO) -> None:
+        self.buffer = buffer
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        return self.buffer.write(data)
+
+
+def _createArchive(compression: int = ZIP_DEFLATED, seekable: bool = True) -> bytes:
+    buffer = BytesIO()
+
+    with ZipFile(buffer if seekable else _UnseekableWriter(buffer), "w", compression) as zipFile:
+        for name, content in FILES.items():
+            with zipFile.open(name, "w") as file:
+                file.write(content)
+
+    return buffer.getvalue()
+
+
+def _encrypt(key: bytes, data: bytes) -> bytes:
+    encryptor = aes.StreamEncryptor(key)
+    return encryptor.iv + b"".join(encryptor.feed(data)) + encryptor.flush()
+
+
+class TestStreamDownload(BaseFakeServerTest.Base):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.key = os.urandom(32)
+
+        environment = mock.patch.dict(os.environ, { "CTX_PROJECT_KEY_1": b64encode(self.key).decode() })
+        environment.start()
+        self.addCleanup(environment.stop)
+
+        self.dataset = self.server.addDataset("stream-dataset", encrypted = True)
+
+    def tearDown(self) -> None:
+        for sampleData in self.dataset["sessions"]:
+            CustomSample.decode(sampleData)._removeLocalCopy()
+
+        super().tearDown()
+
+    def fetchSample(self, archive: bytes) -> CustomSample:
+        sampleData: Dict[str, Any] = self.server.addSample(self.dataset, _encrypt(self.key, archive))
+        return CustomSample.fetchById(sampleData["id"])
+
+    def assertExtracted(self, sample: CustomSample) -> None:
+        for name, content in FILES.items():
+            self.assertEqual(sample.joinPath(name).read_bytes(), content)
+
+    def test_keepOnlyExtracted(self) -> None:
+        sample = self.fetchSample(_createArchive())
+        exportCount = self.server.requestCount("GET", "session/export")
+
+        sample.streamDownload(keepArchive = False)
+
+        self.assertExtracted(sample)
+        self.assertFalse(sample.downloadPath.exists())
+        self.assertFalse(sample.zipPath.exists())
+
+        # Extracted sample is up to date
+        sample.streamDownload(keepArchive = False)
+        sample.unzip()
+        self.assertEqual(self.server.requestCount("GET", "session/export"), exportCount + 1)
+
+    def test_keepArchive(self) -> None:
+        archive = _createArchive(ZIP_STORED)
+        sample = self.fetchSample(archive)
+
+        sample.streamDownload()
+
+        self.assertExtracted(sample)
+        self.assertEqual(sample.zipPath.read_bytes(), archive)
+        self.assertFalse(sample.downloadPath.exists())
+
+    def test_unsupportedEntry(self) -> None:
+        # Size of stored entries with data descriptor is unknown until the
+        # central directory is read, archive has to be stored before unzipping
+        sample = self.fetchSample(_createArchive(ZIP_STORED, seekable = False))
+        exportCount = self.server.requestCount("GET", "session/export")
+
+        sample.streamDownload()
+
+        self.assertExtracted(sample)
+        self.assertEqual(self.server.requestCount("GET", "session/export"), exportCount + 1)
+
+        sample.streamDownload(ignoreCache = True, keepArchive = False)
+
+        self.assertExtracted(sample)
+        self.assertFalse(sample.zipPath.exists())
+        self.assertEqual(self.server.requestCount("GET", "session/export"), exportCount + 3)
+
+
+if __name__ == "__main__":
+    unittest.main()